@@ -5,3 +5,22 @@ class AboutConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'about'
     verbose_name = 'О компании'
+
+    def ready(self):
+        from django.db.models.signals import post_delete, post_save
+
+        from masters.models import Master
+        from .models import Address
+        from .utils import invalidate_contact_info
+
+        for model in (Address, Master):
+            post_save.connect(
+                invalidate_contact_info,
+                sender=model,
+                dispatch_uid=f'contact_info_save_{model.__name__}',
+            )
+            post_delete.connect(
+                invalidate_contact_info,
+                sender=model,
+                dispatch_uid=f'contact_info_delete_{model.__name__}',
+            )
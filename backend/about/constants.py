@@ -1 +1,5 @@
 ADDRESS_MAX_LENGTH = 150
+
+# Кеш контактов для контекст-процессора
+CONTACT_INFO_CACHE_KEY = 'about:contact_info'
+CONTACT_INFO_CACHE_TIMEOUT = 300
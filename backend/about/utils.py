@@ -1,3 +1,7 @@
+from django.conf import settings
+from django.core.cache import cache
+
+from .constants import CONTACT_INFO_CACHE_KEY, CONTACT_INFO_CACHE_TIMEOUT
 from .models import Address
 from masters.models import Master
 
@@ -49,3 +53,25 @@ def get_contact_phone():
 
     any_master = Master.objects.first()
     return any_master.phone if any_master else 'Телефон не указан'
+
+
+def _build_contact_info():
+    return {
+        'contact_phone': get_contact_phone(),
+        'contact_email': getattr(settings, 'DEFAULT_FROM_EMAIL', ''),
+        'legal_address': get_legal_address(),
+    }
+
+
+def get_contact_info():
+    """Контакты для подвала сайта (кешируются, сбрасываются сигналами)."""
+    return cache.get_or_set(
+        CONTACT_INFO_CACHE_KEY,
+        _build_contact_info,
+        CONTACT_INFO_CACHE_TIMEOUT,
+    )
+
+
+def invalidate_contact_info(**kwargs):
+    """Сбрасывает кеш контактов при изменении адресов или мастеров."""
+    cache.delete(CONTACT_INFO_CACHE_KEY)
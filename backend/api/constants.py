@@ -0,0 +1,27 @@
+# Пагинация
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+# Ключи keyset-пагинации (последнее поле уникально и все покрыты индексом)
+PROCEDURE_ORDERING = ('title', 'id')
+MASTER_ORDERING = ('id',)
+BOOKING_ORDERING = ('booking_date', 'booking_time', 'id')
+
+# Параметры запроса
+CURSOR_PARAM = 'cursor'
+LIMIT_PARAM = 'limit'
+FIELDS_PARAM = 'fields'
+CATEGORY_PARAM = 'category'
+DATE_FROM_PARAM = 'date_from'
+DATE_TO_PARAM = 'date_to'
+STATUS_PARAM = 'status'
+
+# Компактный JSON без пробелов, кириллица без \u-экранирования
+JSON_DUMPS_PARAMS = {'separators': (',', ':'), 'ensure_ascii': False}
+
+MSG_UNKNOWN_FIELDS = 'Неизвестные поля: {}'
+MSG_BAD_LIMIT = 'limit должен быть числом от 1 до {}'
+MSG_BAD_CURSOR = 'Некорректный курсор'
+MSG_BAD_DATE = 'Дата должна быть в формате ГГГГ-ММ-ДД'
+MSG_FORBIDDEN = 'Нужен токен мастера или вход администратора'
+MSG_NOT_FOUND = 'Не найдено'
@@ -0,0 +1,159 @@
+"""
+Описание полей ресурсов API.
+
+Для каждого поля известны колонки для only(), связи для select_related /
+prefetch_related и функция, достающая значение из объекта. Запрос
+выбирает только колонки запрошенных полей, а связанные объекты
+подгружаются, только если их поля запрошены.
+"""
+from django.db.models import Prefetch
+
+from catalog.models import Procedure
+from .constants import MSG_UNKNOWN_FIELDS
+
+
+def api_field(columns, getter, select=(), prefetch=()):
+    return {
+        'columns': columns,
+        'getter': getter,
+        'select': select,
+        'prefetch': prefetch,
+    }
+
+
+def _minutes(duration):
+    return int(duration.total_seconds() // 60)
+
+
+def _file_url(field_file):
+    return field_file.url if field_file else None
+
+
+PROCEDURE_FIELDS = {
+    'id': api_field(('id',), lambda procedure: procedure.pk),
+    'title': api_field(('title',), lambda procedure: procedure.title),
+    'short_description': api_field(
+        ('short_description',),
+        lambda procedure: procedure.short_description,
+    ),
+    'description': api_field(
+        ('description',), lambda procedure: procedure.description
+    ),
+    'price': api_field(('price',), lambda procedure: procedure.price),
+    'duration_minutes': api_field(
+        ('duration',), lambda procedure: _minutes(procedure.duration)
+    ),
+    'image': api_field(
+        ('image',), lambda procedure: _file_url(procedure.image)
+    ),
+    'category': api_field(
+        ('category', 'category__title'),
+        lambda procedure: {
+            'id': procedure.category_id,
+            'title': procedure.category.title,
+        },
+        select=('category',),
+    ),
+}
+PROCEDURE_DEFAULT_FIELDS = (
+    'id', 'title', 'short_description', 'price', 'duration_minutes',
+    'category',
+)
+
+MASTER_FIELDS = {
+    'id': api_field(('id',), lambda master: master.pk),
+    'name': api_field(('name',), lambda master: master.name),
+    'specialization': api_field(
+        ('specialization',), lambda master: master.specialization
+    ),
+    'description': api_field(
+        ('description',), lambda master: master.description
+    ),
+    'photo': api_field(('photo',), lambda master: _file_url(master.photo)),
+    'procedures': api_field(
+        (),
+        lambda master: [
+            procedure.pk for procedure in master.procedures.all()
+        ],
+        prefetch=(Prefetch(
+            'procedures',
+            queryset=Procedure.objects.filter(is_available=True).only('id'),
+        ),),
+    ),
+}
+MASTER_DEFAULT_FIELDS = ('id', 'name', 'specialization', 'procedures')
+
+BOOKING_FIELDS = {
+    'id': api_field(('booking_id',), lambda booking: booking.booking_id),
+    'date': api_field(
+        ('booking_date',), lambda booking: booking.booking_date
+    ),
+    'time': api_field(
+        ('booking_time',), lambda booking: booking.booking_time
+    ),
+    'end': api_field(
+        ('booking_date', 'booking_time', 'procedure',
+         'procedure__duration'),
+        lambda booking: booking.end_time,
+        select=('procedure',),
+    ),
+    'status': api_field(('status',), lambda booking: booking.status),
+    'procedure': api_field(
+        ('procedure', 'procedure__title'),
+        lambda booking: {
+            'id': booking.procedure_id,
+            'title': booking.procedure.title,
+        },
+        select=('procedure',),
+    ),
+    'client_name': api_field(
+        ('client_name',), lambda booking: booking.client_name
+    ),
+    'client_phone': api_field(
+        ('client_phone',), lambda booking: booking.client_phone
+    ),
+    'group_id': api_field(('group_id',), lambda booking: booking.group_id),
+    'series_id': api_field(
+        ('series_id',), lambda booking: booking.series_id
+    ),
+}
+BOOKING_DEFAULT_FIELDS = (
+    'id', 'date', 'time', 'end', 'status', 'procedure', 'client_name',
+    'client_phone',
+)
+
+
+def parse_fields(raw, spec, default):
+    """
+    Поля из параметра fields=id,title. ValueError для неизвестных,
+    без параметра - поля по умолчанию.
+    """
+    if not raw:
+        return list(default)
+    fields = list(dict.fromkeys(
+        name.strip() for name in raw.split(',') if name.strip()
+    ))
+    unknown = [name for name in fields if name not in spec]
+    if unknown or not fields:
+        raise ValueError(MSG_UNKNOWN_FIELDS.format(', '.join(unknown)))
+    return fields
+
+
+def apply_fields(queryset, fields, spec, ordering):
+    """only() по колонкам полей и ключа сортировки плюс нужные связи."""
+    columns = set(ordering)
+    select = set()
+    prefetch = []
+    for name in fields:
+        columns.update(spec[name]['columns'])
+        select.update(spec[name]['select'])
+        prefetch.extend(spec[name]['prefetch'])
+    if select:
+        queryset = queryset.select_related(*sorted(select))
+    if prefetch:
+        queryset = queryset.prefetch_related(*prefetch)
+    return queryset.only(*sorted(columns))
+
+
+def serialize(obj, fields, spec):
+    return {name: spec[name]['getter'](obj) for name in fields}
@@ -0,0 +1,20 @@
+from django.urls import path
+from . import views
+
+app_name = 'api'
+
+urlpatterns = [
+    path('procedures/', views.procedure_list, name='procedure_list'),
+    path(
+        'procedures/<int:pk>/',
+        views.procedure_detail,
+        name='procedure_detail',
+    ),
+    path('masters/', views.master_list, name='master_list'),
+    path('masters/<int:pk>/', views.master_detail, name='master_detail'),
+    path(
+        'masters/<int:pk>/bookings/',
+        views.master_bookings,
+        name='master_bookings',
+    ),
+]
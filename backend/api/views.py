@@ -0,0 +1,244 @@
+from datetime import date
+from functools import wraps
+from http import HTTPStatus
+from urllib.parse import urlencode
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse
+from django.utils import timezone
+from django.views.decorators.http import require_GET
+
+from booking.ics import unsign_feed_token
+from booking.models import Booking
+from catalog.models import Procedure
+from core.metrics import histogram
+from core.pagination import keyset_paginate, parse_cursor
+from masters.models import Master
+from .constants import (
+    BOOKING_ORDERING,
+    CATEGORY_PARAM,
+    CURSOR_PARAM,
+    DATE_FROM_PARAM,
+    DATE_TO_PARAM,
+    DEFAULT_PAGE_SIZE,
+    FIELDS_PARAM,
+    JSON_DUMPS_PARAMS,
+    LIMIT_PARAM,
+    MASTER_ORDERING,
+    MAX_PAGE_SIZE,
+    MSG_BAD_CURSOR,
+    MSG_BAD_DATE,
+    MSG_BAD_LIMIT,
+    MSG_FORBIDDEN,
+    MSG_NOT_FOUND,
+    PROCEDURE_ORDERING,
+    STATUS_PARAM,
+)
+from .serializers import (
+    BOOKING_DEFAULT_FIELDS,
+    BOOKING_FIELDS,
+    MASTER_DEFAULT_FIELDS,
+    MASTER_FIELDS,
+    PROCEDURE_DEFAULT_FIELDS,
+    PROCEDURE_FIELDS,
+    apply_fields,
+    parse_fields,
+    serialize,
+)
+
+API_REQUEST_SECONDS = histogram(
+    'api_request_duration_seconds',
+    'Время обработки запросов JSON API',
+    labelnames=['endpoint'],
+)
+
+
+class ApiError(Exception):
+    def __init__(self, message, status=HTTPStatus.BAD_REQUEST):
+        super().__init__(message)
+        self.status = status
+
+
+def _json(data, status=HTTPStatus.OK):
+    return JsonResponse(
+        data,
+        status=status,
+        encoder=DjangoJSONEncoder,
+        json_dumps_params=JSON_DUMPS_PARAMS,
+    )
+
+
+def api_view(endpoint):
+    """GET-only endpoint: метрика времени и ApiError -> JSON с ошибкой."""
+    def decorator(view):
+        @API_REQUEST_SECONDS.time(endpoint=endpoint)
+        @require_GET
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            try:
+                return _json(view(request, *args, **kwargs))
+            except ApiError as error:
+                return _json({'error': str(error)}, status=error.status)
+        return wrapper
+    return decorator
+
+
+def _get_limit(request):
+    raw = request.GET.get(LIMIT_PARAM)
+    if raw is None:
+        return DEFAULT_PAGE_SIZE
+    if not raw.isdigit() or not 1 <= int(raw) <= MAX_PAGE_SIZE:
+        raise ApiError(MSG_BAD_LIMIT.format(MAX_PAGE_SIZE))
+    return int(raw)
+
+
+def _get_fields(request, spec, default):
+    try:
+        return parse_fields(request.GET.get(FIELDS_PARAM), spec, default)
+    except ValueError as error:
+        raise ApiError(str(error))
+
+
+def _get_date(request, param):
+    raw = request.GET.get(param)
+    if not raw:
+        return None
+    try:
+        return date.fromisoformat(raw)
+    except ValueError:
+        raise ApiError(MSG_BAD_DATE)
+
+
+def _paginate(request, queryset, ordering, spec, default_fields):
+    """
+    Страница ресурса: {'results': [...], 'next': url или None}.
+
+    Keyset-пагинация по индексированному ключу ordering: стоимость
+    страницы не зависит от ее номера, в отличие от OFFSET.
+    """
+    fields = _get_fields(request, spec, default_fields)
+    limit = _get_limit(request)
+    cursor = request.GET.get(CURSOR_PARAM)
+    # Курсор проверяется вместе с типами значений, чтобы подделка
+    # давала 400, а не ошибку ORM
+    if cursor and parse_cursor(cursor, ordering, queryset.model) is None:
+        raise ApiError(MSG_BAD_CURSOR)
+
+    queryset = apply_fields(queryset, fields, spec, ordering)
+    items, next_cursor = keyset_paginate(queryset, ordering, cursor, limit)
+
+    next_url = None
+    if next_cursor:
+        params = request.GET.copy()
+        params[CURSOR_PARAM] = next_cursor
+        next_url = f'{request.path}?{urlencode(sorted(params.items()))}'
+    return {
+        'results': [serialize(item, fields, spec) for item in items],
+        'next': next_url,
+    }
+
+
+def _get_object(queryset, request, spec, default_fields, **lookup):
+    fields = _get_fields(request, spec, default_fields)
+    obj = apply_fields(queryset, fields, spec, ()).filter(**lookup).first()
+    if obj is None:
+        raise ApiError(MSG_NOT_FOUND, HTTPStatus.NOT_FOUND)
+    return serialize(obj, fields, spec)
+
+
+def _available_procedures():
+    return Procedure.objects.filter(
+        is_available=True, category__is_active=True
+    )
+
+
+@api_view('procedure_list')
+def procedure_list(request):
+    """Доступные процедуры, фильтр ?category=<id>."""
+    procedures = _available_procedures()
+    category = request.GET.get(CATEGORY_PARAM, '')
+    if category.isdigit():
+        procedures = procedures.filter(category_id=category)
+    return _paginate(
+        request,
+        procedures,
+        PROCEDURE_ORDERING,
+        PROCEDURE_FIELDS,
+        PROCEDURE_DEFAULT_FIELDS,
+    )
+
+
+@api_view('procedure_detail')
+def procedure_detail(request, pk):
+    return _get_object(
+        _available_procedures(),
+        request,
+        PROCEDURE_FIELDS,
+        PROCEDURE_DEFAULT_FIELDS,
+        pk=pk,
+    )
+
+
+@api_view('master_list')
+def master_list(request):
+    """Активные мастера с id доступных им процедур."""
+    return _paginate(
+        request,
+        Master.objects.filter(is_active=True),
+        MASTER_ORDERING,
+        MASTER_FIELDS,
+        MASTER_DEFAULT_FIELDS,
+    )
+
+
+@api_view('master_detail')
+def master_detail(request, pk):
+    return _get_object(
+        Master.objects.filter(is_active=True),
+        request,
+        MASTER_FIELDS,
+        MASTER_DEFAULT_FIELDS,
+        pk=pk,
+    )
+
+
+def _can_read_master_bookings(request, master_id):
+    """
+    Токен мастера (та же подпись, что у его .ics-ленты) в заголовке
+    Authorization: Bearer или вход сотрудника. Токен проверяется первым,
+    чтобы внешняя синхронизация не трогала сессии.
+    """
+    header = request.headers.get('Authorization', '')
+    if header.startswith('Bearer '):
+        return unsign_feed_token(header[len('Bearer '):]) == master_id
+    return request.user.is_authenticated and request.user.is_staff
+
+
+@api_view('master_bookings')
+def master_bookings(request, pk):
+    """
+    Записи мастера, фильтры ?date_from, ?date_to (ГГГГ-ММ-ДД) и
+    ?status; по умолчанию с сегодняшнего дня.
+    """
+    if not _can_read_master_bookings(request, pk):
+        raise ApiError(MSG_FORBIDDEN, HTTPStatus.FORBIDDEN)
+
+    bookings = Booking.objects.filter(
+        master_id=pk,
+        booking_date__gte=(
+            _get_date(request, DATE_FROM_PARAM) or timezone.localdate()
+        ),
+    )
+    date_to = _get_date(request, DATE_TO_PARAM)
+    if date_to:
+        bookings = bookings.filter(booking_date__lte=date_to)
+    status = request.GET.get(STATUS_PARAM)
+    if status:
+        bookings = bookings.filter(status=status)
+    return _paginate(
+        request,
+        bookings,
+        BOOKING_ORDERING,
+        BOOKING_FIELDS,
+        BOOKING_DEFAULT_FIELDS,
+    )
@@ -1,10 +1,55 @@
+from datetime import date, time, timedelta
+
+from django.conf import settings
 from django.contrib import admin
+from django.core.exceptions import PermissionDenied
+from django.http import JsonResponse
+from django.template.response import TemplateResponse
+from django.urls import path
+from django.utils import timezone
+from django.views.decorators.http import require_POST
+
+from catalog.models import Procedure
+from core.export import ExportAdminMixin
+from masters.models import Master
+from .board import (
+    RescheduleError,
+    get_week_board,
+    get_week_start,
+    move_booking,
+)
+from .constants import (
+    ACTIVE_BOOKING_STATUSES,
+    CALENDAR_DAYS,
+    CALENDAR_MASTER_PARAM,
+    CALENDAR_WEEK_PARAM,
+    MSG_CALENDAR_BAD_PARAMS,
+    STATUS_CANCELLED,
+)
+from .models import (
+    ArchivedBooking,
+    Booking,
+    ReminderSettings,
+    WaitlistEntry,
+    WaitlistOffer,
+    WorkingHoursSettings,
+)
+from .signals import booking_cancelled
+
+
+class ProcedureListFilter(admin.RelatedFieldListFilter):
+    """Фильтр по процедуре без запроса категории на каждый вариант."""
 
-from .models import Booking, WorkingHoursSettings, ReminderSettings
+    def field_choices(self, field, request, model_admin):
+        ordering = self.field_admin_ordering(field, request, model_admin)
+        procedures = Procedure.objects.select_related('category')
+        if ordering:
+            procedures = procedures.order_by(*ordering)
+        return [(procedure.pk, str(procedure)) for procedure in procedures]
 
 
 @admin.register(Booking)
-class BookingAdmin(admin.ModelAdmin):
+class BookingAdmin(ExportAdminMixin, admin.ModelAdmin):
     """Админка для бронирований."""
 
     list_display = [
@@ -15,13 +60,13 @@ class BookingAdmin(admin.ModelAdmin):
         'client_name',
         'procedure',
         'booking_date',
-        
     ]
+    list_select_related = ['master', 'procedure__category']
     list_filter = [
         'status',
         'booking_date',
         'master',
-        'procedure'
+        ('procedure', ProcedureListFilter),
     ]
     search_fields = [
         'client_name',
@@ -30,6 +75,8 @@ class BookingAdmin(admin.ModelAdmin):
     ]
     readonly_fields = [
         'booking_id',
+        'group_id',
+        'series_id',
         'created_at',
         'updated_at'
     ]
@@ -62,6 +109,8 @@ class BookingAdmin(admin.ModelAdmin):
         }),
         ('Системная информация', {
             'fields': (
+                'group_id',
+                'series_id',
                 'created_at',
                 'updated_at',
                 'telegram_message_id'
@@ -70,6 +119,217 @@ class BookingAdmin(admin.ModelAdmin):
         }),
     )
 
+    export_columns = [
+        ('ID', lambda booking: booking.booking_id),
+        ('Дата', lambda booking: booking.booking_date),
+        ('Время', lambda booking: booking.booking_time),
+        ('Процедура', lambda booking: booking.procedure.title),
+        ('Цена', lambda booking: booking.procedure.price),
+        ('Мастер', lambda booking: booking.master.name),
+        ('Клиент', lambda booking: booking.client_name),
+        ('Телефон', lambda booking: booking.client_phone),
+        ('Email', lambda booking: booking.client_email),
+        ('Статус', lambda booking: booking.get_status_display()),
+        ('Оплата', lambda booking: booking.get_payment_status_display()),
+        ('Создано', lambda booking: booking.created_at),
+    ]
+    export_select_related = ['procedure', 'master']
+    export_date_field = 'booking_date'
+    export_help = (
+        'Выгрузка читает только таблицу бронирований. Завершенные, '
+        'отмененные записи и неявки старше '
+        f'{settings.BOOKING_ARCHIVE_AFTER_DAYS} дней переносятся в архив '
+        'бронирований и выгружаются оттуда.'
+    )
+    change_list_template = 'admin/booking/booking/change_list.html'
+
+    def get_urls(self):
+        opts = self.model._meta
+        prefix = f'{opts.app_label}_{opts.model_name}'
+        return [
+            path(
+                'calendar/',
+                self.admin_site.admin_view(self.calendar_view),
+                name=f'{prefix}_calendar',
+            ),
+            path(
+                'calendar/move/',
+                self.admin_site.admin_view(
+                    require_POST(self.calendar_move_view)
+                ),
+                name=f'{prefix}_calendar_move',
+            ),
+        ] + super().get_urls()
+
+    def calendar_view(self, request):
+        """Неделя записей по мастерам, ?week=ГГГГ-ММ-ДД и ?master=<id>."""
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+        today = timezone.localdate()
+        try:
+            week_start = get_week_start(date.fromisoformat(
+                request.GET.get(CALENDAR_WEEK_PARAM) or today.isoformat()
+            ))
+        except ValueError:
+            week_start = get_week_start(today)
+        master_id = request.GET.get(CALENDAR_MASTER_PARAM, '')
+        master_id = int(master_id) if master_id.isdigit() else None
+
+        context = {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': 'Календарь записей',
+            'board': get_week_board(week_start, master_id),
+            'days': [
+                week_start + timedelta(days=offset)
+                for offset in range(CALENDAR_DAYS)
+            ],
+            'today': today,
+            'previous_week': week_start - timedelta(weeks=1),
+            'next_week': week_start + timedelta(weeks=1),
+            'masters': Master.objects.filter(is_active=True).order_by('name'),
+            'master_id': master_id,
+            'can_move': self.has_change_permission(request),
+        }
+        return TemplateResponse(
+            request, 'admin/booking/booking/calendar.html', context
+        )
+
+    def calendar_move_view(self, request):
+        """
+        Перенос записи перетаскиванием в календаре. JSON с новым
+        временем или {'error': ...}: 400 - неверные параметры,
+        409 - время занято или перенос невозможен.
+        """
+        if not self.has_change_permission(request):
+            raise PermissionDenied
+        try:
+            pk = int(request.POST['booking'])
+            master_id = int(request.POST['master'])
+            booking_date = date.fromisoformat(request.POST['booking_date'])
+            booking_time = time.fromisoformat(request.POST['booking_time'])
+        except (KeyError, ValueError):
+            return JsonResponse({'error': MSG_CALENDAR_BAD_PARAMS}, status=400)
+        try:
+            booking = move_booking(pk, master_id, booking_date, booking_time)
+        except RescheduleError as error:
+            return JsonResponse({'error': str(error)}, status=409)
+
+        fields = [
+            str(self.model._meta.get_field(name).verbose_name)
+            for name in ('master', 'booking_date', 'booking_time')
+        ]
+        self.log_change(request, booking, [{'changed': {'fields': fields}}])
+        return JsonResponse({
+            'booking': booking.pk,
+            'master': booking.master_id,
+            'booking_date': booking.booking_date.isoformat(),
+            'booking_time': booking.booking_time.strftime('%H:%M'),
+            'end_time': booking.end_time.strftime('%H:%M'),
+        })
+
+    def save_model(self, request, obj, form, change):
+        was_active = (
+            change
+            and 'status' in form.changed_data
+            and form.initial.get('status') in ACTIVE_BOOKING_STATUSES
+        )
+        super().save_model(request, obj, form, change)
+        if was_active and obj.status == STATUS_CANCELLED:
+            booking_cancelled.send(sender=Booking, booking=obj)
+
+
+class WaitlistOfferInline(admin.TabularInline):
+    model = WaitlistOffer
+    extra = 0
+    fields = [
+        'master',
+        'booking_date',
+        'booking_time',
+        'status',
+        'expires_at',
+        'booking',
+    ]
+    readonly_fields = fields
+    can_delete = False
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(WaitlistEntry)
+class WaitlistEntryAdmin(admin.ModelAdmin):
+    """Админка для листа ожидания."""
+
+    list_display = [
+        'client',
+        'procedure',
+        'master',
+        'date_from',
+        'date_to',
+        'priority',
+        'status',
+    ]
+    list_select_related = ['client', 'procedure__category', 'master']
+    list_filter = ['status', 'master']
+    list_editable = ['priority']
+    search_fields = ['client__name', 'client__phone']
+    raw_id_fields = ['client']
+    inlines = [WaitlistOfferInline]
+
+
+@admin.register(ArchivedBooking)
+class ArchivedBookingAdmin(ExportAdminMixin, admin.ModelAdmin):
+    """
+    Архив бронирований (только просмотр). Выгрузка берет снимки
+    процедуры и мастера, сохраненные при архивации.
+    """
+
+    list_display = [
+        'booking_id',
+        'status',
+        'master_name',
+        'booking_time',
+        'client_name',
+        'procedure_title',
+        'booking_date',
+    ]
+    list_filter = ['status', 'booking_date']
+    search_fields = [
+        'client_name',
+        'client_phone',
+        'booking_id',
+    ]
+    date_hierarchy = 'booking_date'
+
+    export_columns = [
+        ('ID', lambda booking: booking.booking_id),
+        ('Дата', lambda booking: booking.booking_date),
+        ('Время', lambda booking: booking.booking_time),
+        ('Процедура', lambda booking: booking.procedure_title),
+        ('Цена', lambda booking: booking.procedure_price),
+        ('Мастер', lambda booking: booking.master_name),
+        ('Клиент', lambda booking: booking.client_name),
+        ('Телефон', lambda booking: booking.client_phone),
+        ('Email', lambda booking: booking.client_email),
+        ('Статус', lambda booking: booking.get_status_display()),
+        ('Оплата', lambda booking: booking.get_payment_status_display()),
+        ('Создано', lambda booking: booking.created_at),
+        ('В архиве с', lambda booking: booking.archived_at),
+    ]
+    export_date_field = 'booking_date'
+    export_help = (
+        'Выгрузка читает только архив: завершенные, отмененные записи '
+        f'и неявки старше {settings.BOOKING_ARCHIVE_AFTER_DAYS} дней. '
+        'Более новые выгружаются из бронирований.'
+    )
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
 
 @admin.register(WorkingHoursSettings)
 class WorkingHoursSettingsAdmin(admin.ModelAdmin):
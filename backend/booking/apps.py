@@ -5,3 +5,26 @@ class BookingConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'booking'
     verbose_name = 'Бронирование'
+
+    def ready(self):
+        from django.db.models.signals import post_delete, post_save
+
+        from .ics import invalidate_booking_feed
+        from .models import Booking
+        from .signals import booking_cancelled
+        from .waitlist import offer_cancelled_slot
+
+        booking_cancelled.connect(
+            offer_cancelled_slot,
+            dispatch_uid='waitlist_offer_cancelled_slot',
+        )
+        post_save.connect(
+            invalidate_booking_feed,
+            sender=Booking,
+            dispatch_uid='booking_ics_save',
+        )
+        post_delete.connect(
+            invalidate_booking_feed,
+            sender=Booking,
+            dispatch_uid='booking_ics_delete',
+        )
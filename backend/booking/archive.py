@@ -0,0 +1,49 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from .constants import ARCHIVABLE_BOOKING_STATUSES
+from .models import ArchivedBooking, Booking
+
+
+def get_archive_cutoff(days):
+    """Дата, раньше которой завершенные записи уходят в архив."""
+    return timezone.localdate() - timedelta(days=days)
+
+
+def get_archivable_bookings(cutoff):
+    """Завершенные, отмененные и неявки старше cutoff."""
+    return Booking.objects.filter(
+        status__in=ARCHIVABLE_BOOKING_STATUSES,
+        booking_date__lt=cutoff,
+    )
+
+
+def archive_batch(cutoff, batch_size):
+    """
+    Переносит одну пачку бронирований в архив.
+
+    Копирование и удаление идут в одной транзакции, копия защищена
+    уникальным booking_id - прерванный запуск можно просто повторить.
+    Возвращает количество перенесенных записей.
+    """
+    with transaction.atomic():
+        bookings = list(
+            get_archivable_bookings(cutoff)
+            .select_related('procedure', 'master')
+            # Блокируются только сами брони: мастеров блокирует создание
+            # записи, и архивация не должна его останавливать
+            .select_for_update(of=('self',))
+            .order_by('booking_date', 'id')[:batch_size]
+        )
+        if not bookings:
+            return 0
+        ArchivedBooking.objects.bulk_create(
+            [ArchivedBooking.from_booking(booking) for booking in bookings],
+            ignore_conflicts=True,
+        )
+        Booking.objects.filter(
+            pk__in=[booking.pk for booking in bookings]
+        ).delete()
+    return len(bookings)
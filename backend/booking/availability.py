@@ -0,0 +1,299 @@
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+
+from django.utils import timezone
+
+from masters.models import Master
+from .constants import (
+    ACTIVE_BOOKING_STATUSES,
+    DEFAULT_TIME_INTERVAL,
+    DEFAULT_WORKING_END_HOUR,
+    DEFAULT_WORKING_END_MINUTE,
+    DEFAULT_WORKING_START_HOUR,
+    DEFAULT_WORKING_START_MINUTE,
+)
+from .models import Booking, WorkingHoursSettings
+
+
+class SlotUnavailableError(Exception):
+    """Выбранное время занято к моменту создания записи."""
+
+
+def get_working_hours():
+    """Начало, конец рабочего дня и шаг сетки (минуты)."""
+    start_time = time(DEFAULT_WORKING_START_HOUR, DEFAULT_WORKING_START_MINUTE)
+    end_time = time(DEFAULT_WORKING_END_HOUR, DEFAULT_WORKING_END_MINUTE)
+    interval = DEFAULT_TIME_INTERVAL
+    try:
+        working_settings = WorkingHoursSettings.objects.filter(
+            is_active=True
+        ).first()
+        if working_settings:
+            start_time = working_settings.start_time
+            end_time = working_settings.end_time
+            interval = working_settings.time_interval
+    except Exception:
+        pass
+
+    if isinstance(interval, dict):
+        interval = DEFAULT_TIME_INTERVAL
+    elif not isinstance(interval, int):
+        try:
+            interval = int(interval)
+        except (ValueError, TypeError):
+            interval = DEFAULT_TIME_INTERVAL
+    return start_time, end_time, interval
+
+
+def get_busy_intervals_between(
+    master_ids,
+    date_from,
+    date_to,
+    exclude_pks=(),
+):
+    """
+    Занятые интервалы мастеров за диапазон дат одним запросом:
+    {дата: {master_id: [(начало, конец), ...]}}.
+    """
+    busy = defaultdict(lambda: defaultdict(list))
+    rows = Booking.objects.filter(
+        master_id__in=master_ids,
+        booking_date__range=(date_from, date_to),
+        status__in=ACTIVE_BOOKING_STATUSES,
+    ).exclude(pk__in=exclude_pks).values_list(
+        'master_id', 'booking_date', 'booking_time', 'procedure__duration'
+    )
+    for master_id, busy_date, busy_time, busy_duration in rows:
+        start = datetime.combine(busy_date, busy_time)
+        busy[busy_date][master_id].append((start, start + busy_duration))
+    return busy
+
+
+def get_busy_intervals(master_ids, booking_date, exclude_pks=()):
+    """
+    Занятые интервалы мастеров на дату одним запросом:
+    {master_id: [(начало, конец), ...]}.
+    """
+    return get_busy_intervals_between(
+        master_ids, booking_date, booking_date, exclude_pks
+    )[booking_date]
+
+
+def _is_free(intervals, start, end):
+    return all(
+        not (start < busy_end and busy_start < end)
+        for busy_start, busy_end in intervals
+    )
+
+
+def is_slot_free(
+    master_id,
+    booking_date,
+    start_time,
+    duration,
+    exclude_pks=(),
+):
+    """
+    Свободно ли время мастера: нет активных броней, пересекающихся
+    с интервалом [start_time, start_time + duration).
+    Один запрос за временем начала и длительностью броней дня.
+    """
+    start = datetime.combine(booking_date, start_time)
+    busy = get_busy_intervals([master_id], booking_date, exclude_pks)
+    return _is_free(busy[master_id], start, start + duration)
+
+
+def reserve_slot(busy, master_id, booking_date, start_time, duration):
+    """
+    Занимает интервал мастера в busy (результат get_busy_intervals_between),
+    если он свободен. Возвращает False при пересечении.
+    """
+    start = datetime.combine(booking_date, start_time)
+    intervals = busy[booking_date][master_id]
+    if not _is_free(intervals, start, start + duration):
+        return False
+    intervals.append((start, start + duration))
+    return True
+
+
+def get_capable_masters(procedure_ids):
+    """Активные мастера по процедурам: {procedure_id: [master_id, ...]}."""
+    capable = defaultdict(list)
+    rows = Master.procedures.through.objects.filter(
+        procedure_id__in=procedure_ids,
+        master__is_active=True,
+    ).order_by('master_id').values_list('procedure_id', 'master_id')
+    for procedure_id, master_id in rows:
+        capable[procedure_id].append(master_id)
+    return capable
+
+
+def plan_combo(
+    procedures,
+    booking_date,
+    start_time,
+    capable,
+    busy,
+    master_id=None,
+    end_time=None,
+):
+    """
+    Раскладывает процедуры подряд, начиная со start_time.
+
+    Первую процедуру выполняет выбранный master_id, каждую следующую -
+    по возможности тот же мастер, что и предыдущую, иначе первый
+    свободный из умеющих. Возвращает [(procedure, master_id, время), ...]
+    или None, если непрерывного блока нет.
+    """
+    cursor = datetime.combine(booking_date, start_time)
+    day_end = datetime.combine(booking_date, end_time) if end_time else None
+    preferred = master_id
+    plan = []
+    for procedure in procedures:
+        finish = cursor + procedure.duration
+        if day_end and finish > day_end:
+            return None
+        candidates = capable.get(procedure.pk, [])
+        if not plan and master_id is not None:
+            # Первую процедуру делает мастер, выбранный клиентом
+            candidates = [master_id] if master_id in candidates else []
+        elif preferred in candidates:
+            candidates = [preferred] + [
+                candidate for candidate in candidates
+                if candidate != preferred
+            ]
+        chosen = next(
+            (
+                candidate for candidate in candidates
+                if _is_free(busy.get(candidate, ()), cursor, finish)
+            ),
+            None,
+        )
+        if chosen is None:
+            return None
+        plan.append((procedure, chosen, cursor.time()))
+        preferred = chosen
+        cursor = finish
+    return plan
+
+
+def _load_masters_and_busy(procedures, booking_date):
+    capable = get_capable_masters([procedure.pk for procedure in procedures])
+    master_ids = {
+        candidate for masters in capable.values() for candidate in masters
+    }
+    return capable, get_busy_intervals(master_ids, booking_date)
+
+
+def _combo_start_times(
+    procedures,
+    booking_date,
+    capable,
+    busy,
+    master_id,
+    working_hours,
+    now,
+):
+    start_time, end_time, interval = working_hours
+    slot = datetime.combine(booking_date, start_time)
+    day_end = datetime.combine(booking_date, end_time)
+    times = []
+    while slot < day_end:
+        if booking_date != now.date() or slot.time() > now.time():
+            plan = plan_combo(
+                procedures,
+                booking_date,
+                slot.time(),
+                capable,
+                busy,
+                master_id=master_id,
+                end_time=end_time,
+            )
+            if plan is not None:
+                times.append(slot.time())
+        slot += timedelta(minutes=interval)
+    return times
+
+
+def find_combo_times(procedures, booking_date, master_id=None):
+    """
+    Время начала, с которого все процедуры помещаются подряд.
+    Три запроса на весь день независимо от числа процедур и мастеров.
+    """
+    working_hours = get_working_hours()
+    capable, busy = _load_masters_and_busy(procedures, booking_date)
+    times = _combo_start_times(
+        procedures,
+        booking_date,
+        capable,
+        busy,
+        master_id,
+        working_hours,
+        timezone.localtime(timezone.now()),
+    )
+    return [slot.strftime('%H:%M') for slot in times]
+
+
+def get_series_dates(start_date, weeks_step, occurrences):
+    """Даты серии: start_date и далее через weeks_step недель."""
+    return [
+        start_date + timedelta(weeks=weeks_step * number)
+        for number in range(occurrences)
+    ]
+
+
+def _nearest_times(times, start_time, limit):
+    def distance(slot):
+        return abs(
+            datetime.combine(date.min, slot)
+            - datetime.combine(date.min, start_time)
+        )
+    return sorted(sorted(times, key=distance)[:limit])
+
+
+def plan_series(procedures, dates, start_time, master_id, alternatives=0):
+    """
+    Раскладывает процедуры на каждую дату серии.
+
+    Занятость мастеров за весь период загружается одним запросом по
+    диапазону дат, дальше все проверки идут в памяти. Возвращает
+    (планы {дата: план plan_combo}, конфликты {дата: [время, ...]}),
+    где для занятой даты перечислены до alternatives ближайших
+    свободных времен того же дня.
+    """
+    working_hours = get_working_hours()
+    capable = get_capable_masters([procedure.pk for procedure in procedures])
+    master_ids = {
+        candidate for masters in capable.values() for candidate in masters
+    }
+    busy = get_busy_intervals_between(master_ids, dates[0], dates[-1])
+    now = timezone.localtime(timezone.now())
+
+    plans = {}
+    conflicts = {}
+    for series_date in dates:
+        plan = plan_combo(
+            procedures,
+            series_date,
+            start_time,
+            capable,
+            busy[series_date],
+            master_id=master_id,
+            end_time=working_hours[1],
+        )
+        if plan is not None:
+            plans[series_date] = plan
+            continue
+        free_times = _combo_start_times(
+            procedures,
+            series_date,
+            capable,
+            busy[series_date],
+            master_id,
+            working_hours,
+            now,
+        ) if alternatives else []
+        conflicts[series_date] = _nearest_times(
+            free_times, start_time, alternatives
+        )
+    return plans, conflicts
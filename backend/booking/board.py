@@ -0,0 +1,233 @@
+"""
+Календарь записей в админке: неделя по мастерам и перенос записи.
+
+Все записи недели читаются одним запросом с мастерами и процедурами
+(select_related). Перенос проверяется на сервере под блокировкой
+мастера, как и создание записи, поэтому две параллельные правки не
+займут одно время.
+"""
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+
+from django.db import transaction
+from django.utils import timezone
+from loguru import logger
+
+from core.metrics import counter
+from masters.models import Master
+from notifications.reminder_utils import schedule_reminder_for_booking
+from notifications.telegram_utils import send_client_notification
+from .availability import get_working_hours, is_slot_free
+from .constants import (
+    ACTIVE_BOOKING_STATUSES,
+    CALENDAR_DAYS,
+    MSG_CALENDAR_BAD_PARAMS,
+    MSG_CALENDAR_NOT_ACTIVE,
+    MSG_CALENDAR_NOT_CAPABLE,
+    MSG_CALENDAR_NOT_FOUND,
+    MSG_CALENDAR_OUTSIDE_HOURS,
+    MSG_CALENDAR_PAST,
+    MSG_CALENDAR_SLOT_TAKEN,
+    STATUS_CANCELLED,
+)
+from .models import Booking
+from .waitlist import offer_slot_on_commit
+
+CALENDAR_MOVES = counter(
+    'booking_calendar_moves_total',
+    'Переносы записей в календаре админки',
+    labelnames=['result'],
+)
+
+
+class RescheduleError(Exception):
+    """Запись нельзя перенести; текст показывается в календаре."""
+
+
+def get_week_start(day):
+    """Понедельник недели, в которую входит day."""
+    return day - timedelta(days=day.weekday())
+
+
+def get_time_slots(start_time, end_time, interval):
+    """Времена начала шагов рабочего дня."""
+    cursor = datetime.combine(date.min, start_time)
+    end = datetime.combine(date.min, end_time)
+    slots = []
+    while cursor < end:
+        slots.append(cursor.time())
+        cursor += timedelta(minutes=interval)
+    return slots or [start_time]
+
+
+def _slot_index(booking_time, start_time, interval, count):
+    """Шаг, в который попадает начало записи (вне дня - крайний)."""
+    offset = (
+        datetime.combine(date.min, booking_time)
+        - datetime.combine(date.min, start_time)
+    )
+    index = int(offset.total_seconds() // 60) // interval
+    return min(max(index, 0), count - 1)
+
+
+def _is_movable(booking, now):
+    start = timezone.make_aware(
+        datetime.combine(booking.booking_date, booking.booking_time)
+    )
+    return booking.status in ACTIVE_BOOKING_STATUSES and start >= now
+
+
+def get_week_board(week_start, master_id=None):
+    """
+    Сетка недели по мастерам:
+    [{'master': Master, 'rows': [{'time': время, 'cells': [{'date': дата,
+    'bookings': [Booking, ...]}, ...]}, ...]}, ...].
+
+    Строки - шаги рабочего дня, колонки - дни. Запись стоит в ячейке
+    своего начала, отмененные не показываются. У записи выставлен
+    признак is_movable: активная и еще не началась.
+    """
+    days = [
+        week_start + timedelta(days=offset)
+        for offset in range(CALENDAR_DAYS)
+    ]
+    start_time, end_time, interval = get_working_hours()
+    slots = get_time_slots(start_time, end_time, interval)
+
+    masters = Master.objects.filter(is_active=True).order_by('name')
+    bookings = Booking.objects.filter(
+        booking_date__range=(days[0], days[-1]),
+    ).exclude(
+        status=STATUS_CANCELLED
+    ).select_related('master', 'procedure').order_by('booking_time')
+    if master_id is not None:
+        masters = masters.filter(pk=master_id)
+        bookings = bookings.filter(master_id=master_id)
+    masters = list(masters)
+
+    now = timezone.now()
+    cells = defaultdict(list)
+    known = {master.pk for master in masters}
+    for booking in bookings:
+        booking.is_movable = _is_movable(booking, now)
+        index = _slot_index(
+            booking.booking_time, start_time, interval, len(slots)
+        )
+        cells[(booking.master_id, booking.booking_date, index)].append(
+            booking
+        )
+        # Записи неактивного мастера тоже видны
+        if booking.master_id not in known:
+            known.add(booking.master_id)
+            masters.append(booking.master)
+    masters.sort(key=lambda master: master.name)
+
+    return [
+        {
+            'master': master,
+            'rows': [
+                {
+                    'time': slot,
+                    'cells': [
+                        {
+                            'date': day,
+                            'bookings': cells[(master.pk, day, index)],
+                        }
+                        for day in days
+                    ],
+                }
+                for index, slot in enumerate(slots)
+            ],
+        }
+        for master in masters
+    ]
+
+
+def _check_move(booking, master, booking_date, booking_time):
+    start = datetime.combine(booking_date, booking_time)
+    if timezone.make_aware(start) < timezone.now():
+        raise RescheduleError(MSG_CALENDAR_PAST)
+    if booking.status not in ACTIVE_BOOKING_STATUSES:
+        raise RescheduleError(MSG_CALENDAR_NOT_ACTIVE)
+
+    duration = booking.procedure.duration
+    day_start, day_end, _ = get_working_hours()
+    if (
+        booking_time < day_start
+        or start + duration > datetime.combine(booking_date, day_end)
+    ):
+        raise RescheduleError(MSG_CALENDAR_OUTSIDE_HOURS)
+    if (
+        master.pk != booking.master_id
+        and not master.procedures.filter(pk=booking.procedure_id).exists()
+    ):
+        raise RescheduleError(MSG_CALENDAR_NOT_CAPABLE.format(
+            master.name, booking.procedure.title
+        ))
+    if not is_slot_free(
+        master.pk,
+        booking_date,
+        booking_time,
+        duration,
+        exclude_pks=[booking.pk],
+    ):
+        raise RescheduleError(MSG_CALENDAR_SLOT_TAKEN.format(master.name))
+
+
+def move_booking(pk, master_id, booking_date, booking_time):
+    """
+    Переносит активную запись к мастеру на дату и время.
+
+    Проверяются рабочее время, умение мастера и пересечение с другими
+    его записями; мастер блокируется на время проверки и сохранения.
+    Сигналы post_save сбрасывают .ics-ленты и сводки прежнего и нового
+    дня. Напоминание планируется заново, а после коммита прежнее время
+    предлагается листу ожидания и клиент получает уведомление о
+    переносе. Возвращает запись или бросает RescheduleError.
+    """
+    try:
+        with transaction.atomic():
+            master = Master.objects.select_for_update().filter(
+                pk=master_id, is_active=True
+            ).first()
+            if master is None:
+                raise RescheduleError(MSG_CALENDAR_BAD_PARAMS)
+            booking = Booking.objects.select_for_update(
+                of=('self',)
+            ).select_related('procedure').filter(pk=pk).first()
+            if booking is None:
+                raise RescheduleError(MSG_CALENDAR_NOT_FOUND)
+
+            _check_move(booking, master, booking_date, booking_time)
+            old_slot = (
+                booking.master_id, booking.booking_date, booking.booking_time
+            )
+            if old_slot == (master.pk, booking_date, booking_time):
+                return booking
+            booking.master = master
+            booking.booking_date = booking_date
+            booking.booking_time = booking_time
+            schedule_reminder_for_booking(booking, save_changes=False)
+            booking.save(update_fields=[
+                'master',
+                'booking_date',
+                'booking_time',
+                'reminder_sent',
+                'reminder_sent_at',
+                'needs_confirmation',
+                'updated_at',
+            ])
+            offer_slot_on_commit(booking.procedure, *old_slot)
+            transaction.on_commit(lambda: _notify_client(booking))
+    except RescheduleError:
+        CALENDAR_MOVES.inc(result='rejected')
+        raise
+    CALENDAR_MOVES.inc(result='moved')
+    return booking
+
+
+def _notify_client(booking):
+    try:
+        send_client_notification(booking, 'rescheduled')
+    except Exception:
+        logger.exception('Ошибка уведомления клиента о переносе записи')
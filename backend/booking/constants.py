@@ -72,3 +72,97 @@ AJAX_ERROR_RESPONSE = []
 
 # Status lists for filtering
 ACTIVE_BOOKING_STATUSES = [STATUS_PENDING, STATUS_CONFIRMED, STATUS_PAID]
+ARCHIVABLE_BOOKING_STATUSES = [
+    STATUS_COMPLETED,
+    STATUS_CANCELLED,
+    STATUS_NO_SHOW,
+]
+
+# Archive
+ARCHIVE_AFTER_DAYS_DEFAULT = 90
+ARCHIVE_BATCH_SIZE = 500
+PROCEDURE_TITLE_MAX_LENGTH = 128
+
+# Combo bookings: сколько процедур можно добавить к основной
+MAX_COMBO_EXTRA_PROCEDURES = 4
+MSG_COMBO_UNAVAILABLE = (
+    'С выбранного времени нельзя выполнить все процедуры подряд. '
+    'Выберите другое время.'
+)
+MSG_SLOT_TAKEN = 'Время {} уже занято, выберите другое.'
+
+# Recurring series: правило -> шаг в неделях
+SERIES_NONE = ''
+SERIES_WEEKLY = 'weekly'
+SERIES_BIWEEKLY = 'biweekly'
+SERIES_RULE_CHOICES = [
+    (SERIES_NONE, 'Не повторять'),
+    (SERIES_WEEKLY, 'Каждую неделю'),
+    (SERIES_BIWEEKLY, 'Раз в две недели'),
+]
+SERIES_RULE_WEEKS = {
+    SERIES_WEEKLY: 1,
+    SERIES_BIWEEKLY: 2,
+}
+SERIES_MIN_OCCURRENCES = 2
+SERIES_MAX_OCCURRENCES = 12
+# Самая длинная серия по умолчанию (раз в две недели) укладывается
+# в MAX_BOOKING_DAYS_AHEAD: 6 сеансов занимают 70 дней
+SERIES_DEFAULT_OCCURRENCES = 6
+MSG_SERIES_TOO_LONG = (
+    'Последний сеанс серии позже {} дней вперед. С этой даты можно '
+    'записаться не больше чем на {} сеансов.'
+)
+# Сколько ближайших свободных времен предлагать вместо занятого
+SERIES_ALTERNATIVES_LIMIT = 3
+MSG_SERIES_CONFLICTS = (
+    'Часть дат серии занята. Выберите другое время, '
+    'включите пропуск занятых дат или запишитесь на свободное время '
+    'отдельно:'
+)
+MSG_SERIES_CONFLICT_ITEM = '{date}: занято, свободно {alternatives}'
+MSG_SERIES_NO_ALTERNATIVES = 'нет свободного времени'
+MSG_SERIES_ALL_TAKEN = 'Все даты серии заняты. Выберите другое время.'
+MSG_SERIES_SKIPPED = 'Не записаны занятые даты: {}'
+
+# iCalendar-лента мастера
+ICS_SIGNER_SALT = 'booking.master_calendar'
+ICS_CACHE_KEY = 'booking_ics_{master_id}'
+# Подстраховка, если кеш не общий для воркеров и сигнал не дошел
+ICS_CACHE_TIMEOUT = 5 * 60
+ICS_FEED_DAYS_BEHIND = 7
+ICS_FEED_DAYS_AHEAD = MAX_BOOKING_DAYS_AHEAD
+ICS_PRODID = '-//AlenkA//Booking//RU'
+ICS_DATETIME_FORMAT = '%Y%m%dT%H%M%SZ'
+ICS_LINE_LIMIT = 75
+ICS_CONTENT_TYPE = 'text/calendar; charset=utf-8'
+ICS_STATUSES = {
+    STATUS_PENDING: 'TENTATIVE',
+    STATUS_CONFIRMED: 'CONFIRMED',
+    STATUS_PAID: 'CONFIRMED',
+    STATUS_CANCELLED: 'CANCELLED',
+}
+
+# Waitlist
+WAITLIST_WAITING = 'waiting'
+WAITLIST_OFFERED = 'offered'
+WAITLIST_BOOKED = 'booked'
+WAITLIST_EXPIRED = 'expired'
+OFFER_PENDING = 'pending'
+OFFER_ACCEPTED = 'accepted'
+OFFER_DECLINED = 'declined'
+OFFER_EXPIRED = 'expired'
+WAITLIST_STATUS_MAX_LENGTH = 10
+WAITLIST_OFFER_TTL_MINUTES_DEFAULT = 30
+
+# Календарь записей в админке
+CALENDAR_WEEK_PARAM = 'week'
+CALENDAR_MASTER_PARAM = 'master'
+CALENDAR_DAYS = 7
+MSG_CALENDAR_BAD_PARAMS = 'Неверные параметры переноса.'
+MSG_CALENDAR_NOT_FOUND = 'Запись не найдена.'
+MSG_CALENDAR_NOT_ACTIVE = 'Переносить можно только активные записи.'
+MSG_CALENDAR_PAST = 'Нельзя перенести запись в прошлое.'
+MSG_CALENDAR_OUTSIDE_HOURS = 'Запись выходит за рабочее время.'
+MSG_CALENDAR_NOT_CAPABLE = 'Мастер {} не выполняет процедуру «{}».'
+MSG_CALENDAR_SLOT_TAKEN = 'У мастера {} уже есть запись в это время.'
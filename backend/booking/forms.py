@@ -8,13 +8,27 @@ from django.utils.safestring import mark_safe
 
 from catalog.models import Procedure
 from masters.models import Master
+from .availability import get_series_dates, plan_series
 from .constants import (
     MAX_BOOKING_DAYS_AHEAD,
+    MAX_COMBO_EXTRA_PROCEDURES,
+    MSG_COMBO_UNAVAILABLE,
+    MSG_SERIES_ALL_TAKEN,
+    MSG_SERIES_CONFLICT_ITEM,
+    MSG_SERIES_CONFLICTS,
+    MSG_SERIES_NO_ALTERNATIVES,
+    MSG_SERIES_TOO_LONG,
     NOTIFICATION_EMAIL,
     NOTIFICATION_TELEGRAM,
     PHONE_MAX_LENGTH,
     PHONE_NORMALIZED_LENGTH,
     PHONE_PREFIX,
+    SERIES_ALTERNATIVES_LIMIT,
+    SERIES_DEFAULT_OCCURRENCES,
+    SERIES_MAX_OCCURRENCES,
+    SERIES_MIN_OCCURRENCES,
+    SERIES_RULE_CHOICES,
+    SERIES_RULE_WEEKS,
 )
 from .models import Booking
 
@@ -106,6 +120,40 @@ class BookingForm(forms.ModelForm):
         widget=forms.Select(attrs={'class': 'form-select'}),
         label='Мастер'
     )
+    extra_procedures = forms.ModelMultipleChoiceField(
+        queryset=Procedure.objects.none(),
+        required=False,
+        widget=forms.SelectMultiple(attrs={
+            'class': 'form-select',
+            'id': 'id_extra_procedures',
+        }),
+        label='Добавить процедуры подряд',
+    )
+    series_rule = forms.ChoiceField(
+        choices=SERIES_RULE_CHOICES,
+        required=False,
+        widget=forms.Select(attrs={
+            'class': 'form-select',
+            'id': 'id_series_rule',
+        }),
+        label='Повторять',
+    )
+    series_count = forms.IntegerField(
+        min_value=SERIES_MIN_OCCURRENCES,
+        max_value=SERIES_MAX_OCCURRENCES,
+        initial=SERIES_DEFAULT_OCCURRENCES,
+        required=False,
+        widget=forms.NumberInput(attrs={
+            'class': 'form-control',
+            'id': 'id_series_count',
+        }),
+        label='Количество сеансов',
+    )
+    skip_conflicts = forms.BooleanField(
+        required=False,
+        widget=forms.CheckboxInput(attrs={'class': 'form-check-input'}),
+        label='Записать только на свободные даты',
+    )
 
     class Meta:
         model = Booking
@@ -145,8 +193,13 @@ class BookingForm(forms.ModelForm):
             'procedure'
         ].queryset = Procedure.objects.filter(  # type: ignore
             is_available=True
-        )
+        ).select_related('category')
         self.fields['procedure'].required = True
+        self.fields['extra_procedures'].queryset = Procedure.objects.filter(
+            is_available=True
+        ).select_related('category')
+        self.series_plans = {}
+        self.series_conflicts = {}
 
         today = timezone.now().date()
         self.fields['booking_date'].widget.attrs['min'] = today.isoformat()
@@ -217,3 +270,111 @@ class BookingForm(forms.ModelForm):
             raise ValidationError('Введите корректный номер телефона')
 
         return phone
+
+    def clean_extra_procedures(self):
+        """Дополнительные процедуры в порядке, выбранном клиентом."""
+        extra = list(self.cleaned_data['extra_procedures'])
+        if len(extra) > MAX_COMBO_EXTRA_PROCEDURES:
+            raise ValidationError(
+                f'Можно добавить не больше {MAX_COMBO_EXTRA_PROCEDURES} '
+                f'процедур'
+            )
+        order = {
+            str(procedure_id): index
+            for index, procedure_id in enumerate(
+                self.data.getlist('extra_procedures')
+            )
+        }
+        return sorted(extra, key=lambda procedure: order[str(procedure.pk)])
+
+    def clean(self):
+        """
+        Для нескольких процедур или серии проверяет, что на каждую дату
+        есть непрерывный свободный блок.
+        """
+        cleaned_data = super().clean()
+        extra = cleaned_data.get('extra_procedures') or []
+        weeks_step = SERIES_RULE_WEEKS.get(cleaned_data.get('series_rule'))
+        required = [
+            cleaned_data.get(name)
+            for name in ('procedure', 'master', 'booking_date', 'booking_time')
+        ]
+        if not (extra or weeks_step) or not all(required):
+            return cleaned_data
+
+        procedure, master, booking_date, booking_time = required
+        max_date = timezone.now().date() + timedelta(
+            days=MAX_BOOKING_DAYS_AHEAD
+        )
+        occurrences = 1
+        if weeks_step:
+            # Сколько сеансов с этим шагом помещается до max_date
+            max_occurrences = (
+                (max_date - booking_date).days // (7 * weeks_step) + 1
+            )
+            occurrences = cleaned_data.get('series_count') or min(
+                SERIES_DEFAULT_OCCURRENCES, max_occurrences
+            )
+            if occurrences > max_occurrences:
+                raise ValidationError(MSG_SERIES_TOO_LONG.format(
+                    MAX_BOOKING_DAYS_AHEAD, max_occurrences
+                ))
+        dates = get_series_dates(booking_date, weeks_step or 1, occurrences)
+
+        self.series_plans, self.series_conflicts = plan_series(
+            [procedure] + extra,
+            dates,
+            booking_time,
+            master.pk,
+            alternatives=SERIES_ALTERNATIVES_LIMIT if weeks_step else 0,
+        )
+        if not weeks_step:
+            if self.series_conflicts:
+                raise ValidationError(MSG_COMBO_UNAVAILABLE)
+        elif not self.series_plans:
+            raise ValidationError(MSG_SERIES_ALL_TAKEN)
+        elif self.series_conflicts and not cleaned_data.get('skip_conflicts'):
+            raise ValidationError(
+                [MSG_SERIES_CONFLICTS] + self.get_conflict_descriptions()
+            )
+        return cleaned_data
+
+    def get_conflict_descriptions(self):
+        """Занятые даты серии с ближайшим свободным временем."""
+        return [
+            MSG_SERIES_CONFLICT_ITEM.format(
+                date=conflict_date.strftime('%d.%m.%Y'),
+                alternatives=', '.join(
+                    slot.strftime('%H:%M') for slot in alternatives
+                ) or MSG_SERIES_NO_ALTERNATIVES,
+            )
+            for conflict_date, alternatives in sorted(
+                self.series_conflicts.items()
+            )
+        ]
+
+    def get_items(self):
+        """
+        Процедуры записи по порядку для сессии:
+        [{'procedure_id', 'master_id', 'booking_date', 'booking_time'}, ...].
+        """
+        if self.series_plans:
+            return [
+                {
+                    'procedure_id': procedure.pk,
+                    'master_id': master_id,
+                    'booking_date': plan_date.isoformat(),
+                    'booking_time': booking_time.isoformat(),
+                }
+                for plan_date, plan in sorted(self.series_plans.items())
+                for procedure, master_id, booking_time in plan
+            ]
+        return [{
+            'procedure_id': self.cleaned_data['procedure'].pk,
+            'master_id': self.cleaned_data['master'].pk,
+            'booking_date': self.cleaned_data['booking_date'].isoformat(),
+            'booking_time': self.cleaned_data['booking_time'].isoformat(),
+        }]
+
+    def is_series(self):
+        return self.cleaned_data.get('series_rule') in SERIES_RULE_WEEKS
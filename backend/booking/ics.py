@@ -0,0 +1,196 @@
+"""
+Лента iCalendar (.ics) с записями мастера для календарных приложений.
+
+Ссылка на ленту подписана (django.core.signing), поэтому ее нельзя
+подобрать перебором id мастеров. Готовая лента кешируется на мастера
+вместе с ETag и Last-Modified и сбрасывается сигналами Booking, поэтому
+периодические опросы календаря обходятся без запросов к БД.
+"""
+import hashlib
+from datetime import datetime, timedelta
+
+from django.core import signing
+from django.core.cache import cache
+from django.db import transaction
+from django.urls import reverse
+from django.utils import timezone
+
+from .constants import (
+    ACTIVE_BOOKING_STATUSES,
+    ICS_CACHE_KEY,
+    ICS_CACHE_TIMEOUT,
+    ICS_DATETIME_FORMAT,
+    ICS_FEED_DAYS_AHEAD,
+    ICS_FEED_DAYS_BEHIND,
+    ICS_LINE_LIMIT,
+    ICS_PRODID,
+    ICS_SIGNER_SALT,
+    ICS_STATUSES,
+    STATUS_CANCELLED,
+)
+from masters.models import Master
+from .models import Booking
+
+
+def _signer():
+    return signing.Signer(salt=ICS_SIGNER_SALT)
+
+
+def make_feed_token(master_id):
+    return _signer().sign(str(master_id))
+
+
+def get_feed_url(master_id):
+    return reverse(
+        'booking:master_calendar', args=[make_feed_token(master_id)]
+    )
+
+
+def unsign_feed_token(token):
+    """id мастера из подписи или None, если подпись неверна."""
+    try:
+        return int(_signer().unsign(token))
+    except (signing.BadSignature, ValueError):
+        return None
+
+
+def _escape(value):
+    return (
+        str(value)
+        .replace('\\', '\\\\')
+        .replace(';', '\\;')
+        .replace(',', '\\,')
+        .replace('\n', '\\n')
+    )
+
+
+def _fold(line):
+    """Перенос строк длиннее 75 октетов (RFC 5545, 3.1)."""
+    encoded = line.encode('utf-8')
+    if len(encoded) <= ICS_LINE_LIMIT:
+        return line
+    parts = []
+    current = ''
+    limit = ICS_LINE_LIMIT
+    for char in line:
+        if len((current + char).encode('utf-8')) > limit:
+            parts.append(current)
+            current = ''
+            # Строка продолжения начинается с пробела
+            limit = ICS_LINE_LIMIT - 1
+        current += char
+    parts.append(current)
+    return '\r\n '.join(parts)
+
+
+def _format_utc(value):
+    return value.astimezone(timezone.utc).strftime(ICS_DATETIME_FORMAT)
+
+
+def _render_event(booking, stamp):
+    start = timezone.make_aware(
+        datetime.combine(booking.booking_date, booking.booking_time)
+    )
+    end = start + booking.procedure.duration
+    description = '\n'.join([
+        f'Клиент: {booking.client_name}',
+        f'Телефон: {booking.client_phone}',
+        f'Статус: {booking.get_status_display()}',
+    ])
+    lines = [
+        'BEGIN:VEVENT',
+        f'UID:{booking.booking_id}',
+        f'DTSTAMP:{stamp}',
+        f'LAST-MODIFIED:{_format_utc(booking.updated_at)}',
+        f'DTSTART:{_format_utc(start)}',
+        f'DTEND:{_format_utc(end)}',
+        'SUMMARY:' + _escape(
+            f'{booking.procedure.title} - {booking.client_name}'
+        ),
+        f'DESCRIPTION:{_escape(description)}',
+        f'STATUS:{ICS_STATUSES[booking.status]}',
+        'END:VEVENT',
+    ]
+    return [_fold(line) for line in lines]
+
+
+def build_feed(master_id):
+    """
+    Лента мастера: {'body', 'etag', 'last_modified'} или None, если
+    мастера нет.
+
+    Записи выбираются одним запросом по диапазону дат. Отмененные
+    остаются в ленте со STATUS:CANCELLED, чтобы календарь убрал событие,
+    а Last-Modified сдвинулся при отмене.
+    """
+    master = Master.objects.filter(pk=master_id).first()
+    if master is None:
+        return None
+
+    today = timezone.localdate()
+    bookings = list(
+        Booking.objects
+        .filter(
+            master=master,
+            booking_date__range=(
+                today - timedelta(days=ICS_FEED_DAYS_BEHIND),
+                today + timedelta(days=ICS_FEED_DAYS_AHEAD),
+            ),
+            status__in=ACTIVE_BOOKING_STATUSES + [STATUS_CANCELLED],
+        )
+        .select_related('procedure')
+        .order_by('booking_date', 'booking_time')
+    )
+    last_modified = max(
+        (booking.updated_at for booking in bookings),
+        default=timezone.now(),
+    ).replace(microsecond=0)
+    stamp = _format_utc(last_modified)
+
+    lines = [
+        'BEGIN:VCALENDAR',
+        'VERSION:2.0',
+        f'PRODID:{ICS_PRODID}',
+        'CALSCALE:GREGORIAN',
+        'METHOD:PUBLISH',
+        _fold(f'X-WR-CALNAME:{_escape(master.name)}'),
+    ]
+    for booking in bookings:
+        lines.extend(_render_event(booking, stamp))
+    lines.append('END:VCALENDAR')
+    body = '\r\n'.join(lines) + '\r\n'
+
+    return {
+        'body': body,
+        'etag': hashlib.md5(body.encode('utf-8')).hexdigest(),
+        'last_modified': last_modified,
+    }
+
+
+def get_feed(master_id):
+    """Лента из кеша; строится заново после изменения записей мастера."""
+    key = ICS_CACHE_KEY.format(master_id=master_id)
+    feed = cache.get(key)
+    if feed is None:
+        feed = build_feed(master_id)
+        if feed is not None:
+            cache.set(key, feed, ICS_CACHE_TIMEOUT)
+    return feed
+
+
+def invalidate_feeds(master_ids):
+    """Сбрасывает ленты мастеров после коммита транзакции."""
+    keys = [
+        ICS_CACHE_KEY.format(master_id=master_id)
+        for master_id in set(master_ids)
+        if master_id is not None
+    ]
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def invalidate_booking_feed(sender, instance, **kwargs):
+    """
+    Обработчик post_save/post_delete Booking. При переносе записи к
+    другому мастеру сбрасывается и лента прежнего.
+    """
+    invalidate_feeds([instance.master_id, instance.loaded_master_id])
@@ -0,0 +1,77 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.routers import primary_db
+from reports.rollups import suspend_rollups
+from ...archive import (
+    archive_batch,
+    get_archivable_bookings,
+    get_archive_cutoff,
+)
+from ...constants import ARCHIVE_AFTER_DAYS_DEFAULT, ARCHIVE_BATCH_SIZE
+
+
+class Command(BaseCommand):
+    """
+    Перенос старых завершенных бронирований в архив
+    python manage.py archive_bookings --days 90.
+    """
+
+    help = 'Переносит старые завершенные/отмененные записи в архив'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=getattr(
+                settings,
+                'BOOKING_ARCHIVE_AFTER_DAYS',
+                ARCHIVE_AFTER_DAYS_DEFAULT,
+            ),
+            help='Архивировать записи старше указанного числа дней',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=ARCHIVE_BATCH_SIZE,
+            help='Размер пачки (одна транзакция на пачку)',
+        )
+        parser.add_argument(
+            '--max-batches',
+            type=int,
+            default=None,
+            help='Остановиться после указанного числа пачек',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только посчитать записи для архивации',
+        )
+
+    def handle(self, *args, **options):
+        cutoff = get_archive_cutoff(options['days'])
+        # Архив входит в сводки, перенос их не меняет
+        with primary_db(), suspend_rollups():
+            if options['dry_run']:
+                count = get_archivable_bookings(cutoff).count()
+                self.stdout.write(
+                    f'📋 К архивации: {count} записей до {cutoff}'
+                )
+                return
+
+            total = 0
+            batches = 0
+            while (
+                options['max_batches'] is None
+                or batches < options['max_batches']
+            ):
+                moved = archive_batch(cutoff, options['batch_size'])
+                if not moved:
+                    break
+                total += moved
+                batches += 1
+                self.stdout.write(f'📦 Пачка {batches}: {moved} записей')
+
+        self.stdout.write(
+            self.style.SUCCESS(f'🎉 Перенесено в архив: {total} записей')
+        )
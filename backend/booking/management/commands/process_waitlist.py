@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from core.routers import primary_db
+from ...waitlist import expire_entries, expire_offers
+
+
+class Command(BaseCommand):
+    """
+    Обслуживание листа ожидания (запускать по cron раз в несколько минут)
+    python manage.py process_waitlist.
+
+    Просроченные предложения закрываются, их слоты уходят следующим
+    по приоритету заявкам; заявки с прошедшим диапазоном дат истекают.
+    """
+
+    help = 'Закрывает просроченные предложения листа ожидания'
+
+    def handle(self, *args, **options):
+        with primary_db():
+            offers = expire_offers()
+            entries = expire_entries()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'🎉 Истекло предложений: {offers}, заявок: {entries}'
+            )
+        )
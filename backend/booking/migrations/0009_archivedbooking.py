@@ -0,0 +1,58 @@
+# Generated by Django 3.2.16 on 2026-10-19 12:01
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0003_procedure_title_id_index'),
+        ('masters', '0004_alter_master_is_contact_phone'),
+        ('user', '0006_alter_client_notification_method'),
+        ('booking', '0008_auto_20251118_1307'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedBooking',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('booking_id', models.UUIDField(editable=False, unique=True, verbose_name='ID брони')),
+                ('procedure_title', models.CharField(max_length=128, verbose_name='Название процедуры')),
+                ('procedure_price', models.DecimalField(decimal_places=2, max_digits=10, verbose_name='Цена процедуры')),
+                ('procedure_duration', models.DurationField(verbose_name='Продолжительность')),
+                ('master_name', models.CharField(max_length=100, verbose_name='Имя мастера')),
+                ('booking_date', models.DateField(verbose_name='Дата записи')),
+                ('booking_time', models.TimeField(verbose_name='Время записи')),
+                ('client_name', models.CharField(max_length=100, verbose_name='Имя клиента')),
+                ('client_phone', models.CharField(max_length=20, verbose_name='Телефон клиента')),
+                ('client_email', models.EmailField(blank=True, max_length=254, null=True, verbose_name='Email клиента')),
+                ('notification_method', models.CharField(choices=[('telegram', 'Telegram'), ('email', 'Email')], max_length=10, verbose_name='Способ уведомления')),
+                ('status', models.CharField(choices=[('pending', '⏳ Ожидает подтверждения'), ('confirmed', '✅ Подтверждено'), ('completed', '✅ Завершено'), ('cancelled', '❌ Отменено'), ('paid', '💰 Оплачено'), ('no_show', '🚫 Не пришел')], max_length=25, verbose_name='Статус')),
+                ('payment_status', models.CharField(choices=[('pending', '⏳ Ожидает оплаты'), ('paid', '✅ Оплачено'), ('not_required', '❌ Не требуется')], max_length=20, verbose_name='Статус оплаты')),
+                ('prepayment_required', models.BooleanField(default=False, verbose_name='Требуется предоплата')),
+                ('admin_notes', models.TextField(blank=True, verbose_name='Заметки администратора')),
+                ('created_at', models.DateTimeField(verbose_name='Создано')),
+                ('updated_at', models.DateTimeField(verbose_name='Обновлено')),
+                ('confirmed_at', models.DateTimeField(blank=True, null=True, verbose_name='Подтверждено')),
+                ('archived_at', models.DateTimeField(auto_now_add=True, verbose_name='Перенесено в архив')),
+                ('client', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='user.client', verbose_name='Клиент')),
+                ('master', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='masters.master', verbose_name='Мастер')),
+                ('procedure', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='catalog.procedure', verbose_name='Процедура')),
+            ],
+            options={
+                'verbose_name': 'Архивное бронирование',
+                'verbose_name_plural': 'Архив бронирований',
+                'ordering': ['-booking_date', '-booking_time'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='archivedbooking',
+            index=models.Index(fields=['booking_date', 'master'], name='booking_arc_booking_6a2a47_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedbooking',
+            index=models.Index(fields=['client_phone'], name='booking_arc_client__9318fb_idx'),
+        ),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 3.2.16 on 2026-10-19 12:22
+
+from django.db import migrations, models
+import django.db.models.deletion
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0006_alter_client_notification_method'),
+        ('catalog', '0003_procedure_title_id_index'),
+        ('masters', '0004_alter_master_is_contact_phone'),
+        ('booking', '0009_archivedbooking'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WaitlistEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date_from', models.DateField(verbose_name='С даты')),
+                ('date_to', models.DateField(verbose_name='По дату')),
+                ('priority', models.PositiveSmallIntegerField(default=0, help_text='Заявки с большим приоритетом получают предложение первыми', verbose_name='Приоритет')),
+                ('status', models.CharField(choices=[('waiting', '⏳ Ожидает'), ('offered', '📨 Отправлено предложение'), ('booked', '✅ Записан'), ('expired', '⌛ Истекла')], default='waiting', max_length=10, verbose_name='Статус')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Создано')),
+                ('client', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='waitlist_entries', to='user.client', verbose_name='Клиент')),
+                ('master', models.ForeignKey(blank=True, help_text='Пусто - подойдет любой мастер', null=True, on_delete=django.db.models.deletion.CASCADE, to='masters.master', verbose_name='Мастер')),
+                ('procedure', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='catalog.procedure', verbose_name='Процедура')),
+            ],
+            options={
+                'verbose_name': 'Заявка в листе ожидания',
+                'verbose_name_plural': 'Лист ожидания',
+                'ordering': ['-priority', 'created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='WaitlistOffer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.UUIDField(default=uuid.uuid4, editable=False, unique=True, verbose_name='Токен')),
+                ('booking_date', models.DateField(verbose_name='Дата записи')),
+                ('booking_time', models.TimeField(verbose_name='Время записи')),
+                ('status', models.CharField(choices=[('pending', '⏳ Ожидает ответа'), ('accepted', '✅ Принято'), ('declined', '❌ Отклонено'), ('expired', '⌛ Истекло')], default='pending', max_length=10, verbose_name='Статус')),
+                ('expires_at', models.DateTimeField(verbose_name='Действует до')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Создано')),
+                ('booking', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='booking.booking', verbose_name='Созданная запись')),
+                ('entry', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='offers', to='booking.waitlistentry', verbose_name='Заявка')),
+                ('master', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='masters.master', verbose_name='Мастер')),
+            ],
+            options={
+                'verbose_name': 'Предложение из листа ожидания',
+                'verbose_name_plural': 'Предложения из листа ожидания',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='waitlistoffer',
+            index=models.Index(fields=['status', 'expires_at'], name='booking_wai_status_3deb56_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='waitlistoffer',
+            index=models.Index(fields=['master', 'booking_date', 'booking_time'], name='booking_wai_master__53cd76_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='waitlistentry',
+            index=models.Index(condition=models.Q(('status', 'waiting')), fields=['procedure', 'date_from', 'date_to'], name='waitlist_waiting_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.16 on 2026-10-19 12:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0010_waitlist'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='booking',
+            name='group_id',
+            field=models.UUIDField(blank=True, db_index=True, editable=False, help_text='Общий для процедур, записанных подряд', null=True, verbose_name='Комбо-запись'),
+        ),
+    ]
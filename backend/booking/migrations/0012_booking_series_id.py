@@ -0,0 +1,18 @@
+# Generated by Django 3.2.16 on 2026-10-19 12:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0011_booking_group_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='booking',
+            name='series_id',
+            field=models.UUIDField(blank=True, db_index=True, editable=False, help_text='Общий для повторяющихся записей одной серии', null=True, verbose_name='Серия'),
+        ),
+    ]
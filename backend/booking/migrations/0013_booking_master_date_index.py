@@ -0,0 +1,17 @@
+# Generated by Django 3.2.16 on 2026-10-19 12:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0012_booking_series_id'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['master', 'booking_date', 'booking_time'], name='booking_boo_master__054204_idx'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 3.2.16 on 2026-10-19 12:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0013_booking_master_date_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='archivedbooking',
+            index=models.Index(fields=['client', 'booking_date'], name='booking_arc_client__684f64_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['client', 'booking_date'], name='booking_boo_client__0064bd_idx'),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 3.2.16 on 2026-10-19 13:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('booking', '0014_client_booking_date_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedbooking',
+            name='group_id',
+            field=models.UUIDField(blank=True, db_index=True, editable=False, null=True, verbose_name='Комбо-запись'),
+        ),
+        migrations.AddField(
+            model_name='archivedbooking',
+            name='payment_phone',
+            field=models.CharField(blank=True, max_length=20, verbose_name='Телефон для оплаты'),
+        ),
+        migrations.AddField(
+            model_name='archivedbooking',
+            name='series_id',
+            field=models.UUIDField(blank=True, db_index=True, editable=False, null=True, verbose_name='Серия'),
+        ),
+    ]
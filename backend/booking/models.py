@@ -1,6 +1,7 @@
 import uuid
 from datetime import datetime, timedelta, time
 
+from django.core.exceptions import ValidationError
 from django.db import models
 
 from user.models import Client
@@ -15,11 +16,16 @@ from .constants import (
     NOTIFICATION_EMAIL,
     NOTIFICATION_METHOD_MAX_LENGTH,
     NOTIFICATION_TELEGRAM,
+    OFFER_ACCEPTED,
+    OFFER_DECLINED,
+    OFFER_EXPIRED,
+    OFFER_PENDING,
     PAYMENT_NOT_REQUIRED,
     PAYMENT_PAID,
     PAYMENT_PENDING,
     PAYMENT_STATUS_MAX_LENGTH,
     PHONE_MAX_LENGTH,
+    PROCEDURE_TITLE_MAX_LENGTH,
     STATUS_CANCELLED,
     STATUS_COMPLETED,
     STATUS_CONFIRMED,
@@ -27,6 +33,11 @@ from .constants import (
     STATUS_NO_SHOW,
     STATUS_PAID,
     STATUS_PENDING,
+    WAITLIST_BOOKED,
+    WAITLIST_EXPIRED,
+    WAITLIST_OFFERED,
+    WAITLIST_STATUS_MAX_LENGTH,
+    WAITLIST_WAITING,
 )
 
 
@@ -158,6 +169,22 @@ class Booking(models.Model):
         default=True,
         verbose_name='Требует подтверждения',
     )
+    group_id = models.UUIDField(
+        blank=True,
+        null=True,
+        db_index=True,
+        editable=False,
+        verbose_name='Комбо-запись',
+        help_text='Общий для процедур, записанных подряд',
+    )
+    series_id = models.UUIDField(
+        blank=True,
+        null=True,
+        db_index=True,
+        editable=False,
+        verbose_name='Серия',
+        help_text='Общий для повторяющихся записей одной серии',
+    )
 
     class Meta:
         verbose_name = 'Бронирование'
@@ -165,10 +192,31 @@ class Booking(models.Model):
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['booking_date', 'booking_time', 'master']),
+            # Записи одного мастера по датам: календарь, API, .ics
+            models.Index(fields=['master', 'booking_date', 'booking_time']),
+            # История клиента в личном кабинете
+            models.Index(fields=['client', 'booking_date']),
             models.Index(fields=['client_phone']),
             models.Index(fields=['status']),
         ]
 
+    # Значения на момент загрузки из БД: при переносе записи
+    # сбрасываются календарь и сводки прежнего мастера, процедуры и дня,
+    # а сохранение без смены статуса и слота сводки не пересчитывает
+    loaded_master_id = None
+    loaded_procedure_id = None
+    loaded_booking_date = None
+    loaded_status = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.loaded_master_id = instance.__dict__.get('master_id')
+        instance.loaded_procedure_id = instance.__dict__.get('procedure_id')
+        instance.loaded_booking_date = instance.__dict__.get('booking_date')
+        instance.loaded_status = instance.__dict__.get('status')
+        return instance
+
     def __str__(self):
         procedure_title = (
             self.procedure.title if self.procedure else 'No Procedure'
@@ -198,6 +246,303 @@ class Booking(models.Model):
         return self.booking_datetime
 
 
+class ArchivedBooking(models.Model):
+    """
+    Архивная копия завершенного бронирования.
+
+    Данные процедуры и мастера сохраняются снимком, чтобы история
+    не зависела от последующих изменений каталога.
+    """
+
+    booking_id = models.UUIDField(
+        unique=True,
+        editable=False,
+        verbose_name='ID брони',
+    )
+    procedure = models.ForeignKey(
+        'catalog.Procedure',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        verbose_name='Процедура',
+    )
+    procedure_title = models.CharField(
+        max_length=PROCEDURE_TITLE_MAX_LENGTH,
+        verbose_name='Название процедуры',
+    )
+    procedure_price = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        verbose_name='Цена процедуры',
+    )
+    procedure_duration = models.DurationField(
+        verbose_name='Продолжительность',
+    )
+    master = models.ForeignKey(
+        'masters.Master',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        verbose_name='Мастер',
+    )
+    master_name = models.CharField(
+        max_length=NAME_MAX_LENGTH,
+        verbose_name='Имя мастера',
+    )
+    booking_date = models.DateField(verbose_name='Дата записи')
+    booking_time = models.TimeField(verbose_name='Время записи')
+    client = models.ForeignKey(
+        Client,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        verbose_name='Клиент',
+    )
+    client_name = models.CharField(
+        max_length=NAME_MAX_LENGTH,
+        verbose_name='Имя клиента',
+    )
+    client_phone = models.CharField(
+        max_length=PHONE_MAX_LENGTH,
+        verbose_name='Телефон клиента',
+    )
+    client_email = models.EmailField(
+        blank=True,
+        null=True,
+        verbose_name='Email клиента',
+    )
+    notification_method = models.CharField(
+        max_length=NOTIFICATION_METHOD_MAX_LENGTH,
+        choices=Booking.NOTIFICATION_CHOICES,
+        verbose_name='Способ уведомления',
+    )
+    status = models.CharField(
+        max_length=STATUS_MAX_LENGTH,
+        choices=Booking.STATUS_CHOICES,
+        verbose_name='Статус',
+    )
+    payment_status = models.CharField(
+        max_length=PAYMENT_STATUS_MAX_LENGTH,
+        choices=Booking.PAYMENT_STATUS_CHOICES,
+        verbose_name='Статус оплаты',
+    )
+    prepayment_required = models.BooleanField(
+        default=False,
+        verbose_name='Требуется предоплата',
+    )
+    payment_phone = models.CharField(
+        max_length=PHONE_MAX_LENGTH,
+        blank=True,
+        verbose_name='Телефон для оплаты',
+    )
+    group_id = models.UUIDField(
+        blank=True,
+        null=True,
+        db_index=True,
+        editable=False,
+        verbose_name='Комбо-запись',
+    )
+    series_id = models.UUIDField(
+        blank=True,
+        null=True,
+        db_index=True,
+        editable=False,
+        verbose_name='Серия',
+    )
+    admin_notes = models.TextField(
+        blank=True,
+        verbose_name='Заметки администратора',
+    )
+    created_at = models.DateTimeField(verbose_name='Создано')
+    updated_at = models.DateTimeField(verbose_name='Обновлено')
+    confirmed_at = models.DateTimeField(
+        blank=True,
+        null=True,
+        verbose_name='Подтверждено',
+    )
+    archived_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Перенесено в архив',
+    )
+
+    class Meta:
+        verbose_name = 'Архивное бронирование'
+        verbose_name_plural = 'Архив бронирований'
+        ordering = ['-booking_date', '-booking_time']
+        indexes = [
+            models.Index(fields=['booking_date', 'master']),
+            models.Index(fields=['client_phone']),
+            models.Index(fields=['client', 'booking_date']),
+        ]
+
+    def __str__(self):
+        return (
+            f'{self.client_name} - {self.procedure_title} - '
+            f'{self.booking_date} {self.booking_time}'
+        )
+
+    @classmethod
+    def from_booking(cls, booking):
+        """Создает (не сохраняя) архивную копию бронирования."""
+        return cls(
+            booking_id=booking.booking_id,
+            procedure_id=booking.procedure_id,
+            procedure_title=booking.procedure.title,
+            procedure_price=booking.procedure.price,
+            procedure_duration=booking.procedure.duration,
+            master_id=booking.master_id,
+            master_name=booking.master.name,
+            booking_date=booking.booking_date,
+            booking_time=booking.booking_time,
+            client_id=booking.client_id,
+            client_name=booking.client_name,
+            client_phone=booking.client_phone,
+            client_email=booking.client_email,
+            notification_method=booking.notification_method,
+            status=booking.status,
+            payment_status=booking.payment_status,
+            prepayment_required=booking.prepayment_required,
+            payment_phone=booking.payment_phone,
+            group_id=booking.group_id,
+            series_id=booking.series_id,
+            admin_notes=booking.admin_notes,
+            created_at=booking.created_at,
+            updated_at=booking.updated_at,
+            confirmed_at=booking.confirmed_at,
+        )
+
+
+class WaitlistEntry(models.Model):
+    """Заявка клиента в лист ожидания на процедуру в диапазоне дат."""
+
+    STATUS_CHOICES = [
+        (WAITLIST_WAITING, '⏳ Ожидает'),
+        (WAITLIST_OFFERED, '📨 Отправлено предложение'),
+        (WAITLIST_BOOKED, '✅ Записан'),
+        (WAITLIST_EXPIRED, '⌛ Истекла'),
+    ]
+
+    client = models.ForeignKey(
+        Client,
+        on_delete=models.CASCADE,
+        related_name='waitlist_entries',
+        verbose_name='Клиент',
+    )
+    procedure = models.ForeignKey(
+        'catalog.Procedure',
+        on_delete=models.CASCADE,
+        verbose_name='Процедура',
+    )
+    master = models.ForeignKey(
+        'masters.Master',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        verbose_name='Мастер',
+        help_text='Пусто - подойдет любой мастер',
+    )
+    date_from = models.DateField(verbose_name='С даты')
+    date_to = models.DateField(verbose_name='По дату')
+    priority = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='Приоритет',
+        help_text='Заявки с большим приоритетом получают предложение первыми',
+    )
+    status = models.CharField(
+        max_length=WAITLIST_STATUS_MAX_LENGTH,
+        choices=STATUS_CHOICES,
+        default=WAITLIST_WAITING,
+        verbose_name='Статус',
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Создано',
+    )
+
+    class Meta:
+        verbose_name = 'Заявка в листе ожидания'
+        verbose_name_plural = 'Лист ожидания'
+        ordering = ['-priority', 'created_at']
+        indexes = [
+            # Подбор заявок под освободившийся слот: только ожидающие
+            models.Index(
+                fields=['procedure', 'date_from', 'date_to'],
+                condition=models.Q(status=WAITLIST_WAITING),
+                name='waitlist_waiting_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.client} - {self.date_from}..{self.date_to}'
+
+    def clean(self):
+        if self.date_from and self.date_to and self.date_from > self.date_to:
+            raise ValidationError(
+                {'date_to': 'Дата окончания раньше даты начала'}
+            )
+
+
+class WaitlistOffer(models.Model):
+    """Предложение освободившегося слота заявке из листа ожидания."""
+
+    STATUS_CHOICES = [
+        (OFFER_PENDING, '⏳ Ожидает ответа'),
+        (OFFER_ACCEPTED, '✅ Принято'),
+        (OFFER_DECLINED, '❌ Отклонено'),
+        (OFFER_EXPIRED, '⌛ Истекло'),
+    ]
+
+    token = models.UUIDField(
+        default=uuid.uuid4,
+        unique=True,
+        editable=False,
+        verbose_name='Токен',
+    )
+    entry = models.ForeignKey(
+        WaitlistEntry,
+        on_delete=models.CASCADE,
+        related_name='offers',
+        verbose_name='Заявка',
+    )
+    master = models.ForeignKey(
+        'masters.Master',
+        on_delete=models.CASCADE,
+        verbose_name='Мастер',
+    )
+    booking_date = models.DateField(verbose_name='Дата записи')
+    booking_time = models.TimeField(verbose_name='Время записи')
+    status = models.CharField(
+        max_length=WAITLIST_STATUS_MAX_LENGTH,
+        choices=STATUS_CHOICES,
+        default=OFFER_PENDING,
+        verbose_name='Статус',
+    )
+    expires_at = models.DateTimeField(verbose_name='Действует до')
+    booking = models.ForeignKey(
+        Booking,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        verbose_name='Созданная запись',
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Создано',
+    )
+
+    class Meta:
+        verbose_name = 'Предложение из листа ожидания'
+        verbose_name_plural = 'Предложения из листа ожидания'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'expires_at']),
+            models.Index(fields=['master', 'booking_date', 'booking_time']),
+        ]
+
+    def __str__(self):
+        return f'{self.entry} - {self.booking_date} {self.booking_time}'
+
+
 class WorkingHoursSettings(models.Model):
     """Настройки рабочего времени салона."""
 
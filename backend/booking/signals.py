@@ -0,0 +1,4 @@
+from django.dispatch import Signal
+
+# Бронь отменена и ее время освободилось. Аргументы: booking
+booking_cancelled = Signal()
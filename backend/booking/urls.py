@@ -23,4 +23,9 @@ urlpatterns = [
     ),
     path('ajax/masters/', views.get_available_masters, name='ajax_masters'),
     path('ajax/times/', views.get_available_times, name='ajax_times'),
+    path(
+        'calendar/<str:token>.ics',
+        views.master_calendar,
+        name='master_calendar',
+    ),
 ]
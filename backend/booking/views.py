@@ -1,32 +1,51 @@
-from datetime import datetime, timedelta, time as time_type
+import uuid
+from collections import Counter
+from datetime import date, datetime, timedelta, time as time_type
+from asgiref.sync import sync_to_async
 from django.conf import settings
 from django.contrib import messages
-from django.http import JsonResponse
+from django.db import transaction
+from django.http import Http404, HttpResponse, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.utils import timezone
+from django.utils.decorators import method_decorator
 from django.views import View
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_safe
 from django.views.generic import DetailView
+from loguru import logger
 
 from about.utils import get_legal_address
 from catalog.models import Procedure
+from core.metrics import counter, histogram
+from core.routers import use_primary_db
 from masters.models import Master
-from notifications.telegram_utils import send_booking_notification
+from notifications.telegram_utils import send_group_booking_notification
+from reports.rollups import schedule_rollup_refresh
 from user.models import Client, PaymentSettings
+from user.portal import get_portal_url
+from .availability import (
+    SlotUnavailableError,
+    find_combo_times,
+    get_busy_intervals_between,
+    get_working_hours,
+    reserve_slot,
+)
+from .ics import get_feed, invalidate_feeds, unsign_feed_token
 from .constants import (
     ACTIVE_BOOKING_STATUSES,
     CONTEXT_BOOKING,
     CONTEXT_FORM,
     CONTEXT_PROCEDURES,
     DEFAULT_PROCEDURE_DURATION_MINUTES,
-    DEFAULT_TIME_INTERVAL,
-    DEFAULT_WORKING_END_HOUR,
-    DEFAULT_WORKING_END_MINUTE,
-    DEFAULT_WORKING_START_HOUR,
-    DEFAULT_WORKING_START_MINUTE,
     EMPTY_LIST_RESPONSE,
+    ICS_CONTENT_TYPE,
+    MAX_COMBO_EXTRA_PROCEDURES,
     MSG_BOOKING_ERROR,
     MSG_CLIENT_ERROR,
+    MSG_SERIES_SKIPPED,
     MSG_SESSION_EXPIRED,
+    MSG_SLOT_TAKEN,
     MSG_TELEGRAM_ERROR,
     PAYMENT_NOT_REQUIRED,
     PAYMENT_PENDING,
@@ -36,7 +55,18 @@ from .constants import (
     URL_SERVICE_LIST,
 )
 from .forms import BookingForm, PhoneNumberForm
-from .models import Booking, WorkingHoursSettings
+from .models import Booking
+
+BOOKING_VIEW_SECONDS = histogram(
+    'booking_view_duration_seconds',
+    'Время обработки страниц и AJAX запросов бронирования',
+    labelnames=['view'],
+)
+BOOKINGS_CREATED = counter(
+    'bookings_created_total',
+    'Созданные бронирования',
+    labelnames=['client'],
+)
 
 
 class ServiceListView(View):
@@ -47,6 +77,9 @@ class ServiceListView(View):
         return redirect('booking:create_booking')
 
 
+@method_decorator(
+    BOOKING_VIEW_SECONDS.time(view='booking_form_post'), name='post'
+)
 class BookingCreateView(View):
     """View для создания бронирования."""
 
@@ -91,17 +124,40 @@ class BookingCreateView(View):
 
     def _handle_valid_form(self, form, request):
         """Обработка валидной формы бронирования."""
-        booking = form.save(commit=False)
         request.session[SESSION_PENDING_BOOKING] = {
-            'procedure_id': booking.procedure.id,
-            'master_id': booking.master.id,
-            'booking_date': booking.booking_date.isoformat(),
-            'booking_time': booking.booking_time.isoformat(),
-            'client_phone': booking.client_phone,
+            'items': form.get_items(),
+            'booking_date': form.cleaned_data['booking_date'].isoformat(),
+            'client_phone': form.cleaned_data['client_phone'],
+            'series': form.is_series(),
+            'skipped': form.get_conflict_descriptions(),
         }
         return redirect('booking:phone_confirmation')
 
 
+def get_pending_items(pending_booking):
+    """
+    Процедуры из сессии с датой у каждой. В старых форматах дата общая,
+    а одиночная процедура лежит в корне.
+    """
+    items = pending_booking.get('items') or [{
+        'procedure_id': pending_booking['procedure_id'],
+        'master_id': pending_booking['master_id'],
+        'booking_time': pending_booking['booking_time'],
+    }]
+    return [
+        dict(item, booking_date=item.get(
+            'booking_date', pending_booking['booking_date']
+        ))
+        for item in items
+    ]
+
+
+@method_decorator(
+    BOOKING_VIEW_SECONDS.time(view='phone_confirmation_get'), name='get'
+)
+@method_decorator(
+    BOOKING_VIEW_SECONDS.time(view='phone_confirmation_post'), name='post'
+)
 class PhoneConfirmationView(View):
     """View для подтверждения номера телефона."""
 
@@ -116,17 +172,21 @@ class PhoneConfirmationView(View):
         existing_client = self._get_existing_client_by_phone(phone)
         if existing_client:
             try:
-                booking = self._create_booking_for_existing_client(
+                bookings = self._create_booking_for_existing_client(
                     existing_client, pending_booking
                 )
-                self._send_telegram_notification(booking, request)
+                self._send_telegram_notification(
+                    bookings, request, pending_booking
+                )
                 del request.session[SESSION_PENDING_BOOKING]
 
                 return redirect(
                     URL_BOOKING_SUCCESS,
-                    booking_id=booking.booking_id,
+                    booking_id=bookings[0].booking_id,
                 )
 
+            except SlotUnavailableError as error:
+                return self._slot_taken(request, pending_booking, error)
             except Exception as e:
                 messages.error(request, MSG_BOOKING_ERROR.format(str(e)))
                 return redirect(URL_SERVICE_LIST)
@@ -177,35 +237,55 @@ class PhoneConfirmationView(View):
         client_name = form.cleaned_data.get('client_name', '')
 
         try:
-            client = Client.objects.create(
-                phone=phone,
-                name=client_name,
-                email=email,
-                notification_method=notification_method,
-                is_new=True,
-            )
+            # Клиент создается вместе с записями: если время уже заняли,
+            # не остается клиента без записей
+            with transaction.atomic():
+                client = Client.objects.create(
+                    phone=phone,
+                    name=client_name,
+                    email=email,
+                    notification_method=notification_method,
+                    is_new=True,
+                )
 
-            booking = self._create_booking(
-                pending_booking=pending_booking,
-                phone=phone,
-                client_name=client_name,
-                notification_method=notification_method,
-                email=email,
-                client=client,
-            )
+                bookings = self._create_booking(
+                    pending_booking=pending_booking,
+                    phone=phone,
+                    client_name=client_name,
+                    notification_method=notification_method,
+                    email=email,
+                    client=client,
+                )
 
-            self._send_telegram_notification(booking, request)
+            self._send_telegram_notification(
+                bookings, request, pending_booking
+            )
             del request.session[SESSION_PENDING_BOOKING]
 
             return redirect(
                 URL_BOOKING_SUCCESS,
-                booking_id=booking.booking_id,
+                booking_id=bookings[0].booking_id,
             )
 
+        except SlotUnavailableError as error:
+            return self._slot_taken(request, pending_booking, error)
         except Exception as e:
             messages.error(request, MSG_CLIENT_ERROR.format(str(e)))
             return redirect(URL_SERVICE_LIST)
 
+    def _slot_taken(self, request, pending_booking, error):
+        """
+        Время заняли, пока клиент подтверждал запись: незавершенная
+        запись сбрасывается, клиент возвращается к выбору времени.
+        """
+        del request.session[SESSION_PENDING_BOOKING]
+        messages.error(request, str(error))
+        items = get_pending_items(pending_booking)
+        return redirect(
+            'booking:create_booking_with_service',
+            procedure_id=items[0]['procedure_id'],
+        )
+
     def _get_existing_client_by_phone(self, phone):
         """Ищет существующего клиента по номеру телефона."""
         try:
@@ -216,36 +296,18 @@ class PhoneConfirmationView(View):
             return Client.objects.filter(phone=phone).first()
 
     def _create_booking_for_existing_client(self, client, pending_booking):
-        """Создает бронирование для существующего клиента."""
-        master = Master.objects.get(id=pending_booking['master_id'])
-        payment_settings = PaymentSettings.objects.filter(
-            is_active=True
-        ).first()
-
-        prepayment_required = getattr(client, 'always_prepayment', False)
-        payment_phone = self._get_payment_phone(payment_settings, master)
-
-        booking = Booking(
-            procedure_id=pending_booking['procedure_id'],
-            master_id=pending_booking['master_id'],
-            booking_date=pending_booking['booking_date'],
-            booking_time=pending_booking['booking_time'],
+        """Создает бронирования для существующего клиента."""
+        bookings = self._create_bookings(
+            pending_booking,
+            client=client,
             client_name=client.name,
-            client_phone=client.phone,
-            client_email=client.email,
+            phone=client.phone,
+            email=client.email,
             notification_method=client.notification_method,
-            client=client,
-            personal_data_agreement=True,
-            status=STATUS_PENDING,
-            prepayment_required=prepayment_required,
-            payment_status=(
-                PAYMENT_PENDING if prepayment_required
-                else PAYMENT_NOT_REQUIRED
-            ),
-            payment_phone=payment_phone,
+            prepayment_required=getattr(client, 'always_prepayment', False),
         )
-        booking.save()
-        return booking
+        BOOKINGS_CREATED.inc(len(bookings), client='existing')
+        return bookings
 
     def _create_booking(
         self,
@@ -256,38 +318,109 @@ class PhoneConfirmationView(View):
         email,
         client,
     ):
-        """Создание объекта бронирования для нового клиента."""
-        master = Master.objects.get(id=pending_booking['master_id'])
+        """Создание бронирований для нового клиента."""
+        bookings = self._create_bookings(
+            pending_booking,
+            client=client,
+            client_name=client_name,
+            phone=phone,
+            email=email,
+            notification_method=notification_method,
+            prepayment_required=(
+                client.is_new or getattr(client, 'always_prepayment', False)
+            ),
+        )
+        BOOKINGS_CREATED.inc(len(bookings), client='new')
+        return bookings
+
+    def _create_bookings(
+        self,
+        pending_booking,
+        client,
+        client_name,
+        phone,
+        email,
+        notification_method,
+        prepayment_required,
+    ):
+        """
+        Создает брони всех процедур и дат из сессии в одной транзакции.
+
+        Строки мастеров блокируются до конца транзакции, поэтому
+        параллельная запись к тем же мастерам ждет. Занятость за все даты
+        проверяется одним запросом по диапазону, брони вставляются одним
+        bulk_create. Процедуры одного дня связаны group_id, даты серии -
+        series_id.
+        """
+        items = get_pending_items(pending_booking)
         payment_settings = PaymentSettings.objects.filter(
             is_active=True
         ).first()
-
-        prepayment_required = (
-            client.is_new or getattr(client, 'always_prepayment', False)
+        procedures = Procedure.objects.in_bulk(
+            {item['procedure_id'] for item in items}
         )
-        payment_phone = self._get_payment_phone(payment_settings, master)
+        dates = sorted({item['booking_date'] for item in items})
+        items_per_date = Counter(item['booking_date'] for item in items)
+        group_ids = {
+            item_date: uuid.uuid4()
+            for item_date, count in items_per_date.items() if count > 1
+        }
+        series_id = uuid.uuid4() if pending_booking.get('series') else None
 
-        booking = Booking(
-            procedure_id=pending_booking['procedure_id'],
-            master_id=pending_booking['master_id'],
-            booking_date=pending_booking['booking_date'],
-            booking_time=pending_booking['booking_time'],
-            client_name=client_name,
-            client_phone=phone,
-            client_email=email,
-            notification_method=notification_method,
-            client=client,
-            personal_data_agreement=True,
-            status=STATUS_PENDING,
-            prepayment_required=prepayment_required,
-            payment_status=(
-                PAYMENT_PENDING if prepayment_required
-                else PAYMENT_NOT_REQUIRED
-            ),
-            payment_phone=payment_phone,
-        )
-        booking.save()
-        return booking
+        bookings = []
+        with transaction.atomic():
+            masters = Master.objects.select_for_update().in_bulk(
+                {item['master_id'] for item in items}
+            )
+            busy = get_busy_intervals_between(
+                masters,
+                date.fromisoformat(dates[0]),
+                date.fromisoformat(dates[-1]),
+            )
+            for item in items:
+                procedure = procedures[item['procedure_id']]
+                master = masters[item['master_id']]
+                booking_date = date.fromisoformat(item['booking_date'])
+                booking_time = time_type.fromisoformat(item['booking_time'])
+                if not reserve_slot(
+                    busy,
+                    master.pk,
+                    booking_date,
+                    booking_time,
+                    procedure.duration,
+                ):
+                    raise SlotUnavailableError(MSG_SLOT_TAKEN.format(
+                        f'{booking_date:%d.%m.%Y} '
+                        f'{booking_time.strftime("%H:%M")}'
+                    ))
+                bookings.append(Booking(
+                    procedure=procedure,
+                    master=master,
+                    booking_date=booking_date,
+                    booking_time=booking_time,
+                    group_id=group_ids.get(item['booking_date']),
+                    series_id=series_id,
+                    client_name=client_name,
+                    client_phone=phone,
+                    client_email=email,
+                    notification_method=notification_method,
+                    client=client,
+                    personal_data_agreement=True,
+                    status=STATUS_PENDING,
+                    prepayment_required=prepayment_required,
+                    payment_status=(
+                        PAYMENT_PENDING if prepayment_required
+                        else PAYMENT_NOT_REQUIRED
+                    ),
+                    payment_phone=self._get_payment_phone(
+                        payment_settings, master
+                    ),
+                ))
+            Booking.objects.bulk_create(bookings)
+            # bulk_create не отправляет post_save
+            invalidate_feeds(masters)
+            schedule_rollup_refresh(bookings)
+        return bookings
 
     def _get_payment_phone(self, payment_settings, master):
         """Возвращает телефон для оплаты."""
@@ -297,71 +430,132 @@ class PhoneConfirmationView(View):
             return master.phone
         return ''
 
-    def _send_telegram_notification(self, booking, request):
-        """Отправка уведомления в Telegram."""
+    def _send_telegram_notification(self, bookings, request, pending_booking):
+        """
+        Отправка одного уведомления в Telegram на все брони; пропущенные
+        занятые даты серии показываются клиенту и администратору.
+        """
+        skipped = pending_booking.get('skipped', [])
+        if skipped:
+            messages.warning(
+                request, MSG_SERIES_SKIPPED.format('; '.join(skipped))
+            )
         try:
-            success = send_booking_notification(booking)
+            success = send_group_booking_notification(bookings, skipped)
             if not success:
                 messages.warning(request, MSG_TELEGRAM_ERROR)
-        except Exception as e:
-            print(f'Error sending Telegram notification: {e}')
+        except Exception:
+            logger.exception('Ошибка отправки уведомления в Telegram')
             messages.warning(request, MSG_TELEGRAM_ERROR)
 
 
+@method_decorator(use_primary_db, name='dispatch')
 class BookingSuccessView(DetailView):
     """Отображение страницы успешного бронирования."""
 
-    model = Booking
+    queryset = Booking.objects.select_related('procedure', 'master')
     template_name = 'booking/booking_success.html'
     slug_field = 'booking_id'
     slug_url_kwarg = 'booking_id'
     context_object_name = CONTEXT_BOOKING
 
-
-def get_available_masters(request):
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        if self.object.client_id:
+            context['portal_url'] = get_portal_url(self.object.client_id)
+        if self.object.series_id:
+            context['series_bookings'] = self.queryset.filter(
+                series_id=self.object.series_id
+            ).order_by('booking_date', 'booking_time')
+        elif self.object.group_id:
+            context['group_bookings'] = self.queryset.filter(
+                group_id=self.object.group_id
+            ).order_by('booking_time')
+        return context
+
+
+def _get_request_feed(request, token):
+    """Лента из подписанной ссылки, одна на запрос для ETag и тела."""
+    if not hasattr(request, 'ics_feed'):
+        master_id = unsign_feed_token(token)
+        request.ics_feed = get_feed(master_id) if master_id else None
+    return request.ics_feed
+
+
+def _feed_etag(request, token):
+    feed = _get_request_feed(request, token)
+    return feed['etag'] if feed else None
+
+
+def _feed_last_modified(request, token):
+    feed = _get_request_feed(request, token)
+    return feed['last_modified'] if feed else None
+
+
+@BOOKING_VIEW_SECONDS.time(view='master_calendar')
+@require_safe
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=_feed_etag, last_modified_func=_feed_last_modified)
+def master_calendar(request, token):
+    """
+    Лента .ics записей мастера по подписанной ссылке. Повторный опрос
+    без изменений получает 304 из кеша без запросов к БД.
+    """
+    feed = _get_request_feed(request, token)
+    if feed is None:
+        raise Http404
+    response = HttpResponse(feed['body'], content_type=ICS_CONTENT_TYPE)
+    response['Content-Disposition'] = 'inline; filename="bookings.ics"'
+    return response
+
+
+@BOOKING_VIEW_SECONDS.time(view='available_masters')
+async def get_available_masters(request):
     """AJAX endpoint для получения мастеров по процедуре."""
     procedure_id = request.GET.get('procedure_id')
     if not procedure_id:
         return JsonResponse(EMPTY_LIST_RESPONSE, safe=False)
 
+    masters = await sync_to_async(_get_available_masters)(procedure_id)
+    return JsonResponse(masters, safe=False)
+
+
+def _get_available_masters(procedure_id):
     procedure = get_object_or_404(Procedure, id=procedure_id)
-    masters = Master.objects.filter(
-        procedures=procedure, is_active=True
-    ).values('id', 'name')
-    return JsonResponse(list(masters), safe=False)
+    return list(
+        Master.objects.filter(
+            procedures=procedure, is_active=True
+        ).values('id', 'name')
+    )
 
 
-def get_available_times(request):
+@BOOKING_VIEW_SECONDS.time(view='available_times')
+async def get_available_times(request):
     """AJAX endpoint для получения доступного времени."""
     master_id = request.GET.get('master_id')
     date_str = request.GET.get('date')
     procedure_id = request.GET.get('procedure_id')
+    extra_ids = [
+        extra_id for extra_id in
+        request.GET.get('extra_procedure_ids', '').split(',')
+        if extra_id
+    ][:MAX_COMBO_EXTRA_PROCEDURES]
 
     if not all([master_id, date_str]):
         return JsonResponse(EMPTY_LIST_RESPONSE, safe=False)
 
     try:
-        master = Master.objects.get(id=master_id)
         selected_date = datetime.strptime(date_str, '%Y-%m-%d').date()
+        if procedure_id and extra_ids:
+            available_times = await sync_to_async(_get_combo_times)(
+                int(master_id),
+                selected_date,
+                [int(procedure_id)] + [int(pk) for pk in extra_ids],
+            )
+            return JsonResponse(available_times, safe=False)
 
-        bookings = Booking.objects.filter(
-            master=master,
-            booking_date=selected_date,
-            status__in=ACTIVE_BOOKING_STATUSES,
-        ).select_related('procedure')
-
-        procedure_duration = None
-        if procedure_id:
-            try:
-                procedure = Procedure.objects.get(id=procedure_id)
-                procedure_duration = procedure.duration
-            except Procedure.DoesNotExist:
-                pass
-
-        available_times = _generate_available_times(
-            bookings,
-            procedure_duration,
-            selected_date,
+        available_times = await sync_to_async(_get_available_times)(
+            master_id, selected_date, procedure_id
         )
         return JsonResponse(available_times, safe=False)
 
@@ -369,6 +563,42 @@ def get_available_times(request):
         return JsonResponse(EMPTY_LIST_RESPONSE, safe=False)
 
 
+def _get_available_times(master_id, selected_date, procedure_id=None):
+    """Запросы к БД и расчет слотов для get_available_times."""
+    master = Master.objects.get(id=master_id)
+    bookings = Booking.objects.filter(
+        master=master,
+        booking_date=selected_date,
+        status__in=ACTIVE_BOOKING_STATUSES,
+    ).select_related('procedure')
+
+    procedure_duration = None
+    if procedure_id:
+        try:
+            procedure = Procedure.objects.get(id=procedure_id)
+            procedure_duration = procedure.duration
+        except Procedure.DoesNotExist:
+            pass
+
+    return _generate_available_times(
+        bookings,
+        procedure_duration,
+        selected_date,
+    )
+
+
+def _get_combo_times(master_id, selected_date, procedure_ids):
+    """Время начала, с которого процедуры помещаются подряд."""
+    procedures = Procedure.objects.in_bulk(procedure_ids)
+    if len(procedures) != len(set(procedure_ids)):
+        return EMPTY_LIST_RESPONSE
+    return find_combo_times(
+        [procedures[pk] for pk in procedure_ids],
+        selected_date,
+        master_id=master_id,
+    )
+
+
 def _generate_available_times(
     bookings,
     procedure_duration=None,
@@ -379,43 +609,7 @@ def _generate_available_times(
     now = timezone.localtime(timezone.now())
     today = now.date()
     current_time = now.time()
-
-    try:
-        working_settings = WorkingHoursSettings.objects.filter(
-            is_active=True
-        ).first()
-        if working_settings:
-            start_time = working_settings.start_time
-            end_time = working_settings.end_time
-            interval = working_settings.time_interval
-        else:
-            start_time = time_type(
-                DEFAULT_WORKING_START_HOUR,
-                DEFAULT_WORKING_START_MINUTE,
-            )
-            end_time = time_type(
-                DEFAULT_WORKING_END_HOUR,
-                DEFAULT_WORKING_END_MINUTE,
-            )
-            interval = DEFAULT_TIME_INTERVAL
-    except Exception:
-        start_time = time_type(
-            DEFAULT_WORKING_START_HOUR,
-            DEFAULT_WORKING_START_MINUTE,
-        )
-        end_time = time_type(
-            DEFAULT_WORKING_END_HOUR,
-            DEFAULT_WORKING_END_MINUTE,
-        )
-        interval = DEFAULT_TIME_INTERVAL
-
-    if isinstance(interval, dict):
-        interval = DEFAULT_TIME_INTERVAL
-    elif not isinstance(interval, int):
-        try:
-            interval = int(interval)
-        except (ValueError, TypeError):
-            interval = DEFAULT_TIME_INTERVAL
+    start_time, end_time, interval = get_working_hours()
 
     busy_intervals = []
     for booking in bookings:
@@ -0,0 +1,294 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+from loguru import logger
+
+from core.metrics import counter
+from masters.models import Master
+from notifications.models import ClientChat
+from notifications.telegram_utils import (
+    find_chat_id_by_phone,
+    send_booking_notification,
+    send_waitlist_offer,
+)
+from user.models import PaymentSettings
+from .availability import is_slot_free
+from .constants import (
+    OFFER_ACCEPTED,
+    OFFER_DECLINED,
+    OFFER_EXPIRED,
+    OFFER_PENDING,
+    PAYMENT_NOT_REQUIRED,
+    PAYMENT_PENDING,
+    STATUS_PENDING,
+    WAITLIST_BOOKED,
+    WAITLIST_EXPIRED,
+    WAITLIST_OFFERED,
+    WAITLIST_OFFER_TTL_MINUTES_DEFAULT,
+    WAITLIST_WAITING,
+)
+from .models import Booking, WaitlistEntry, WaitlistOffer
+
+WAITLIST_OFFERS = counter(
+    'waitlist_offers_total',
+    'Предложения из листа ожидания по исходу',
+    labelnames=['result'],
+)
+
+
+def get_offer_ttl_minutes():
+    return getattr(
+        settings,
+        'WAITLIST_OFFER_TTL_MINUTES',
+        WAITLIST_OFFER_TTL_MINUTES_DEFAULT,
+    )
+
+
+def find_waitlist_entry(
+    procedure_id, master_id, booking_date, booking_time, exclude_pks=()
+):
+    """
+    Первая по приоритету ожидающая заявка, подходящая под слот.
+
+    Один запрос по частичному индексу (procedure, date_from, date_to)
+    с LIMIT 1. Заявки, которым этот слот уже предлагали, и клиенты без
+    чата с ботом (предложение им не доставить) пропускаются.
+    """
+    already_offered = WaitlistOffer.objects.filter(
+        entry=OuterRef('pk'),
+        master_id=master_id,
+        booking_date=booking_date,
+        booking_time=booking_time,
+    )
+    reachable = ClientChat.objects.filter(phone=OuterRef('client__phone'))
+    return (
+        WaitlistEntry.objects
+        .filter(
+            status=WAITLIST_WAITING,
+            procedure_id=procedure_id,
+            date_from__lte=booking_date,
+            date_to__gte=booking_date,
+        )
+        .filter(Q(master__isnull=True) | Q(master_id=master_id))
+        .filter(~Exists(already_offered), Exists(reachable))
+        .exclude(pk__in=exclude_pks)
+        .select_related('client', 'procedure')
+        .order_by('-priority', 'created_at')
+        .first()
+    )
+
+
+def offer_slot(procedure, master_id, booking_date, booking_time):
+    """
+    Предлагает свободный слот заявкам по очереди приоритета.
+
+    Предложение получает одна заявка; если отправить его не удалось,
+    слот сразу уходит следующей. Строка предложения сохраняется только
+    после успешной отправки. Возвращает отправленное предложение
+    или None.
+    """
+    if booking_date < timezone.localdate():
+        return None
+    if WaitlistOffer.objects.filter(
+        master_id=master_id,
+        booking_date=booking_date,
+        booking_time=booking_time,
+        status=OFFER_PENDING,
+    ).exists():
+        return None
+    if not is_slot_free(
+        master_id, booking_date, booking_time, procedure.duration
+    ):
+        return None
+
+    ttl_minutes = get_offer_ttl_minutes()
+    failed_pks = []
+    while True:
+        entry = find_waitlist_entry(
+            procedure.pk, master_id, booking_date, booking_time, failed_pks
+        )
+        if entry is None:
+            return None
+
+        offer = WaitlistOffer(
+            entry=entry,
+            master_id=master_id,
+            booking_date=booking_date,
+            booking_time=booking_time,
+            expires_at=timezone.now() + timedelta(minutes=ttl_minutes),
+        )
+        if send_waitlist_offer(offer, ttl_minutes):
+            offer.save()
+            entry.status = WAITLIST_OFFERED
+            entry.save(update_fields=['status'])
+            WAITLIST_OFFERS.inc(result='sent')
+            return offer
+
+        failed_pks.append(entry.pk)
+        WAITLIST_OFFERS.inc(result='failed')
+
+
+def offer_slot_on_commit(procedure, master_id, booking_date, booking_time):
+    """Предлагает освободившийся слот после коммита транзакции."""
+    def offer():
+        try:
+            offer_slot(procedure, master_id, booking_date, booking_time)
+        except Exception:
+            logger.exception('Ошибка подбора заявки из листа ожидания')
+
+    transaction.on_commit(offer)
+
+
+def offer_cancelled_slot(sender, booking, **kwargs):
+    """Обработчик booking_cancelled: слот предлагается после коммита."""
+    offer_slot_on_commit(
+        booking.procedure,
+        booking.master_id,
+        booking.booking_date,
+        booking.booking_time,
+    )
+
+
+def _get_pending_offer(token):
+    return (
+        WaitlistOffer.objects
+        .select_for_update(of=('self',))
+        .select_related('entry__client', 'entry__procedure', 'master')
+        .filter(token=token, status=OFFER_PENDING)
+        .first()
+    )
+
+
+def _release_offer(offer, status):
+    """Закрывает предложение и возвращает заявку в ожидание."""
+    offer.status = status
+    offer.save(update_fields=['status'])
+    WaitlistEntry.objects.filter(
+        pk=offer.entry_id, status=WAITLIST_OFFERED
+    ).update(status=WAITLIST_WAITING)
+    WAITLIST_OFFERS.inc(result=status)
+
+
+def _offer_next(offer):
+    offer_slot(
+        offer.entry.procedure,
+        offer.master_id,
+        offer.booking_date,
+        offer.booking_time,
+    )
+
+
+def _is_offer_recipient(offer, chat_id):
+    client_chat_id = find_chat_id_by_phone(offer.entry.client.phone)
+    return client_chat_id is not None and str(client_chat_id) == str(chat_id)
+
+
+def accept_offer(token, chat_id):
+    """
+    Принимает предложение: создает бронь, если оно не истекло и слот
+    все еще свободен. Возвращает бронь или None.
+    """
+    with transaction.atomic():
+        offer = _get_pending_offer(token)
+        if offer is None or not _is_offer_recipient(offer, chat_id):
+            return None
+        if offer.expires_at <= timezone.now():
+            _release_offer(offer, OFFER_EXPIRED)
+            transaction.on_commit(lambda: _offer_next(offer))
+            return None
+
+        # Мастер блокируется, как при создании записи и переносе в
+        # календаре: иначе параллельная запись займет то же время
+        Master.objects.select_for_update().get(pk=offer.master_id)
+        entry = offer.entry
+        if not is_slot_free(
+            offer.master_id,
+            offer.booking_date,
+            offer.booking_time,
+            entry.procedure.duration,
+        ):
+            _release_offer(offer, OFFER_EXPIRED)
+            return None
+
+        booking = _create_waitlist_booking(offer)
+        offer.status = OFFER_ACCEPTED
+        offer.booking = booking
+        offer.save(update_fields=['status', 'booking'])
+        entry.status = WAITLIST_BOOKED
+        entry.save(update_fields=['status'])
+        WAITLIST_OFFERS.inc(result=OFFER_ACCEPTED)
+
+    send_booking_notification(booking)
+    return booking
+
+
+def decline_offer(token, chat_id):
+    """Отклоняет предложение, слот уходит следующей заявке."""
+    with transaction.atomic():
+        offer = _get_pending_offer(token)
+        if offer is None or not _is_offer_recipient(offer, chat_id):
+            return False
+        _release_offer(offer, OFFER_DECLINED)
+        transaction.on_commit(lambda: _offer_next(offer))
+    return True
+
+
+def _create_waitlist_booking(offer):
+    client = offer.entry.client
+    payment_settings = PaymentSettings.objects.filter(is_active=True).first()
+    prepayment_required = client.always_prepayment
+    if payment_settings:
+        payment_phone = payment_settings.admin_phone
+    else:
+        payment_phone = offer.master.phone or ''
+
+    return Booking.objects.create(
+        procedure=offer.entry.procedure,
+        master=offer.master,
+        booking_date=offer.booking_date,
+        booking_time=offer.booking_time,
+        client_name=client.name,
+        client_phone=client.phone,
+        client_email=client.email,
+        notification_method=client.notification_method,
+        client=client,
+        personal_data_agreement=True,
+        status=STATUS_PENDING,
+        prepayment_required=prepayment_required,
+        payment_status=(
+            PAYMENT_PENDING if prepayment_required else PAYMENT_NOT_REQUIRED
+        ),
+        payment_phone=payment_phone,
+    )
+
+
+def expire_offers(now=None):
+    """
+    Закрывает просроченные предложения и передает их слоты следующим
+    заявкам. Возвращает число истекших предложений.
+    """
+    now = now or timezone.now()
+    expired = 0
+    pending = WaitlistOffer.objects.filter(
+        status=OFFER_PENDING, expires_at__lte=now
+    ).values_list('token', flat=True)
+    for token in list(pending):
+        with transaction.atomic():
+            offer = _get_pending_offer(token)
+            if offer is None:
+                continue
+            _release_offer(offer, OFFER_EXPIRED)
+        expired += 1
+        _offer_next(offer)
+    return expired
+
+
+def expire_entries(today=None):
+    """Заявки, чей диапазон дат прошел, помечаются истекшими."""
+    today = today or timezone.localdate()
+    return WaitlistEntry.objects.filter(
+        status=WAITLIST_WAITING, date_to__lt=today
+    ).update(status=WAITLIST_EXPIRED)
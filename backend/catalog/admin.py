@@ -1,5 +1,8 @@
 from django.contrib import admin
+from django.db import connections
+
 from .models import Category, Procedure
+from .search import find_procedure_ids, get_index, get_search_terms
 
 
 @admin.register(Category)
@@ -43,3 +46,15 @@ class ProcedureAdmin(admin.ModelAdmin):
             'classes': ('collapse',)
         })
     )
+
+    def get_search_results(self, request, queryset, search_term):
+        """Поиск по полнотекстовому индексу вместо LIKE по полям."""
+        terms = get_search_terms(search_term)
+        if not terms or get_index(connections[queryset.db]) is None:
+            return super().get_search_results(
+                request, queryset, search_term
+            )
+        procedure_ids = find_procedure_ids(
+            terms, queryset.db, available_only=False
+        )
+        return queryset.filter(pk__in=procedure_ids), False
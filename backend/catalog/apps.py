@@ -5,3 +5,25 @@ class CatalogConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'catalog'
     verbose_name = 'Каталог'
+
+    def ready(self):
+        from django.db.models.signals import post_delete, post_save
+
+        from .models import Category, Procedure
+        from .search import sync_category, sync_procedure, unindex_procedure
+
+        post_save.connect(
+            sync_procedure,
+            sender=Procedure,
+            dispatch_uid='catalog_search_procedure_save',
+        )
+        post_delete.connect(
+            unindex_procedure,
+            sender=Procedure,
+            dispatch_uid='catalog_search_procedure_delete',
+        )
+        post_save.connect(
+            sync_category,
+            sender=Category,
+            dispatch_uid='catalog_search_category_save',
+        )
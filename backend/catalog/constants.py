@@ -0,0 +1,20 @@
+PROCEDURES_PER_PAGE = 12
+
+# Порядок выдачи каталога: ключ keyset-пагинации (id делает его уникальным)
+PROCEDURE_ORDERING = ('title', 'id')
+
+# Параметры запроса
+CATEGORY_PARAM = 'category'
+CURSOR_PARAM = 'cursor'
+SEARCH_PARAM = 'q'
+
+# Полнотекстовый поиск по процедурам
+SEARCH_TABLE = 'catalog_procedure_search'
+SEARCH_RESULTS_LIMIT = 30
+SEARCH_MAX_QUERY_LENGTH = 100
+SEARCH_MAX_TERMS = 8
+# Конфигурация PostgreSQL со стеммингом русского языка
+SEARCH_PG_CONFIG = 'russian'
+# Веса колонок в bm25 для SQLite FTS5: название, категория,
+# короткое описание, полное описание
+SEARCH_FTS_WEIGHTS = (10.0, 4.0, 4.0, 1.0)
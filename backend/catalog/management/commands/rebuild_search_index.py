@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS, transaction
+
+from ...search import rebuild_index
+
+
+class Command(BaseCommand):
+    """
+    Полная перестройка поискового индекса процедур
+    python manage.py rebuild_search_index.
+
+    Нужна после изменений в обход сигналов: queryset.update(),
+    loaddata, правки напрямую в БД.
+    """
+
+    help = 'Перестраивает полнотекстовый индекс процедур'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--database',
+            default=DEFAULT_DB_ALIAS,
+            help='Алиас базы данных',
+        )
+
+    def handle(self, *args, **options):
+        using = options['database']
+        with transaction.atomic(using=using):
+            indexed = rebuild_index(using)
+        self.stdout.write(
+            self.style.SUCCESS(f'🎉 В индексе {indexed} процедур')
+        )
@@ -0,0 +1,17 @@
+# Generated by Django 3.2.16 on 2026-10-19 11:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0002_procedure_image'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='procedure',
+            index=models.Index(fields=['title', 'id'], name='catalog_pro_title_27fd50_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+from django.db import migrations
+
+from catalog.search import create_index, drop_index
+
+
+def create_search_index(apps, schema_editor):
+    """FTS5 на SQLite, tsvector с GIN-индексом на PostgreSQL."""
+    create_index(schema_editor.connection)
+
+
+def drop_search_index(apps, schema_editor):
+    drop_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0003_procedure_title_id_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -86,3 +86,6 @@ class Procedure(models.Model):
         verbose_name = 'Процедура'
         verbose_name_plural = 'Процедуры'
         ordering = ['title']
+        indexes = [
+            models.Index(fields=['title', 'id']),
+        ]
@@ -0,0 +1,312 @@
+"""
+Полнотекстовый поиск по процедурам.
+
+Индекс хранится в отдельной таблице SEARCH_TABLE и обновляется
+сигналами Procedure и Category (см. CatalogConfig.ready):
+
+- SQLite: виртуальная таблица FTS5, ранжирование bm25 с весами колонок.
+  Стемминга для русского в FTS5 нет, поэтому каждое слово ищется как
+  префикс ("массаж" найдет "массажа").
+- PostgreSQL: tsvector со стеммингом SEARCH_PG_CONFIG и GIN-индексом,
+  ранжирование ts_rank по весам A (название) - C (описание).
+
+Для остальных СУБД поиск идет по icontains без ранжирования.
+Изменения в обход сигналов (queryset.update, сырой SQL) подхватывает
+команда rebuild_search_index.
+"""
+import re
+
+from django.db import DEFAULT_DB_ALIAS, connections, router
+from django.db.models import Q
+
+from .constants import (
+    SEARCH_FTS_WEIGHTS,
+    SEARCH_MAX_QUERY_LENGTH,
+    SEARCH_MAX_TERMS,
+    SEARCH_PG_CONFIG,
+    SEARCH_RESULTS_LIMIT,
+    SEARCH_TABLE,
+)
+from .models import Procedure
+
+# Слова запроса: буквы и цифры без подчеркиваний и знаков, которые
+# имеют особый смысл в синтаксисе MATCH и to_tsquery
+TERM_RE = re.compile(r'[^\W_]+')
+
+# Индексируемые поля в одном порядке для обеих СУБД
+_INDEXED_COLUMNS = (
+    'p.title', 'c.title', 'p.short_description', 'p.description'
+)
+_VISIBLE_SQL = 'p.is_available AND c.is_active'
+
+
+def _normalized(column):
+    """Ё приводится к Е: ни FTS5, ни стеммер не считают их одной буквой."""
+    return f"replace(replace({column}, 'ё', 'е'), 'Ё', 'Е')"
+
+
+class SqliteIndex:
+    create_sql = [
+        f'CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5('
+        'title, category_title, short_description, description, '
+        "tokenize='unicode61 remove_diacritics 2')",
+    ]
+    drop_sql = [f'DROP TABLE IF EXISTS {SEARCH_TABLE}']
+
+    def update(self, cursor, where, params):
+        columns = ', '.join(map(_normalized, _INDEXED_COLUMNS))
+        cursor.execute(
+            f'DELETE FROM {SEARCH_TABLE} WHERE rowid IN '
+            f'(SELECT p.id FROM catalog_procedure p WHERE {where})',
+            params,
+        )
+        cursor.execute(
+            f'INSERT INTO {SEARCH_TABLE} '
+            '(rowid, title, category_title, short_description, description) '
+            f'SELECT p.id, {columns} '
+            'FROM catalog_procedure p '
+            'JOIN catalog_category c ON c.id = p.category_id '
+            f'WHERE {where}',
+            params,
+        )
+
+    def remove(self, cursor, procedure_ids):
+        cursor.execute(
+            f'DELETE FROM {SEARCH_TABLE} '
+            f'WHERE rowid IN ({_placeholders(procedure_ids)})',
+            procedure_ids,
+        )
+
+    def clear(self, cursor):
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+
+    def search_sql(self, terms, where):
+        weights = ', '.join(str(weight) for weight in SEARCH_FTS_WEIGHTS)
+        sql = (
+            f'SELECT p.id FROM {SEARCH_TABLE} '
+            f'JOIN catalog_procedure p ON p.id = {SEARCH_TABLE}.rowid '
+            'JOIN catalog_category c ON c.id = p.category_id '
+            f'WHERE {SEARCH_TABLE} MATCH %s AND {where} '
+            f'ORDER BY bm25({SEARCH_TABLE}, {weights}), p.title'
+        )
+        return sql, ' '.join(f'"{term}"*' for term in terms)
+
+
+class PostgresIndex:
+    create_sql = [
+        f'CREATE TABLE IF NOT EXISTS {SEARCH_TABLE} ('
+        'procedure_id bigint PRIMARY KEY '
+        'REFERENCES catalog_procedure (id) ON DELETE CASCADE, '
+        'document tsvector NOT NULL)',
+        f'CREATE INDEX IF NOT EXISTS {SEARCH_TABLE}_document_gin '
+        f'ON {SEARCH_TABLE} USING GIN (document)',
+    ]
+    drop_sql = [f'DROP TABLE IF EXISTS {SEARCH_TABLE}']
+
+    # Веса колонок _INDEXED_COLUMNS для ts_rank
+    weights = ('A', 'B', 'B', 'C')
+
+    def _document_sql(self):
+        return ' || '.join(
+            f"setweight(to_tsvector('{SEARCH_PG_CONFIG}'::regconfig, "
+            f"{_normalized(column)}), '{weight}')"
+            for column, weight in zip(_INDEXED_COLUMNS, self.weights)
+        )
+
+    def update(self, cursor, where, params):
+        cursor.execute(
+            f'INSERT INTO {SEARCH_TABLE} (procedure_id, document) '
+            f'SELECT p.id, {self._document_sql()} '
+            'FROM catalog_procedure p '
+            'JOIN catalog_category c ON c.id = p.category_id '
+            f'WHERE {where} '
+            'ON CONFLICT (procedure_id) '
+            'DO UPDATE SET document = EXCLUDED.document',
+            params,
+        )
+
+    def remove(self, cursor, procedure_ids):
+        cursor.execute(
+            f'DELETE FROM {SEARCH_TABLE} '
+            f'WHERE procedure_id IN ({_placeholders(procedure_ids)})',
+            procedure_ids,
+        )
+
+    def clear(self, cursor):
+        cursor.execute(f'TRUNCATE {SEARCH_TABLE}')
+
+    def search_sql(self, terms, where):
+        sql = (
+            f'SELECT p.id FROM {SEARCH_TABLE} s '
+            'JOIN catalog_procedure p ON p.id = s.procedure_id '
+            'JOIN catalog_category c ON c.id = p.category_id, '
+            f"to_tsquery('{SEARCH_PG_CONFIG}'::regconfig, %s) query "
+            f'WHERE s.document @@ query AND {where} '
+            'ORDER BY ts_rank(s.document, query) DESC, p.title'
+        )
+        return sql, ' & '.join(f'{term}:*' for term in terms)
+
+
+SEARCH_INDEXES = {
+    'sqlite': SqliteIndex(),
+    'postgresql': PostgresIndex(),
+}
+
+
+def _placeholders(values):
+    return ', '.join(['%s'] * len(values))
+
+
+def get_index(connection):
+    """Индекс для СУБД соединения или None, если она не поддерживается."""
+    return SEARCH_INDEXES.get(connection.vendor)
+
+
+def _fill(cursor, index):
+    index.clear(cursor)
+    index.update(cursor, '1 = 1', [])
+
+
+def create_index(connection):
+    """Создает и заполняет индекс (вызывается из миграции)."""
+    index = get_index(connection)
+    if index is None:
+        return
+    with connection.cursor() as cursor:
+        for sql in index.create_sql:
+            cursor.execute(sql)
+        _fill(cursor, index)
+
+
+def drop_index(connection):
+    index = get_index(connection)
+    if index is None:
+        return
+    with connection.cursor() as cursor:
+        for sql in index.drop_sql:
+            cursor.execute(sql)
+
+
+def rebuild_index(using=DEFAULT_DB_ALIAS):
+    """Перестраивает индекс целиком; возвращает число процедур."""
+    connection = connections[using]
+    index = get_index(connection)
+    if index is None:
+        return 0
+    with connection.cursor() as cursor:
+        _fill(cursor, index)
+    return Procedure.objects.using(using).count()
+
+
+def index_procedures(procedure_ids, using=DEFAULT_DB_ALIAS):
+    connection = connections[using]
+    index = get_index(connection)
+    if index is None or not procedure_ids:
+        return
+    with connection.cursor() as cursor:
+        index.update(
+            cursor,
+            f'p.id IN ({_placeholders(procedure_ids)})',
+            list(procedure_ids),
+        )
+
+
+def index_category(category_id, using=DEFAULT_DB_ALIAS):
+    """Переиндексирует процедуры категории (ее название в индексе)."""
+    connection = connections[using]
+    index = get_index(connection)
+    if index is None:
+        return
+    with connection.cursor() as cursor:
+        index.update(cursor, 'p.category_id = %s', [category_id])
+
+
+def remove_procedures(procedure_ids, using=DEFAULT_DB_ALIAS):
+    connection = connections[using]
+    index = get_index(connection)
+    if index is None or not procedure_ids:
+        return
+    with connection.cursor() as cursor:
+        index.remove(cursor, list(procedure_ids))
+
+
+def get_search_terms(query):
+    """Слова запроса в нижнем регистре, не больше SEARCH_MAX_TERMS."""
+    query = query[:SEARCH_MAX_QUERY_LENGTH].lower().replace('ё', 'е')
+    return TERM_RE.findall(query)[:SEARCH_MAX_TERMS]
+
+
+def find_procedure_ids(terms, using, available_only=True, limit=None):
+    """id процедур, совпавших со всеми словами, по убыванию релевантности."""
+    connection = connections[using]
+    sql, match = get_index(connection).search_sql(
+        terms, _VISIBLE_SQL if available_only else '1 = 1'
+    )
+    params = [match]
+    if limit is not None:
+        sql += ' LIMIT %s'
+        params.append(limit)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _fallback_search(terms, limit):
+    condition = Q()
+    for term in terms:
+        condition &= (
+            Q(title__icontains=term)
+            | Q(short_description__icontains=term)
+            | Q(description__icontains=term)
+            | Q(category__title__icontains=term)
+        )
+    return list(
+        Procedure.objects.filter(
+            condition, is_available=True, category__is_active=True
+        ).select_related('category').order_by('title')[:limit]
+    )
+
+
+def search_procedures(query, limit=SEARCH_RESULTS_LIMIT):
+    """
+    Доступные процедуры по запросу, от более релевантных к менее.
+
+    Два запроса: id по индексу с ранжированием и LIMIT, затем сами
+    процедуры с категориями. Время не зависит от размера каталога, так
+    как индекс возвращает только совпавшие строки.
+    """
+    terms = get_search_terms(query)
+    if not terms:
+        return []
+    using = router.db_for_read(Procedure)
+    if get_index(connections[using]) is None:
+        return _fallback_search(terms, limit)
+
+    procedure_ids = find_procedure_ids(terms, using, limit=limit)
+    procedures = Procedure.objects.using(using).select_related(
+        'category'
+    ).in_bulk(procedure_ids)
+    return [
+        procedures[procedure_id]
+        for procedure_id in procedure_ids
+        if procedure_id in procedures
+    ]
+
+
+def sync_procedure(sender, instance, raw=False, using=None, **kwargs):
+    """Обработчик post_save Procedure."""
+    if raw:
+        return
+    index_procedures([instance.pk], using or DEFAULT_DB_ALIAS)
+
+
+def sync_category(sender, instance, raw=False, using=None, **kwargs):
+    """Обработчик post_save Category: название категории есть в индексе."""
+    if raw:
+        return
+    index_category(instance.pk, using or DEFAULT_DB_ALIAS)
+
+
+def unindex_procedure(sender, instance, using=None, **kwargs):
+    """Обработчик post_delete Procedure."""
+    remove_procedures([instance.pk], using or DEFAULT_DB_ALIAS)
@@ -6,5 +6,6 @@ app_name = 'catalog'
 
 urlpatterns = [
     path('', views.product_list, name='product_list'),
+    path('search/', views.procedure_search, name='search'),
     path('<int:pk>/', views.product_detail, name='product_detail'),
 ]
@@ -1,17 +1,63 @@
+from django.db.models import Count, Q
 from django.shortcuts import render, get_object_or_404
 
-from .models import Procedure
+from core.metrics import histogram
+from core.pagination import keyset_paginate
+from .constants import (
+    CATEGORY_PARAM,
+    CURSOR_PARAM,
+    PROCEDURE_ORDERING,
+    PROCEDURES_PER_PAGE,
+    SEARCH_MAX_QUERY_LENGTH,
+    SEARCH_PARAM,
+)
+from .models import Category, Procedure
+from .search import search_procedures
+
+SEARCH_SECONDS = histogram(
+    'catalog_search_duration_seconds',
+    'Время полнотекстового поиска процедур',
+)
+
+
+def get_category_facets():
+    """Активные категории с количеством доступных процедур (один запрос)."""
+    return Category.objects.filter(is_active=True).annotate(
+        procedures_count=Count(
+            'procedures',
+            filter=Q(procedures__is_available=True),
+        )
+    ).filter(procedures_count__gt=0)
 
 
 def product_list(request):
-    """Список всех процедур"""
+    """Список процедур с фильтром по категории и keyset-пагинацией."""
     procedures = Procedure.objects.filter(
         is_available=True,
         category__is_active=True
+    ).select_related('category')
+
+    selected_category = request.GET.get(CATEGORY_PARAM, '')
+    if selected_category.isdigit():
+        procedures = procedures.filter(category_id=selected_category)
+    else:
+        selected_category = ''
+
+    page, next_cursor = keyset_paginate(
+        procedures,
+        PROCEDURE_ORDERING,
+        request.GET.get(CURSOR_PARAM),
+        PROCEDURES_PER_PAGE,
     )
+    categories = list(get_category_facets())
 
     context = {
-        'procedures': procedures
+        'procedures': page,
+        'categories': categories,
+        'total_count': sum(c.procedures_count for c in categories),
+        'selected_category': selected_category,
+        'next_cursor': next_cursor,
+        'is_first_page': not request.GET.get(CURSOR_PARAM),
     }
     return render(request, 'catalog/product_list.html', context)
 
@@ -19,7 +65,7 @@ def product_list(request):
 def product_detail(request, pk):
     """Детальная страница процедуры"""
     procedure = get_object_or_404(
-        Procedure,
+        Procedure.objects.select_related('category'),
         pk=pk,
         is_available=True,
         category__is_active=True
@@ -29,3 +75,17 @@ def product_detail(request, pk):
         'procedure': procedure
     }
     return render(request, 'catalog/product_detail.html', context)
+
+
+def procedure_search(request):
+    """Поиск процедур по названию, описаниям и категории."""
+    query = request.GET.get(SEARCH_PARAM, '').strip()
+    query = query[:SEARCH_MAX_QUERY_LENGTH]
+    with SEARCH_SECONDS.time():
+        procedures = search_procedures(query)
+
+    context = {
+        'query': query,
+        'procedures': procedures,
+    }
+    return render(request, 'catalog/search_results.html', context)
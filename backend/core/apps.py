@@ -0,0 +1,20 @@
+from django.apps import AppConfig
+
+
+class CoreConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'core'
+    verbose_name = 'Общие компоненты'
+
+    def ready(self):
+        from django.conf import settings
+        from django.core.signals import request_started
+
+        from .signals import close_unusable_connections, connect_image_signals
+
+        connect_image_signals()
+        if getattr(settings, 'DB_HEALTH_CHECKS', False):
+            request_started.connect(
+                close_unusable_connections,
+                dispatch_uid='core_db_health_checks',
+            )
@@ -0,0 +1,120 @@
+# Поля с изображениями, для которых строятся адаптивные копии
+IMAGE_FIELDS = (
+    ('catalog.Procedure', 'image'),
+    ('masters.Master', 'photo'),
+    ('homepage.ContentImage', 'image'),
+)
+
+# Ширины адаптивных копий (px) и форматы: расширение -> формат Pillow
+IMAGE_DERIVATIVE_WIDTHS = (320, 640, 1024)
+IMAGE_DERIVATIVE_FORMATS = {
+    'webp': 'WEBP',
+    'jpg': 'JPEG',
+}
+IMAGE_DERIVATIVE_MIME_TYPES = {
+    'webp': 'image/webp',
+    'jpg': 'image/jpeg',
+}
+IMAGE_DERIVATIVE_QUALITY = 80
+IMAGE_DERIVATIVE_SUFFIX = '_w{width}.{ext}'
+IMAGE_DEFAULT_SIZES = '(max-width: 768px) 100vw, 50vw'
+
+# Фоновая генерация копий
+IMAGE_WORKER_THREADS = 1
+
+# Ширина оригинала с готовыми копиями кешируется, чтобы шаблоны не
+# ходили в хранилище на каждое изображение; отсутствие копий (0) -
+# ненадолго, пока копии строятся
+IMAGE_DERIVATIVES_CACHE_KEY = 'image_derivatives_width_{digest}'
+IMAGE_DERIVATIVES_CACHE_TIMEOUT = 24 * 60 * 60
+IMAGE_DERIVATIVES_MISSING_CACHE_TIMEOUT = 60
+
+# Предсжатие статики для nginx gzip_static/brotli_static
+STATIC_COMPRESS_EXTENSIONS = (
+    '.css', '.js', '.svg', '.ico', '.json', '.txt', '.xml', '.html',
+)
+STATIC_COMPRESS_MIN_SIZE = 1024
+
+# Чтение с реплики БД
+REPLICA_DB_ALIAS = 'replica'
+# Приложения, чтение которых можно отдавать реплике
+REPLICA_APP_LABELS = ('about', 'booking', 'catalog', 'homepage', 'masters')
+# Запись в эти приложения не закрепляет клиента за основной БД
+STICKY_EXEMPT_APP_LABELS = ('sessions',)
+# Cookie вместо сессии: проверка не читает сессию из БД на каждом
+# запросе; cookie истекает через REPLICA_STICKY_SECONDS
+REPLICA_STICKY_COOKIE = 'replica_sticky'
+# Сотрудник, открывший админку, читает основную БД и на остальных
+# страницах; cookie живет столько же, сколько сессия
+REPLICA_STAFF_COOKIE = 'replica_staff'
+
+# Учет SQL-запросов на запрос
+QUERY_COUNT_HEADER = 'X-DB-Queries'
+QUERY_TIME_HEADER = 'X-DB-Time-Ms'
+
+# Бюджеты SQL-запросов по URL (manage.py check_query_budgets)
+QUERY_BUDGETS = {
+    'index': 2,
+    'about:info': 2,
+    'catalog:product_list': 2,
+    'catalog:product_detail': 1,
+    'catalog:search': 2,
+    'masters:index': 1,
+    'booking:service_list': 0,
+    'booking:create_booking': 2,
+    'booking:create_booking_with_service': 4,
+    'booking:phone_confirmation': 3,
+    'booking:booking_success': 1,
+    'booking:ajax_masters': 2,
+    'booking:ajax_times': 4,
+    'booking:master_calendar': 0,
+    'user:portal': 5,
+    'reports:dashboard': 5,
+    'api:procedure_list': 1,
+    'api:master_list': 2,
+    'api:master_bookings': 3,
+    'notifications:telegram_webhook': 0,
+    'admin:booking_booking_changelist': 11,
+    'admin:booking_booking_calendar': 8,
+    'admin:user_client_changelist': 7,
+}
+
+# Профилирование запросов
+PROFILING_HEADER = 'X-Profile-Token'
+PROFILING_SAMPLE_INTERVAL = 0.005
+
+# Метрики Prometheus
+METRICS_FILE_PATTERN = 'metrics_{pid}.json'
+# Значения завершившихся воркеров складываются в metrics_archive.json
+METRICS_ARCHIVE_NAME = 'archive'
+METRICS_DEFAULT_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+METRICS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Бенчмарк импорта воркера (manage.py benchmark_imports)
+IMPORT_BENCHMARK_FORBIDDEN_MODULES = ('telethon', 'PIL')
+IMPORT_BENCHMARK_TOP = 15
+
+# Потоковая выгрузка CSV/XLSX из админки
+EXPORT_CHUNK_SIZE = 2000
+# Сколько байт копить перед отправкой очередного куска ответа
+EXPORT_FLUSH_BYTES = 64 * 1024
+EXPORT_CSV = 'csv'
+EXPORT_XLSX = 'xlsx'
+EXPORT_CONTENT_TYPES = {
+    EXPORT_CSV: 'text/csv; charset=utf-8',
+    EXPORT_XLSX: (
+        'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    ),
+}
+EXPORT_FORMAT_PARAM = 'format'
+EXPORT_DATE_FROM_PARAM = 'date_from'
+EXPORT_DATE_TO_PARAM = 'date_to'
+EXPORT_DATE_FORMAT = '%Y-%m-%d'
+EXPORT_TIME_FORMAT = '%H:%M'
+EXPORT_DATETIME_FORMAT = '%Y-%m-%d %H:%M'
+EXPORT_BOOLEAN_LABELS = {True: 'Да', False: 'Нет'}
+# Excel выполняет ячейки CSV, начинающиеся с этих символов, как формулы
+EXPORT_FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+EXPORT_MSG_BAD_PARAMS = 'Некорректный формат или период выгрузки'
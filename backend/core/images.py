@@ -0,0 +1,195 @@
+import hashlib
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from threading import Lock
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.db import transaction
+
+from .constants import (
+    IMAGE_DERIVATIVES_CACHE_KEY,
+    IMAGE_DERIVATIVES_CACHE_TIMEOUT,
+    IMAGE_DERIVATIVES_MISSING_CACHE_TIMEOUT,
+    IMAGE_DERIVATIVE_FORMATS,
+    IMAGE_DERIVATIVE_QUALITY,
+    IMAGE_DERIVATIVE_SUFFIX,
+    IMAGE_DERIVATIVE_WIDTHS,
+    IMAGE_WORKER_THREADS,
+)
+
+# EXIF Orientation 5-8: изображение повернуто на 90 градусов
+EXIF_ORIENTATION_TAG = 0x0112
+EXIF_ROTATED = (5, 6, 7, 8)
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = Lock()
+
+
+def derivative_name(name, width, ext):
+    """Имя адаптивной копии рядом с оригиналом: photo.png -> photo_w640.webp."""
+    root, _ = os.path.splitext(name)
+    return root + IMAGE_DERIVATIVE_SUFFIX.format(width=width, ext=ext)
+
+
+def _cache_key(name):
+    digest = hashlib.md5(name.encode()).hexdigest()
+    return IMAGE_DERIVATIVES_CACHE_KEY.format(digest=digest)
+
+
+def _set_derivatives_cached(name, source_width):
+    cache.set(
+        _cache_key(name),
+        source_width,
+        IMAGE_DERIVATIVES_CACHE_TIMEOUT if source_width
+        else IMAGE_DERIVATIVES_MISSING_CACHE_TIMEOUT,
+    )
+
+
+def _derivatives_exist(storage, name):
+    largest = max(IMAGE_DERIVATIVE_WIDTHS)
+    return all(
+        storage.exists(derivative_name(name, largest, ext))
+        for ext in IMAGE_DERIVATIVE_FORMATS
+    )
+
+
+def _read_source_width(storage, name):
+    """Ширина оригинала с учетом поворота EXIF; читается только заголовок."""
+    from PIL import Image
+
+    with storage.open(name, 'rb') as source:
+        image = Image.open(source)
+        width, height = image.size
+        if image.getexif().get(EXIF_ORIENTATION_TAG) in EXIF_ROTATED:
+            return height
+    return width
+
+
+def get_source_width(field_file, use_cache=True):
+    """
+    Ширина оригинала, по которому построены копии, или 0, если копий
+    еще нет. Ответ хранилища кешируется: на удаленном хранилище
+    exists() и чтение заголовка - сетевые запросы.
+    """
+    if not field_file:
+        return 0
+    if use_cache:
+        cached = cache.get(_cache_key(field_file.name))
+        if cached is not None:
+            return cached
+    source_width = 0
+    if _derivatives_exist(field_file.storage, field_file.name):
+        source_width = _read_source_width(
+            field_file.storage, field_file.name
+        )
+    _set_derivatives_cached(field_file.name, source_width)
+    return source_width
+
+
+def has_derivatives(field_file, use_cache=True):
+    """Проверяет, что копии для файла уже построены."""
+    return bool(get_source_width(field_file, use_cache))
+
+
+def _encode(image, width, image_format):
+    """Уменьшает изображение до ширины width и кодирует в image_format."""
+    from PIL import Image
+
+    if image.width > width:
+        height = round(image.height * width / image.width)
+        image = image.resize((width, height), Image.LANCZOS)
+    if image_format == 'JPEG' and image.mode != 'RGB':
+        image = image.convert('RGB')
+    buffer = BytesIO()
+    image.save(
+        buffer,
+        format=image_format,
+        quality=IMAGE_DERIVATIVE_QUALITY,
+        optimize=True,
+    )
+    return buffer.getvalue()
+
+
+def generate_derivatives(storage, name):
+    """Строит копии всех ширин и форматов рядом с оригиналом."""
+    # Pillow нужен только при построении копий, не при старте воркера
+    from PIL import Image, ImageOps
+
+    with storage.open(name, 'rb') as source:
+        image = ImageOps.exif_transpose(Image.open(source))
+        image.load()
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA')
+
+    for width in IMAGE_DERIVATIVE_WIDTHS:
+        for ext, image_format in IMAGE_DERIVATIVE_FORMATS.items():
+            target = derivative_name(name, width, ext)
+            if storage.exists(target):
+                storage.delete(target)
+            storage.save(
+                target,
+                ContentFile(_encode(image, width, image_format)),
+            )
+    _set_derivatives_cached(name, image.width)
+
+
+def _generate_safely(storage, name):
+    try:
+        generate_derivatives(storage, name)
+    except Exception:
+        logger.exception('Не удалось построить копии изображения %s', name)
+
+
+def _get_executor():
+    """
+    Пул фоновой генерации создается лениво (после fork воркера).
+    Задачи в очереди теряются при перезапуске воркера (max_requests),
+    недостающие копии достраивает generate_image_derivatives.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=IMAGE_WORKER_THREADS,
+                thread_name_prefix='image-derivatives',
+            )
+    return _executor
+
+
+def schedule_derivatives(field_file):
+    """Ставит генерацию копий в фон после коммита транзакции."""
+    if not field_file:
+        return
+    storage, name = field_file.storage, field_file.name
+    transaction.on_commit(
+        lambda: _get_executor().submit(_generate_safely, storage, name)
+    )
+
+
+def srcset_widths(source_width):
+    """
+    Пары (ширина в имени копии, настоящая ширина). Копии не шире
+    оригинала, поэтому из копий, упершихся в его ширину, в srcset
+    остается одна - с настоящей шириной.
+    """
+    widths = []
+    for width in sorted(IMAGE_DERIVATIVE_WIDTHS):
+        actual = min(width, source_width)
+        widths.append((width, actual))
+        if actual < width:
+            break
+    return widths
+
+
+def srcset(field_file, ext, source_width):
+    """Значение атрибута srcset для копий заданного формата."""
+    return ', '.join(
+        f'{field_file.storage.url(derivative_name(field_file.name, w, ext))} '
+        f'{actual}w'
+        for w, actual in srcset_widths(source_width)
+    )
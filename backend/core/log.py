@@ -0,0 +1,55 @@
+"""
+Логирование через loguru.
+
+Стандартный logging (Django, Telethon, модули на logging.getLogger)
+перенаправляется в loguru через InterceptHandler. Вывод в stderr
+идет через очередь (enqueue) и в проде сериализуется в JSON.
+"""
+import inspect
+import logging
+import logging.config
+import sys
+
+from loguru import logger
+
+
+class InterceptHandler(logging.Handler):
+    """Передает записи стандартного logging в loguru."""
+
+    def emit(self, record):
+        try:
+            level = logger.level(record.levelname).name
+        except ValueError:
+            level = record.levelno
+
+        # Ищем кадр, из которого вызвали logging, чтобы сохранить
+        # правильные module/function/line в записи loguru
+        frame, depth = inspect.currentframe(), 0
+        while frame and (
+            depth == 0 or frame.f_code.co_filename == logging.__file__
+        ):
+            frame = frame.f_back
+            depth += 1
+
+        logger.opt(depth=depth, exception=record.exc_info).log(
+            level, record.getMessage()
+        )
+
+
+def configure_logging(logging_settings):
+    """
+    LOGGING_CONFIG: настраивает sink loguru, затем применяет LOGGING.
+    """
+    from django.conf import settings
+
+    logger.remove()
+    logger.add(
+        sys.stderr,
+        level=settings.LOG_LEVEL,
+        serialize=settings.LOG_JSON,
+        enqueue=settings.LOG_ENQUEUE,
+        backtrace=False,
+        diagnose=False,
+    )
+    if logging_settings:
+        logging.config.dictConfig(logging_settings)
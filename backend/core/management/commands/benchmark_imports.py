@@ -0,0 +1,112 @@
+import json
+import os
+import subprocess
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ...constants import (
+    IMPORT_BENCHMARK_FORBIDDEN_MODULES,
+    IMPORT_BENCHMARK_TOP,
+)
+
+# Выполняется в отдельном интерпретаторе: загружает приложение так же,
+# как воркер gunicorn (WSGI + все URLconf/views), и сообщает RSS
+WORKER_BOOT_SCRIPT = '''
+import json, resource, sys
+from django_pro.wsgi import application
+from django.urls import get_resolver
+get_resolver().url_patterns
+print(json.dumps({
+    "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    "modules": sorted(sys.modules),
+}))
+'''
+
+
+class Command(BaseCommand):
+    """
+    Время импорта и память при загрузке воркера
+    python manage.py benchmark_imports --max-ms 1500 --max-rss-mb 120.
+    """
+
+    help = 'Измеряет загрузку воркера через python -X importtime'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--max-ms',
+            type=float,
+            default=None,
+            help='Ошибка, если суммарное время импорта больше (мс)',
+        )
+        parser.add_argument(
+            '--max-rss-mb',
+            type=float,
+            default=None,
+            help='Ошибка, если пиковая память процесса больше (МБ)',
+        )
+        parser.add_argument(
+            '--top',
+            type=int,
+            default=IMPORT_BENCHMARK_TOP,
+            help='Сколько самых медленных модулей показать',
+        )
+
+    def handle(self, *args, **options):
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', WORKER_BOOT_SCRIPT],
+            capture_output=True,
+            text=True,
+            env=dict(os.environ),
+        )
+        if result.returncode:
+            raise CommandError(result.stderr[-2000:])
+
+        report = json.loads(result.stdout.strip().splitlines()[-1])
+        timings = self._parse_importtime(result.stderr)
+        total_ms = sum(self_us for self_us, _, _ in timings) / 1000
+        rss_mb = report['max_rss_kb'] / 1024
+
+        self.stdout.write(f'⏱ Импорт: {total_ms:.0f} мс')
+        self.stdout.write(f'💾 Пиковый RSS: {rss_mb:.1f} МБ')
+        packages = {}
+        for self_us, _, name in timings:
+            package = name.strip().split('.')[0]
+            packages[package] = packages.get(package, 0) + self_us
+        self.stdout.write('🐢 Самые тяжелые пакеты:')
+        for package, self_us in sorted(
+            packages.items(), reverse=True, key=lambda item: item[1]
+        )[:options['top']]:
+            self.stdout.write(f'   {self_us / 1000:8.1f} мс  {package}')
+
+        errors = []
+        loaded = set(report['modules'])
+        for module in IMPORT_BENCHMARK_FORBIDDEN_MODULES:
+            if module in loaded:
+                errors.append(f'модуль {module} загружается при старте')
+        if options['max_ms'] is not None and total_ms > options['max_ms']:
+            errors.append(
+                f'импорт {total_ms:.0f} мс > {options["max_ms"]:.0f} мс'
+            )
+        if (
+            options['max_rss_mb'] is not None
+            and rss_mb > options['max_rss_mb']
+        ):
+            errors.append(
+                f'RSS {rss_mb:.1f} МБ > {options["max_rss_mb"]:.1f} МБ'
+            )
+        if errors:
+            raise CommandError('; '.join(errors))
+        self.stdout.write(self.style.SUCCESS('🎉 Бюджет загрузки соблюден'))
+
+    def _parse_importtime(self, stderr):
+        """Строки `import time: self | cumulative | name` -> кортежи."""
+        timings = []
+        for line in stderr.splitlines():
+            if not line.startswith('import time:'):
+                continue
+            parts = line[len('import time:'):].split('|')
+            if len(parts) != 3 or not parts[0].strip().isdigit():
+                continue
+            timings.append((int(parts[0]), int(parts[1]), parts[2].strip()))
+        return timings
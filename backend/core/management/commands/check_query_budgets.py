@@ -0,0 +1,79 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client as TestClient
+from django.test.utils import (
+    setup_databases,
+    setup_test_environment,
+    teardown_databases,
+    teardown_test_environment,
+)
+
+from ...constants import QUERY_BUDGETS
+from ...querybudgets import (
+    budget_request,
+    create_budget_fixtures,
+    get_budget_cases,
+)
+from ...querycount import count_queries
+
+
+class Command(BaseCommand):
+    """
+    Проверка бюджетов SQL-запросов для страниц и AJAX endpoints
+    python manage.py check_query_budgets.
+
+    Команда создает тестовую БД, наполняет ее данными и завершается
+    с ошибкой, если какая-либо страница превысила бюджет из
+    core.constants.QUERY_BUDGETS. Печатает фактическое число запросов
+    по каждой странице; в CI бюджеты проверяет тест
+    core.tests.test_query_budgets на тех же сценариях.
+    """
+
+    help = 'Проверяет число SQL-запросов на страницах против бюджетов'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--show-sql',
+            action='store_true',
+            help='Печатать запросы для страниц, превысивших бюджет',
+        )
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            failures = self._check_budgets(options['show_sql'])
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+
+        if failures:
+            raise CommandError(
+                f'Превышен бюджет запросов: {", ".join(failures)}'
+            )
+        self.stdout.write(self.style.SUCCESS('🎉 Все бюджеты соблюдены'))
+
+    def _check_budgets(self, show_sql):
+        objects = create_budget_fixtures()
+        client = TestClient()
+        client.force_login(objects['admin'])
+
+        failures = []
+        for name, method, url, data in get_budget_cases(client, objects):
+            budget = QUERY_BUDGETS[name]
+            # Первый запрос прогревает кеши, считаем повторный
+            budget_request(client, method, url, data)
+            with count_queries(record_sql=show_sql) as counter:
+                response = budget_request(client, method, url, data)
+
+            line = (
+                f'{name}: {counter.count}/{budget} запросов, '
+                f'{counter.duration_ms} мс, HTTP {response.status_code}'
+            )
+            if counter.count > budget:
+                failures.append(name)
+                self.stdout.write(self.style.ERROR(f'❌ {line}'))
+                for sql in counter.queries:
+                    self.stdout.write(f'    {sql}')
+            else:
+                self.stdout.write(f'✅ {line}')
+        return failures
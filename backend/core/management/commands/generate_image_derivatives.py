@@ -0,0 +1,53 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from ...constants import IMAGE_FIELDS
+from ...images import generate_derivatives, has_derivatives
+
+
+class Command(BaseCommand):
+    """
+    Построение адаптивных копий для уже загруженных изображений
+    python manage.py generate_image_derivatives.
+
+    Без --force достраивает только недостающие копии, поэтому подходит
+    для периодического запуска (cron): так восстанавливаются фоновые
+    задачи, потерянные при перезапуске воркера. Наличие копий
+    проверяется в хранилище, мимо кеша.
+    """
+
+    help = 'Строит WebP/JPEG копии изображений разных ширин'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Перестроить копии, даже если они уже есть',
+        )
+
+    def handle(self, *args, **options):
+        built = 0
+        for model_label, field_name in IMAGE_FIELDS:
+            model = apps.get_model(model_label)
+            queryset = model.objects.exclude(
+                **{field_name: ''}
+            ).exclude(
+                **{f'{field_name}__isnull': True}
+            ).only('pk', field_name)
+            for instance in queryset.iterator():
+                field_file = getattr(instance, field_name)
+                if not options['force'] and has_derivatives(
+                    field_file, use_cache=False
+                ):
+                    continue
+                try:
+                    generate_derivatives(field_file.storage, field_file.name)
+                except Exception as e:
+                    self.stdout.write(f'❌ {field_file.name}: {e}')
+                    continue
+                built += 1
+                self.stdout.write(f'✅ {field_file.name}')
+
+        self.stdout.write(
+            self.style.SUCCESS(f'🎉 Построены копии для {built} изображений')
+        )
@@ -0,0 +1,79 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    """
+    Нагрузочный тест запущенного сервера
+    python manage.py loadtest http://127.0.0.1:8000/catalog/ -c 16 -n 2000.
+    """
+
+    help = 'Параллельные GET-запросы к URL: RPS и перцентили задержки'
+
+    def add_arguments(self, parser):
+        parser.add_argument('urls', nargs='+', help='URL для запросов')
+        parser.add_argument(
+            '-c', '--concurrency',
+            type=int,
+            default=16,
+            help='Число одновременных клиентов',
+        )
+        parser.add_argument(
+            '-n', '--requests',
+            type=int,
+            default=1000,
+            help='Общее число запросов',
+        )
+        parser.add_argument(
+            '--timeout',
+            type=float,
+            default=30,
+            help='Таймаут одного запроса, секунды',
+        )
+
+    def handle(self, *args, **options):
+        urls = options['urls']
+        local = threading.local()
+
+        def fetch(number):
+            session = getattr(local, 'session', None)
+            if session is None:
+                session = local.session = requests.Session()
+            url = urls[number % len(urls)]
+            start = time.perf_counter()
+            try:
+                response = session.get(url, timeout=options['timeout'])
+                ok = response.status_code < 500
+            except requests.RequestException:
+                ok = False
+            return time.perf_counter() - start, ok
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(options['concurrency']) as executor:
+            results = list(executor.map(fetch, range(options['requests'])))
+        elapsed = time.perf_counter() - started
+
+        latencies = sorted(latency for latency, _ in results)
+        errors = sum(1 for _, ok in results if not ok)
+        if not latencies:
+            raise CommandError('Не выполнено ни одного запроса')
+
+        def percentile(value):
+            index = min(len(latencies) - 1, int(len(latencies) * value))
+            return latencies[index] * 1000
+
+        self.stdout.write(
+            f'📈 {len(results)} запросов, {options["concurrency"]} клиентов, '
+            f'{elapsed:.1f} с'
+        )
+        self.stdout.write(f'   RPS: {len(results) / elapsed:.1f}')
+        self.stdout.write(
+            f'   p50: {percentile(0.50):.1f} мс, '
+            f'p95: {percentile(0.95):.1f} мс, '
+            f'p99: {percentile(0.99):.1f} мс'
+        )
+        self.stdout.write(f'   Ошибки: {errors}')
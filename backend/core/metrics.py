@@ -0,0 +1,320 @@
+"""
+Простой реестр метрик (счетчики и гистограммы) в формате Prometheus.
+
+Каждый процесс держит значения в памяти и, если задан METRICS_DIR,
+периодически сбрасывает их в собственный файл metrics_<pid>.json.
+Эндпоинт /metrics суммирует файлы всех процессов, поэтому метрики
+корректны при нескольких воркерах gunicorn.
+"""
+import asyncio
+import atexit
+import glob
+import json
+import os
+import threading
+import time
+from contextlib import ContextDecorator
+from functools import wraps
+
+from django.conf import settings
+
+from .constants import (
+    METRICS_ARCHIVE_NAME,
+    METRICS_DEFAULT_BUCKETS,
+    METRICS_FILE_PATTERN,
+)
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics = {}
+        self.lock = threading.Lock()
+        self.last_flush = 0.0
+
+    def register(self, metric):
+        existing = self.metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self.metrics[metric.name] = metric
+        return metric
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                name: metric.describe()
+                for name, metric in self.metrics.items()
+            }
+
+    def maybe_flush(self):
+        directory = getattr(settings, 'METRICS_DIR', '')
+        if not directory:
+            return
+        now = time.monotonic()
+        if now - self.last_flush < settings.METRICS_FLUSH_INTERVAL:
+            return
+        self.last_flush = now
+        self.flush()
+
+    def flush(self):
+        """Записывает значения процесса в METRICS_DIR/metrics_<pid>.json."""
+        directory = getattr(settings, 'METRICS_DIR', '')
+        if not directory:
+            return
+        snapshot = self.snapshot()
+        if not any(metric['values'] for metric in snapshot.values()):
+            return
+        os.makedirs(directory, exist_ok=True)
+        _write_snapshot(_process_path(directory, os.getpid()), snapshot)
+
+
+def _process_path(directory, pid):
+    return os.path.join(directory, METRICS_FILE_PATTERN.format(pid=pid))
+
+
+def _read_snapshot(path):
+    try:
+        with open(path, encoding='utf-8') as dump:
+            return json.load(dump)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_snapshot(path, snapshot):
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as dump:
+        json.dump(snapshot, dump)
+    os.replace(tmp_path, path)
+
+
+REGISTRY = MetricsRegistry()
+atexit.register(REGISTRY.flush)
+
+
+def _label_key(labelnames, labels):
+    if set(labels) != set(labelnames):
+        raise ValueError(
+            f'Ожидались метки {labelnames}, получены {tuple(labels)}'
+        )
+    return tuple(str(labels[name]) for name in labelnames)
+
+
+class Counter:
+    """Монотонно растущий счетчик."""
+
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+
+    def inc(self, amount=1, **labels):
+        key = _label_key(self.labelnames, labels)
+        with REGISTRY.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+        REGISTRY.maybe_flush()
+
+    def describe(self):
+        return {
+            'kind': self.kind,
+            'documentation': self.documentation,
+            'labelnames': list(self.labelnames),
+            'values': [
+                [list(key), value] for key, value in self.values.items()
+            ],
+        }
+
+
+class _HistogramTimer(ContextDecorator):
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def _recreate_cm(self):
+        # Новый таймер на каждый вызов декорированной функции
+        return _HistogramTimer(self.histogram, self.labels)
+
+    def __call__(self, func):
+        if not asyncio.iscoroutinefunction(func):
+            return super().__call__(func)
+
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            with self._recreate_cm():
+                return await func(*args, **kwargs)
+        return wrapper
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(
+            time.perf_counter() - self.start, **self.labels
+        )
+        return False
+
+
+class Histogram:
+    """Распределение значений по корзинам (обычно длительности в секундах)."""
+
+    kind = 'histogram'
+
+    def __init__(
+        self,
+        name,
+        documentation,
+        labelnames=(),
+        buckets=METRICS_DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self.values = {}
+
+    def observe(self, value, **labels):
+        key = _label_key(self.labelnames, labels)
+        with REGISTRY.lock:
+            state = self.values.get(key)
+            if state is None:
+                state = self.values[key] = {
+                    'buckets': [0] * len(self.buckets),
+                    'sum': 0.0,
+                    'count': 0,
+                }
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state['buckets'][index] += 1
+            state['sum'] += value
+            state['count'] += 1
+        REGISTRY.maybe_flush()
+
+    def time(self, **labels):
+        """Контекстный менеджер / декоратор, измеряющий длительность."""
+        return _HistogramTimer(self, labels)
+
+    def describe(self):
+        return {
+            'kind': self.kind,
+            'documentation': self.documentation,
+            'labelnames': list(self.labelnames),
+            'buckets': list(self.buckets),
+            'values': [
+                [list(key), dict(state, buckets=list(state['buckets']))]
+                for key, state in self.values.items()
+            ],
+        }
+
+
+def counter(name, documentation, labelnames=()):
+    return REGISTRY.register(Counter(name, documentation, labelnames))
+
+
+def histogram(name, documentation, labelnames=(), **kwargs):
+    return REGISTRY.register(
+        Histogram(name, documentation, labelnames, **kwargs)
+    )
+
+
+def _collect_snapshots():
+    directory = getattr(settings, 'METRICS_DIR', '')
+    if not directory:
+        return [REGISTRY.snapshot()]
+    REGISTRY.flush()
+    snapshots = (
+        _read_snapshot(path)
+        for path in glob.glob(_process_path(directory, '*'))
+    )
+    return [snapshot for snapshot in snapshots if snapshot]
+
+
+def archive_process_metrics(pid):
+    """
+    Переносит значения завершившегося процесса в общий архивный файл,
+    чтобы перезапуски воркеров (max_requests) не плодили файлы.
+    Вызывается из мастера gunicorn (хук child_exit).
+    """
+    directory = getattr(settings, 'METRICS_DIR', '')
+    if not directory:
+        return
+    path = _process_path(directory, pid)
+    snapshot = _read_snapshot(path)
+    if snapshot is None:
+        return
+    archive_path = _process_path(directory, METRICS_ARCHIVE_NAME)
+    merged = _merge(
+        [_read_snapshot(archive_path) or {}, snapshot]
+    )
+    _write_snapshot(archive_path, {
+        name: dict(metric, values=[
+            [list(key), value] for key, value in metric['values'].items()
+        ])
+        for name, metric in merged.items()
+    })
+    os.remove(path)
+
+
+def _merge(snapshots):
+    """Складывает значения одноименных метрик из всех процессов."""
+    merged = {}
+    for snapshot in snapshots:
+        for name, description in snapshot.items():
+            metric = merged.setdefault(name, dict(description, values={}))
+            values = metric['values']
+            for labels, value in description['values']:
+                key = tuple(labels)
+                if description['kind'] == 'counter':
+                    values[key] = values.get(key, 0) + value
+                    continue
+                state = values.setdefault(key, {
+                    'buckets': [0] * len(description['buckets']),
+                    'sum': 0.0,
+                    'count': 0,
+                })
+                for index, bucket in enumerate(value['buckets']):
+                    state['buckets'][index] += bucket
+                state['sum'] += value['sum']
+                state['count'] += value['count']
+    return merged
+
+
+def _format_labels(labelnames, values, extra=()):
+    pairs = list(zip(labelnames, values)) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (
+        '{}="{}"'.format(
+            name,
+            value.replace('\\', '\\\\').replace('"', '\\"').replace(
+                '\n', '\\n'
+            ),
+        )
+        for name, value in pairs
+    )
+    return '{' + ','.join(escaped) + '}'
+
+
+def render_prometheus():
+    """Текстовый формат Prometheus 0.0.4 по всем процессам."""
+    lines = []
+    for name, metric in sorted(_merge(_collect_snapshots()).items()):
+        labelnames = metric['labelnames']
+        lines.append(f'# HELP {name} {metric["documentation"]}')
+        lines.append(f'# TYPE {name} {metric["kind"]}')
+        for key, value in sorted(metric['values'].items()):
+            labels = _format_labels(labelnames, key)
+            if metric['kind'] == 'counter':
+                lines.append(f'{name}{labels} {value}')
+                continue
+            for bound, count in zip(metric['buckets'], value['buckets']):
+                bucket_labels = _format_labels(
+                    labelnames, key, [('le', repr(float(bound)))]
+                )
+                lines.append(f'{name}_bucket{bucket_labels} {count}')
+            bucket_labels = _format_labels(labelnames, key, [('le', '+Inf')])
+            lines.append(f'{name}_bucket{bucket_labels} {value["count"]}')
+            lines.append(f'{name}_sum{labels} {value["sum"]}')
+            lines.append(f'{name}_count{labels} {value["count"]}')
+    return '\n'.join(lines) + '\n'
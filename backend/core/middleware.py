@@ -0,0 +1,198 @@
+import logging
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare
+from django.utils.text import slugify
+
+from .constants import (
+    PROFILING_HEADER,
+    PROFILING_SAMPLE_INTERVAL,
+    QUERY_COUNT_HEADER,
+    QUERY_TIME_HEADER,
+    REPLICA_DB_ALIAS,
+    REPLICA_STAFF_COOKIE,
+    REPLICA_STICKY_COOKIE,
+)
+from .profiling import (
+    StackSampler,
+    instrument_external_calls,
+    start_profile,
+    stop_profile,
+    write_collapsed,
+)
+from .querycount import count_queries
+from .routers import RoutingState, reset_routing_state, set_routing_state
+
+logger = logging.getLogger(__name__)
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Направляет чтения на реплику и закрепляет клиента за основной БД
+    после записи (cookie на REPLICA_STICKY_SECONDS). Админка и
+    сотрудники (cookie REPLICA_STAFF_COOKIE) всегда читают основную БД:
+    они правят записи и должны сразу видеть изменения. Отключается,
+    если реплика не настроена.
+    """
+
+    def __init__(self, get_response):
+        if REPLICA_DB_ALIAS not in settings.DATABASES:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        is_admin = request.path.startswith(reverse('admin:index'))
+        state = RoutingState(
+            use_primary=(
+                is_admin
+                or request.method not in SAFE_METHODS
+                or REPLICA_STICKY_COOKIE in request.COOKIES
+                or REPLICA_STAFF_COOKIE in request.COOKIES
+            )
+        )
+        token = set_routing_state(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            reset_routing_state(token)
+
+        if state.wrote:
+            response.set_cookie(
+                REPLICA_STICKY_COOKIE,
+                '1',
+                max_age=settings.REPLICA_STICKY_SECONDS,
+                httponly=True,
+                samesite='Lax',
+            )
+        # Админка сама загружает пользователя, лишних запросов нет;
+        # на публичных страницах сотрудника узнают по cookie
+        if (
+            is_admin
+            and REPLICA_STAFF_COOKIE not in request.COOKIES
+            and request.user.is_staff
+        ):
+            response.set_cookie(
+                REPLICA_STAFF_COOKIE,
+                '1',
+                max_age=settings.SESSION_COOKIE_AGE,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
+
+
+class QueryCountMiddleware:
+    """
+    Считает SQL-запросы и их время для каждого запроса, отдает их
+    в заголовках и пишет предупреждение при превышении порога.
+    Включается настройкой QUERY_COUNT_ENABLED.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'QUERY_COUNT_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.warn_threshold = settings.QUERY_COUNT_WARN_THRESHOLD
+
+    def __call__(self, request):
+        with count_queries() as counter:
+            response = self.get_response(request)
+
+        response[QUERY_COUNT_HEADER] = str(counter.count)
+        response[QUERY_TIME_HEADER] = str(counter.duration_ms)
+        if counter.count > self.warn_threshold:
+            logger.warning(
+                '%s %s: %s SQL-запросов за %s мс',
+                request.method,
+                request.path,
+                counter.count,
+                counter.duration_ms,
+            )
+        return response
+
+
+class ProfilingMiddleware:
+    """
+    Профилирует выбранные запросы: по заголовку X-Profile-Token
+    или случайно с вероятностью PROFILING_SAMPLE_RATE.
+
+    Для запроса пишутся общее время, число и время SQL, время
+    внешних HTTP/SMTP-вызовов и свернутые стеки в PROFILING_DIR.
+    При PROFILING_ENABLED = False middleware не подключается.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'PROFILING_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sample_rate = settings.PROFILING_SAMPLE_RATE
+        self.token = settings.PROFILING_TOKEN
+        self.directory = settings.PROFILING_DIR
+        instrument_external_calls()
+
+    def _requested_by_header(self, request):
+        header = request.headers.get(PROFILING_HEADER)
+        return bool(
+            self.token and header
+            and constant_time_compare(header, self.token)
+        )
+
+    def __call__(self, request):
+        by_header = self._requested_by_header(request)
+        if not by_header and not (
+            self.sample_rate and random.random() < self.sample_rate
+        ):
+            return self.get_response(request)
+
+        profile, token = start_profile()
+        sampler = StackSampler(
+            threading.get_ident(), PROFILING_SAMPLE_INTERVAL
+        )
+        sampler.start()
+        start = time.perf_counter()
+        try:
+            with count_queries() as counter:
+                response = self.get_response(request)
+        finally:
+            total_ms = (time.perf_counter() - start) * 1000
+            stacks = sampler.stop()
+            stop_profile(token)
+
+        name = '{}-{}-{}'.format(
+            timezone.now().strftime('%Y%m%dT%H%M%S%f'),
+            request.method.lower(),
+            slugify(request.path) or 'root',
+        )
+        path = write_collapsed(self.directory, name, stacks)
+        external = {
+            kind: round(seconds * 1000, 2)
+            for kind, seconds in profile.external_time.items()
+        }
+        logger.info(
+            'profile %s %s: %.2f мс, SQL %s за %s мс, внешние %s, стеки %s',
+            request.method,
+            request.path,
+            total_ms,
+            counter.count,
+            counter.duration_ms,
+            external,
+            path,
+        )
+        if by_header:
+            timings = [
+                f'total;dur={total_ms:.2f}',
+                f'db;dur={counter.duration_ms};desc="{counter.count} SQL"',
+            ] + [
+                f'{kind};dur={duration}'
+                for kind, duration in external.items()
+            ]
+            response['Server-Timing'] = ', '.join(timings)
+        return response
@@ -0,0 +1,86 @@
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+
+
+def encode_cursor(values):
+    """Кодирует значения ключа сортировки в строку курсора."""
+    raw = json.dumps(values, cls=DjangoJSONEncoder, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, size):
+    """Декодирует курсор. Возвращает None, если курсор некорректен."""
+    if not cursor:
+        return None
+    try:
+        padding = '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(cursor + padding))
+    except (binascii.Error, ValueError):
+        return None
+    if not isinstance(values, list) or len(values) != size:
+        return None
+    return values
+
+
+def parse_cursor(cursor, ordering, model):
+    """
+    Декодирует курсор и приводит значения к типам полей ordering модели.
+    Возвращает None, если курсор некорректен: подделанные значения не
+    должны доходить до ORM.
+    """
+    values = decode_cursor(cursor, len(ordering))
+    if values is None:
+        return None
+    parsed = []
+    for field_name, value in zip(ordering, values):
+        if value is None or isinstance(value, (list, dict)):
+            return None
+        field = model._meta.get_field(field_name.lstrip('-'))
+        try:
+            parsed.append(field.to_python(value))
+        except (ValidationError, TypeError, ValueError):
+            return None
+    return parsed
+
+
+def _after_cursor_filter(ordering, values):
+    """Строит условие «строго после курсора» для составного ключа."""
+    condition = Q()
+    for index, field in enumerate(ordering):
+        name = field.lstrip('-')
+        lookup = 'lt' if field.startswith('-') else 'gt'
+        step = Q(**{f'{name}__{lookup}': values[index]})
+        for prev_field, prev_value in zip(ordering[:index], values):
+            step &= Q(**{prev_field.lstrip('-'): prev_value})
+        condition |= step
+    return condition
+
+
+def keyset_paginate(queryset, ordering, cursor, page_size):
+    """
+    Keyset-пагинация по уникальному составному ключу.
+
+    Последнее поле ordering должно быть уникальным (обычно id).
+    Некорректный курсор считается отсутствующим (первая страница).
+    Возвращает список объектов страницы и курсор следующей страницы
+    (None, если страница последняя).
+    """
+    values = parse_cursor(cursor, ordering, queryset.model)
+    queryset = queryset.order_by(*ordering)
+    if values is not None:
+        queryset = queryset.filter(_after_cursor_filter(ordering, values))
+
+    items = list(queryset[:page_size + 1])
+    next_cursor = None
+    if len(items) > page_size:
+        items = items[:page_size]
+        last = items[-1]
+        next_cursor = encode_cursor([
+            getattr(last, field.lstrip('-')) for field in ordering
+        ])
+    return items, next_cursor
@@ -0,0 +1,132 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from functools import wraps
+
+_current_profile = ContextVar('current_profile', default=None)
+_instrumented = False
+
+
+class RequestProfile:
+    """Время внешних вызовов (HTTP, SMTP) внутри одного запроса."""
+
+    def __init__(self):
+        self.external_time = Counter()
+        self.external_calls = Counter()
+
+    def add_external(self, kind, seconds):
+        self.external_time[kind] += seconds
+        self.external_calls[kind] += 1
+
+
+def start_profile():
+    profile = RequestProfile()
+    return profile, _current_profile.set(profile)
+
+
+def stop_profile(token):
+    _current_profile.reset(token)
+
+
+def timed_external(kind):
+    """
+    Учитывает время вызова (в том числе async) в текущем профиле,
+    если он есть.
+    """
+    def decorator(func):
+        if asyncio.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                profile = _current_profile.get()
+                if profile is None:
+                    return await func(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    profile.add_external(kind, time.perf_counter() - start)
+            return async_wrapper
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            profile = _current_profile.get()
+            if profile is None:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profile.add_external(kind, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def instrument_external_calls():
+    """
+    Оборачивает HTTP-клиенты (requests и httpx: Telegram Bot API)
+    и SMTP-бэкенд Django. Вне профилируемого запроса обертка сводится
+    к чтению ContextVar.
+    """
+    global _instrumented
+    if _instrumented:
+        return
+    import httpx
+    import requests
+    from django.core.mail.backends.smtp import EmailBackend
+
+    requests.Session.send = timed_external('http')(requests.Session.send)
+    httpx.Client.send = timed_external('http')(httpx.Client.send)
+    httpx.AsyncClient.send = timed_external('http')(httpx.AsyncClient.send)
+    EmailBackend.send_messages = timed_external('smtp')(
+        EmailBackend.send_messages
+    )
+    _instrumented = True
+
+
+def _collapse_stack(frame):
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        module = frame.f_globals.get('__name__', '?')
+        names.append(f'{module}:{code.co_name}')
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+
+class StackSampler(threading.Thread):
+    """
+    Периодически снимает стек указанного потока и копит
+    свернутые стеки (формат collapsed для flamegraph.pl/speedscope).
+    """
+
+    def __init__(self, thread_id, interval):
+        super().__init__(name='stack-sampler', daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stopped = threading.Event()
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                self.stacks[_collapse_stack(frame)] += 1
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
+        return self.stacks
+
+
+def write_collapsed(directory, name, stacks):
+    """Сохраняет стеки в файл `<name>.collapsed`, возвращает путь."""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f'{name}.collapsed')
+    with open(path, 'w', encoding='utf-8') as dump:
+        for stack, count in stacks.most_common():
+            dump.write(f'{stack} {count}\n')
+    return path
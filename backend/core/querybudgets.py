@@ -0,0 +1,208 @@
+"""
+Сценарии проверки бюджетов SQL-запросов (core.constants.QUERY_BUDGETS).
+
+Используются тестом core.tests.test_query_budgets и командой
+check_query_budgets: данные, страницы и способ запроса общие.
+"""
+import json
+from datetime import time, timedelta
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from django.utils import timezone
+
+FIXTURE_SIZE = 10
+
+
+def budget_request(client, method, url, data):
+    """Запрос сценария: POST отправляется как JSON."""
+    if method == 'post':
+        return client.post(
+            url, data, content_type='application/json'
+        )
+    return client.get(url, data)
+
+
+def get_budget_cases(client, objects):
+    """
+    Сценарии [(имя бюджета, метод, url, данные)]. Кладет в сессию
+    client незавершенную запись для страницы подтверждения.
+    """
+    from booking.constants import SESSION_PENDING_BOOKING
+    from booking.ics import get_feed_url
+    from user.portal import get_portal_url
+
+    procedure = objects['procedure']
+    master = objects['master']
+    booking = objects['booking']
+
+    session = client.session
+    session[SESSION_PENDING_BOOKING] = {
+        'items': [{
+            'procedure_id': procedure.id,
+            'master_id': master.id,
+            'booking_time': booking.booking_time.isoformat(),
+        }],
+        'booking_date': booking.booking_date.isoformat(),
+        'client_phone': '+79990000000',
+    }
+    session.save()
+
+    return [
+        ('index', 'get', reverse('homepage:index'), {}),
+        ('about:info', 'get', reverse('about:info'), {}),
+        (
+            'catalog:product_list', 'get',
+            reverse('catalog:product_list'), {},
+        ),
+        (
+            'catalog:search', 'get',
+            reverse('catalog:search'), {'q': 'процедура'},
+        ),
+        (
+            'catalog:product_detail', 'get',
+            reverse('catalog:product_detail', args=[procedure.pk]), {},
+        ),
+        ('masters:index', 'get', reverse('masters:index'), {}),
+        (
+            'booking:service_list', 'get',
+            reverse('booking:service_list'), {},
+        ),
+        (
+            'booking:create_booking', 'get',
+            reverse('booking:create_booking'), {},
+        ),
+        (
+            'booking:create_booking_with_service', 'get',
+            reverse(
+                'booking:create_booking_with_service',
+                args=[procedure.pk],
+            ),
+            {},
+        ),
+        (
+            'booking:phone_confirmation', 'get',
+            reverse('booking:phone_confirmation'), {},
+        ),
+        (
+            'booking:booking_success', 'get',
+            reverse('booking:booking_success', args=[booking.booking_id]),
+            {},
+        ),
+        (
+            'booking:ajax_masters', 'get',
+            reverse('booking:ajax_masters'),
+            {'procedure_id': procedure.pk},
+        ),
+        (
+            'booking:ajax_times', 'get',
+            reverse('booking:ajax_times'),
+            {
+                'master_id': master.pk,
+                'procedure_id': procedure.pk,
+                'date': booking.booking_date.isoformat(),
+            },
+        ),
+        (
+            'booking:master_calendar', 'get',
+            get_feed_url(master.pk), {},
+        ),
+        (
+            'user:portal', 'get',
+            get_portal_url(booking.client_id), {},
+        ),
+        ('reports:dashboard', 'get', reverse('reports:dashboard'), {}),
+        ('api:procedure_list', 'get', reverse('api:procedure_list'), {}),
+        ('api:master_list', 'get', reverse('api:master_list'), {}),
+        (
+            'api:master_bookings', 'get',
+            reverse('api:master_bookings', args=[master.pk]),
+            {'date_from': booking.booking_date.isoformat()},
+        ),
+        (
+            'notifications:telegram_webhook', 'post',
+            reverse('notifications:telegram_webhook'),
+            json.dumps({}),
+        ),
+        (
+            'admin:booking_booking_changelist', 'get',
+            reverse('admin:booking_booking_changelist'), {},
+        ),
+        (
+            'admin:booking_booking_calendar', 'get',
+            reverse('admin:booking_booking_calendar'),
+            {'week': booking.booking_date.isoformat()},
+        ),
+        (
+            'admin:user_client_changelist', 'get',
+            reverse('admin:user_client_changelist'), {},
+        ),
+    ]
+
+
+def create_budget_fixtures():
+    """Несколько объектов каждого вида, чтобы N+1 стали заметны."""
+    from about.models import Address
+    from booking.models import Booking
+    from catalog.models import Category, Procedure
+    from masters.models import Master
+    from user.models import Client
+
+    category = Category.objects.create(
+        title='Категория', short_description='Описание'
+    )
+    procedures = [
+        Procedure.objects.create(
+            category=category,
+            title=f'Процедура {number}',
+            short_description='Описание',
+            description='Описание',
+            duration=timedelta(minutes=60),
+            price=1000,
+        )
+        for number in range(FIXTURE_SIZE)
+    ]
+    masters = []
+    for number in range(FIXTURE_SIZE):
+        master = Master.objects.create(
+            name=f'Мастер {number}',
+            specialization='Специализация',
+            description='Описание',
+            age=30,
+            phone=f'+7900000{number:04d}',
+            is_contact_phone=number == 0,
+        )
+        master.procedures.set(procedures)
+        masters.append(master)
+    Address.objects.create(
+        address='Адрес', is_display_address=True, is_legal_address=True
+    )
+
+    booking_date = timezone.localdate() + timedelta(days=1)
+    bookings = []
+    for number in range(FIXTURE_SIZE):
+        client = Client.objects.create(
+            phone=f'+7911000{number:04d}',
+            name=f'Клиент {number}',
+            notification_method='telegram',
+        )
+        bookings.append(Booking.objects.create(
+            procedure=procedures[number],
+            master=masters[number],
+            booking_date=booking_date,
+            booking_time=time(10 + number % 8),
+            client=client,
+            client_name=client.name,
+            client_phone=client.phone,
+            notification_method='telegram',
+        ))
+
+    admin = get_user_model().objects.create_superuser(
+        username='budget-admin', password='budget-admin'
+    )
+    return {
+        'procedure': procedures[0],
+        'master': masters[0],
+        'booking': bookings[0],
+        'admin': admin,
+    }
@@ -0,0 +1,67 @@
+import time
+from contextlib import contextmanager, ExitStack
+
+from django.db import connections
+
+
+class QueryCounter:
+    """Execute-wrapper, считающий SQL-запросы и их суммарное время."""
+
+    def __init__(self, record_sql=False):
+        self.count = 0
+        self.duration = 0.0
+        self.record_sql = record_sql
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.duration += time.perf_counter() - start
+            if self.record_sql:
+                self.queries.append(sql)
+
+    @property
+    def duration_ms(self):
+        return round(self.duration * 1000, 2)
+
+
+@contextmanager
+def count_queries(record_sql=False):
+    """
+    Считает запросы ко всем подключениям внутри блока.
+
+    with count_queries() as counter:
+        ...
+    counter.count, counter.duration_ms
+    """
+    counter = QueryCounter(record_sql=record_sql)
+    with ExitStack() as stack:
+        for conn in connections.all():
+            stack.enter_context(conn.execute_wrapper(counter))
+        yield counter
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Блок выполнил больше запросов, чем разрешено бюджетом."""
+
+
+@contextmanager
+def assert_max_queries(budget, label=''):
+    """
+    Падает с QueryBudgetExceeded, если блок выполнил больше budget
+    запросов. Текст ошибки содержит сами запросы.
+    """
+    with count_queries(record_sql=True) as counter:
+        yield counter
+    if counter.count > budget:
+        queries = '\n'.join(
+            f'{number}. {sql}'
+            for number, sql in enumerate(counter.queries, start=1)
+        )
+        raise QueryBudgetExceeded(
+            f'{label or "block"}: {counter.count} запросов '
+            f'при бюджете {budget}\n{queries}'
+        )
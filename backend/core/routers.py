@@ -0,0 +1,103 @@
+import asyncio
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from django.db import DEFAULT_DB_ALIAS
+
+from .constants import (
+    REPLICA_APP_LABELS,
+    REPLICA_DB_ALIAS,
+    STICKY_EXEMPT_APP_LABELS,
+)
+
+
+class RoutingState:
+    """Состояние маршрутизации в рамках запроса или команды."""
+
+    def __init__(self, use_primary=False):
+        self.use_primary = use_primary
+        self.wrote = False
+
+
+_routing_state = ContextVar('db_routing_state', default=None)
+
+
+def get_routing_state():
+    return _routing_state.get()
+
+
+def set_routing_state(state):
+    return _routing_state.set(state)
+
+
+def reset_routing_state(token):
+    _routing_state.reset(token)
+
+
+@contextmanager
+def primary_db():
+    """Все чтения внутри блока идут в основную БД."""
+    token = set_routing_state(RoutingState(use_primary=True))
+    try:
+        yield
+    finally:
+        reset_routing_state(token)
+
+
+def use_primary_db(func):
+    """Декоратор: функция (в том числе async) читает из основной БД."""
+    if asyncio.iscoroutinefunction(func):
+        @wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            state = get_routing_state()
+            if state is not None:
+                state.use_primary = True
+                return await func(*args, **kwargs)
+            with primary_db():
+                return await func(*args, **kwargs)
+        return async_wrapper
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        state = get_routing_state()
+        if state is not None:
+            state.use_primary = True
+            return func(*args, **kwargs)
+        with primary_db():
+            return func(*args, **kwargs)
+    return wrapper
+
+
+class PrimaryReplicaRouter:
+    """
+    Чтения публичных данных - с реплики, запись - в основную БД.
+
+    После записи запрос (и, через cookie middleware, клиент на время
+    REPLICA_STICKY_SECONDS) читает из основной БД, чтобы видеть
+    собственные изменения.
+    """
+
+    def db_for_read(self, model, **hints):
+        state = get_routing_state()
+        if state is not None and state.use_primary:
+            return DEFAULT_DB_ALIAS
+        if model._meta.app_label in REPLICA_APP_LABELS:
+            return REPLICA_DB_ALIAS
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        state = get_routing_state()
+        if (
+            state is not None
+            and model._meta.app_label not in STICKY_EXEMPT_APP_LABELS
+        ):
+            state.use_primary = True
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
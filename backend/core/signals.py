@@ -0,0 +1,35 @@
+from django.apps import apps
+from django.db import connections
+from django.db.models.signals import post_save
+
+from .constants import IMAGE_FIELDS
+from .images import has_derivatives, schedule_derivatives
+
+
+def _make_image_receiver(field_name):
+    def receiver(sender, instance, raw=False, **kwargs):
+        """Планирует построение копий для нового изображения."""
+        if raw:
+            return
+        field_file = getattr(instance, field_name)
+        if field_file and not has_derivatives(field_file):
+            schedule_derivatives(field_file)
+    return receiver
+
+
+def connect_image_signals():
+    """Подключает генерацию копий к моделям из IMAGE_FIELDS."""
+    for model_label, field_name in IMAGE_FIELDS:
+        post_save.connect(
+            _make_image_receiver(field_name),
+            sender=apps.get_model(model_label),
+            weak=False,
+            dispatch_uid=f'image_derivatives_{model_label}_{field_name}',
+        )
+
+
+def close_unusable_connections(**kwargs):
+    """Закрывает переиспользуемые соединения, которые перестали отвечать."""
+    for conn in connections.all():
+        if conn.connection is not None and not conn.is_usable():
+            conn.close()
@@ -0,0 +1,47 @@
+import gzip
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+from .constants import STATIC_COMPRESS_EXTENSIONS, STATIC_COMPRESS_MIN_SIZE
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli необязателен
+    brotli = None
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    Статика с хешами в именах и предсжатыми копиями.
+
+    После collectstatic рядом с каждым хешированным файлом появляются
+    .gz и (если установлен brotli) .br копии, которые nginx отдает
+    через gzip_static/brotli_static без сжатия на лету.
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+
+        if dry_run:
+            return
+        for hashed_name in sorted(set(self.hashed_files.values())):
+            if hashed_name.endswith(STATIC_COMPRESS_EXTENSIONS):
+                self._write_compressed(hashed_name)
+
+    def _write_compressed(self, name):
+        """Записывает .gz/.br копии файла, если сжатие дает выигрыш."""
+        with self.open(name) as source:
+            content = source.read()
+        if len(content) < STATIC_COMPRESS_MIN_SIZE:
+            return
+
+        variants = [('.gz', gzip.compress(content, compresslevel=9, mtime=0))]
+        if brotli is not None:
+            variants.append(('.br', brotli.compress(content)))
+
+        for suffix, compressed in variants:
+            if len(compressed) >= len(content):
+                continue
+            path = self.path(name + suffix)
+            with open(path, 'wb') as target:
+                target.write(compressed)
@@ -0,0 +1,44 @@
+from django import template
+
+from ..constants import IMAGE_DEFAULT_SIZES, IMAGE_DERIVATIVE_MIME_TYPES
+from ..images import get_source_width, srcset
+
+register = template.Library()
+
+
+@register.filter
+def image_srcset(field_file, ext='webp'):
+    """srcset адаптивных копий изображения ('' если копий еще нет)."""
+    source_width = get_source_width(field_file)
+    if not source_width:
+        return ''
+    return srcset(field_file, ext, source_width)
+
+
+@register.inclusion_tag('core/includes/responsive_image.html')
+def responsive_image(
+    field_file,
+    alt='',
+    css_class='img-fluid',
+    style='',
+    sizes=IMAGE_DEFAULT_SIZES,
+):
+    """Тег <picture> с WebP/JPEG копиями и оригиналом как запасным."""
+    sources = []
+    source_width = get_source_width(field_file)
+    if source_width:
+        sources = [
+            {
+                'type': mime_type,
+                'srcset': srcset(field_file, ext, source_width),
+            }
+            for ext, mime_type in IMAGE_DERIVATIVE_MIME_TYPES.items()
+        ]
+    return {
+        'url': field_file.url if field_file else '',
+        'sources': sources,
+        'sizes': sizes,
+        'alt': alt,
+        'css_class': css_class,
+        'style': style,
+    }
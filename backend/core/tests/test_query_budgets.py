@@ -0,0 +1,43 @@
+from django.db import DEFAULT_DB_ALIAS
+from django.test import TransactionTestCase
+
+from core.constants import QUERY_BUDGETS, REPLICA_DB_ALIAS
+from core.querybudgets import (
+    budget_request,
+    create_budget_fixtures,
+    get_budget_cases,
+)
+from core.querycount import assert_max_queries
+
+
+class QueryBudgetTests(TransactionTestCase):
+    """
+    Число SQL-запросов страниц не превышает QUERY_BUDGETS.
+
+    TransactionTestCase: публичные страницы читают через алиас реплики,
+    которому нужны закоммиченные данные.
+    """
+
+    databases = {DEFAULT_DB_ALIAS, REPLICA_DB_ALIAS}
+
+    def setUp(self):
+        self.objects = create_budget_fixtures()
+        self.client.force_login(self.objects['admin'])
+
+    def test_every_budget_has_a_case(self):
+        names = [name for name, *_ in get_budget_cases(
+            self.client, self.objects
+        )]
+        self.assertCountEqual(names, QUERY_BUDGETS)
+
+    def test_pages_within_budget(self):
+        cases = get_budget_cases(self.client, self.objects)
+        for name, method, url, data in cases:
+            with self.subTest(name):
+                # Первый запрос прогревает кеши, считаем повторный
+                budget_request(self.client, method, url, data)
+                with assert_max_queries(QUERY_BUDGETS[name], name):
+                    response = budget_request(
+                        self.client, method, url, data
+                    )
+                self.assertLess(response.status_code, 400)
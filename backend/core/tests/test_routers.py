@@ -0,0 +1,187 @@
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser, User
+from django.contrib.sessions.models import Session
+from django.db import DEFAULT_DB_ALIAS, connections, router
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from booking.models import Booking
+from catalog.models import Category, Procedure
+from core.constants import (
+    REPLICA_DB_ALIAS,
+    REPLICA_STAFF_COOKIE,
+    REPLICA_STICKY_COOKIE,
+)
+from core.middleware import ReplicaRoutingMiddleware
+from core.routers import (
+    RoutingState,
+    primary_db,
+    reset_routing_state,
+    set_routing_state,
+    use_primary_db,
+)
+from user.models import Client
+
+
+class RoutingStateMixin:
+    """Тест идет внутри состояния маршрутизации, как запрос."""
+
+    def setUp(self):
+        super().setUp()
+        self.state = RoutingState()
+        self.token = set_routing_state(self.state)
+
+    def tearDown(self):
+        reset_routing_state(self.token)
+        super().tearDown()
+
+
+class PrimaryReplicaRouterTests(RoutingStateMixin, TestCase):
+    """Решения роутера для REPLICA_APP_LABELS и остальных приложений."""
+
+    def test_replica_app_reads_go_to_replica(self):
+        self.assertEqual(router.db_for_read(Procedure), REPLICA_DB_ALIAS)
+        self.assertEqual(router.db_for_read(Booking), REPLICA_DB_ALIAS)
+
+    def test_other_app_reads_go_to_primary(self):
+        self.assertEqual(router.db_for_read(Client), DEFAULT_DB_ALIAS)
+
+    def test_writes_go_to_primary_and_pin_reads(self):
+        self.assertEqual(router.db_for_write(Procedure), DEFAULT_DB_ALIAS)
+        self.assertTrue(self.state.wrote)
+        self.assertEqual(router.db_for_read(Procedure), DEFAULT_DB_ALIAS)
+
+    def test_primary_db_block(self):
+        with primary_db():
+            self.assertEqual(router.db_for_read(Procedure), DEFAULT_DB_ALIAS)
+        self.assertEqual(router.db_for_read(Procedure), REPLICA_DB_ALIAS)
+
+
+class ReplicaRoutingMiddlewareTests(TestCase):
+    """Чтение с реплики и закрепление клиента за основной БД."""
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.read_from = None
+
+    def _request(self, method, cookies=None, write=False, path='/', user=None):
+        def view(request):
+            if write:
+                router.db_for_write(Booking)
+            self.read_from = router.db_for_read(Procedure)
+            return HttpResponse()
+
+        request = getattr(self.factory, method)(path)
+        request.COOKIES.update(cookies or {})
+        request.user = user or AnonymousUser()
+        return ReplicaRoutingMiddleware(view)(request)
+
+    def test_get_reads_from_replica(self):
+        response = self._request('get')
+        self.assertEqual(self.read_from, REPLICA_DB_ALIAS)
+        self.assertNotIn(REPLICA_STICKY_COOKIE, response.cookies)
+
+    def test_post_reads_from_primary(self):
+        self._request('post')
+        self.assertEqual(self.read_from, DEFAULT_DB_ALIAS)
+
+    def test_write_pins_client_to_primary(self):
+        response = self._request('post', write=True)
+        cookie = response.cookies[REPLICA_STICKY_COOKIE]
+        self.assertEqual(
+            cookie['max-age'], settings.REPLICA_STICKY_SECONDS
+        )
+
+        self._request('get', cookies={REPLICA_STICKY_COOKIE: cookie.value})
+        self.assertEqual(self.read_from, DEFAULT_DB_ALIAS)
+
+    def test_admin_reads_from_primary(self):
+        self._request('get', path=reverse('admin:booking_booking_changelist'))
+        self.assertEqual(self.read_from, DEFAULT_DB_ALIAS)
+
+    def test_staff_cookie_pins_public_pages(self):
+        admin_url = reverse('admin:booking_booking_changelist')
+        response = self._request('get', path=admin_url, user=User())
+        self.assertNotIn(REPLICA_STAFF_COOKIE, response.cookies)
+
+        response = self._request(
+            'get', path=admin_url, user=User(is_staff=True)
+        )
+        cookie = response.cookies[REPLICA_STAFF_COOKIE]
+        self._request('get', cookies={REPLICA_STAFF_COOKIE: cookie.value})
+        self.assertEqual(self.read_from, DEFAULT_DB_ALIAS)
+
+    def test_session_write_does_not_pin(self):
+        def view(request):
+            router.db_for_write(Session)
+            return HttpResponse()
+
+        response = ReplicaRoutingMiddleware(view)(self.factory.post('/'))
+        self.assertNotIn(REPLICA_STICKY_COOKIE, response.cookies)
+
+
+class ReplicaReadsTests(TransactionTestCase):
+    """
+    Страница каталога читает процедуры через алиас реплики. Реплика
+    зеркалит тестовую БД, поэтому данные нужно закоммитить.
+    """
+
+    databases = {DEFAULT_DB_ALIAS, REPLICA_DB_ALIAS}
+
+    def test_page_queries_hit_replica(self):
+        category = Category.objects.create(
+            title='Категория', short_description='Описание'
+        )
+        Procedure.objects.create(
+            category=category,
+            title='Процедура',
+            short_description='Описание',
+            description='Описание',
+            price=1000,
+        )
+        with CaptureQueriesContext(connections[REPLICA_DB_ALIAS]) as replica:
+            response = self.client.get(reverse('catalog:product_list'))
+        self.assertContains(response, 'Процедура')
+        self.assertTrue(any(
+            'catalog_procedure' in query['sql']
+            for query in replica.captured_queries
+        ))
+
+
+class UsePrimaryDbTests(RoutingStateMixin, TestCase):
+    """Декоратор use_primary_db для синхронных и асинхронных views."""
+
+    def test_sync_view(self):
+        @use_primary_db
+        def view():
+            return router.db_for_read(Procedure)
+
+        self.assertEqual(view(), DEFAULT_DB_ALIAS)
+        self.assertTrue(self.state.use_primary)
+
+    def test_async_view(self):
+        @use_primary_db
+        async def view():
+            return router.db_for_read(Procedure)
+
+        self.assertEqual(async_to_sync(view)(), DEFAULT_DB_ALIAS)
+        self.assertTrue(self.state.use_primary)
+
+    def test_without_request_state(self):
+        reset_routing_state(self.token)
+        self.token = set_routing_state(None)
+
+        @use_primary_db
+        def sync_view():
+            return router.db_for_read(Procedure)
+
+        @use_primary_db
+        async def async_view():
+            return router.db_for_read(Procedure)
+
+        self.assertEqual(sync_view(), DEFAULT_DB_ALIAS)
+        self.assertEqual(async_to_sync(async_view)(), DEFAULT_DB_ALIAS)
+        self.assertEqual(router.db_for_read(Procedure), REPLICA_DB_ALIAS)
@@ -0,0 +1,29 @@
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+from django.views.decorators.http import require_GET
+
+from .constants import METRICS_CONTENT_TYPE
+from .metrics import render_prometheus
+
+
+@require_GET
+def metrics(request):
+    """
+    Метрики в формате Prometheus. Доступ по заголовку
+    Authorization: Bearer <METRICS_TOKEN> или сотруднику в админке;
+    без токена в настройках сборщик метрик получит 403.
+    """
+    token = settings.METRICS_TOKEN
+    header = request.headers.get('Authorization', '')
+    by_token = bool(token) and constant_time_compare(
+        header, f'Bearer {token}'
+    )
+    if not by_token and not (
+        request.user.is_authenticated and request.user.is_staff
+    ):
+        return HttpResponseForbidden()
+    return HttpResponse(
+        render_prometheus(),
+        content_type=METRICS_CONTENT_TYPE,
+    )
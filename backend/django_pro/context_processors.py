@@ -1,11 +1,15 @@
 from django.conf import settings
-from about.utils import get_contact_phone, get_legal_address
+from about.utils import get_contact_info
 
 
 def contact_info(request):
     """Добавляет контактную информацию в контекст для шаблонов."""
+    return get_contact_info()
+
+
+def template_cache(request):
+    """Параметры кеширования фрагментов шаблонов."""
     return {
-        'contact_phone': get_contact_phone(),
-        'contact_email': getattr(settings, 'DEFAULT_FROM_EMAIL', ''),
-        'legal_address': get_legal_address(),
+        'fragment_cache_version': settings.TEMPLATE_FRAGMENT_VERSION,
+        'fragment_cache_timeout': settings.TEMPLATE_FRAGMENT_TIMEOUT,
     }
@@ -1,5 +0,0 @@
-from loguru import logger
-
-logger.info("Hello, Loguru!")
-logger.warning("Это предупреждение, будьте внимательны.")
-logger.debug("Это сообщение не будет видно по умолчанию.")
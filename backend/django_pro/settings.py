@@ -11,9 +11,12 @@ https://docs.djangoproject.com/en/3.2/ref/settings/
 """
 
 import os
+import sys
 from dotenv import load_dotenv
 from pathlib import Path
 
+from core.db import parse_database_url
+
 load_dotenv()
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -50,6 +53,7 @@ DEFAULT_FROM_EMAIL = os.getenv('DEFAULT_FROM_EMAIL')
 # Application definition
 
 INSTALLED_APPS = [
+    'core.apps.CoreConfig',
     'notifications.apps.NotificationsConfig',
     'masters.apps.MastersConfig',
     'booking.apps.BookingConfig',
@@ -57,6 +61,8 @@ INSTALLED_APPS = [
     'about.apps.AboutConfig',
     'homepage.apps.HomepageConfig',
     'catalog.apps.CatalogConfig',
+    'api.apps.ApiConfig',
+    'reports.apps.ReportsConfig',
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
@@ -66,11 +72,14 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.ProfilingMiddleware',
+    'core.middleware.QueryCountMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.ReplicaRoutingMiddleware',
     'django.middleware.locale.LocaleMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
@@ -80,39 +89,189 @@ ROOT_URLCONF = 'django_pro.urls'
 
 FRONTEND_DIR = BASE_DIR.parent / 'frontend'
 
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+if not DEBUG:
+    # В продакшене шаблоны компилируются один раз на процесс
+    TEMPLATE_LOADERS = [
+        ('django.template.loaders.cached.Loader', TEMPLATE_LOADERS),
+    ]
+
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [
             str(FRONTEND_DIR / 'templates'),
         ],
-        'APP_DIRS': True,
         'OPTIONS': {
+            'loaders': TEMPLATE_LOADERS,
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
                 'django_pro.context_processors.contact_info',
+                'django_pro.context_processors.template_cache',
             ],
         },
     },
 ]
 
+# Кеширование фрагментов шаблонов ({% cache %}).
+# Версия входит в ключ: сменить ее - значит сбросить все фрагменты.
+TEMPLATE_FRAGMENT_VERSION = os.getenv('TEMPLATE_FRAGMENT_VERSION', '1')
+TEMPLATE_FRAGMENT_TIMEOUT = int(
+    os.getenv('TEMPLATE_FRAGMENT_TIMEOUT', '3600')
+)
+
 WSGI_APPLICATION = 'django_pro.wsgi.application'
 
 
 # Database
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
 
-DATABASES = {
+# В продакшене база задается через DATABASE_URL (PostgreSQL),
+# без него используется локальный SQLite для разработки.
+DATABASE_URL = os.getenv('DATABASE_URL')
+
+# Постоянные соединения: сколько секунд держать соединение открытым
+DB_CONN_MAX_AGE = int(os.getenv('DB_CONN_MAX_AGE', '60'))
+# Проверять переиспользуемое соединение в начале каждого запроса
+DB_HEALTH_CHECKS = os.getenv('DB_HEALTH_CHECKS', 'True').lower() == 'true'
+# Для pgbouncer в режиме transaction pooling курсоры нужно отключить
+DB_DISABLE_SERVER_SIDE_CURSORS = os.getenv(
+    'DB_DISABLE_SERVER_SIDE_CURSORS', 'False'
+).lower() == 'true'
+
+POSTGRES_OPTIONS = {
+    'connect_timeout': 5,
+    'keepalives': 1,
+    'keepalives_idle': 30,
+    'keepalives_interval': 10,
+    'keepalives_count': 3,
+}
+
+if DATABASE_URL:
+    DATABASES = {
+        'default': parse_database_url(
+            DATABASE_URL,
+            conn_max_age=DB_CONN_MAX_AGE,
+            options=POSTGRES_OPTIONS,
+        ),
+    }
+    DATABASES['default']['DISABLE_SERVER_SIDE_CURSORS'] = (
+        DB_DISABLE_SERVER_SIDE_CURSORS
+    )
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+        }
+    }
+
+# Реплика только для чтения: публичные страницы и AJAX-доступность.
+# В тестах реплика зеркалит основную БД.
+DATABASE_REPLICA_URL = os.getenv('DATABASE_REPLICA_URL')
+# Сколько секунд после записи сессия читает из основной БД
+REPLICA_STICKY_SECONDS = int(os.getenv('REPLICA_STICKY_SECONDS', '15'))
+TESTING = sys.argv[1:2] == ['test']
+
+if DATABASE_REPLICA_URL:
+    DATABASES['replica'] = parse_database_url(
+        DATABASE_REPLICA_URL,
+        conn_max_age=DB_CONN_MAX_AGE,
+        options=POSTGRES_OPTIONS,
+    )
+elif TESTING:
+    # manage.py test всегда идет с двумя алиасами, чтобы маршрутизация
+    # проверялась и без настроенной реплики
+    DATABASES['replica'] = dict(DATABASES['default'])
+
+if 'replica' in DATABASES:
+    DATABASES['replica']['TEST'] = {'MIRROR': 'default'}
+    DATABASE_ROUTERS = ['core.routers.PrimaryReplicaRouter']
+
+
+# Cache
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'django_pro',
     }
 }
 
 
+# Счетчик SQL-запросов (заголовки X-DB-Queries / X-DB-Time-Ms)
+QUERY_COUNT_ENABLED = os.getenv(
+    'QUERY_COUNT_ENABLED', str(DEBUG)
+).lower() == 'true'
+QUERY_COUNT_WARN_THRESHOLD = int(
+    os.getenv('QUERY_COUNT_WARN_THRESHOLD', '30')
+)
+
+# Профилирование запросов: по заголовку X-Profile-Token или выборочно
+PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', 'False').lower() == 'true'
+PROFILING_SAMPLE_RATE = float(os.getenv('PROFILING_SAMPLE_RATE', '0'))
+PROFILING_TOKEN = os.getenv('PROFILING_TOKEN', '')
+PROFILING_DIR = os.getenv('PROFILING_DIR', str(BASE_DIR / 'profiles'))
+
+# Метрики Prometheus (/metrics). Для нескольких воркеров gunicorn
+# METRICS_DIR должен указывать на общий для них каталог (в
+# docker-compose - tmpfs /app/metrics), иначе gunicorn пишет ошибку.
+# Сборщик передает Authorization: Bearer <METRICS_TOKEN>; без токена
+# метрики видны только сотрудникам, вошедшим в админку.
+METRICS_DIR = os.getenv('METRICS_DIR', '')
+METRICS_FLUSH_INTERVAL = float(os.getenv('METRICS_FLUSH_INTERVAL', '5'))
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+# Логирование: loguru, стандартный logging перехватывается
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'DEBUG' if DEBUG else 'INFO').upper()
+LOG_JSON = os.getenv('LOG_JSON', str(not DEBUG)).lower() == 'true'
+LOG_ENQUEUE = os.getenv('LOG_ENQUEUE', 'True').lower() == 'true'
+
+LOGGING_CONFIG = 'core.log.configure_logging'
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'loguru': {'class': 'core.log.InterceptHandler'},
+    },
+    'root': {'handlers': ['loguru'], 'level': LOG_LEVEL},
+    'loggers': {
+        'django': {
+            'handlers': ['loguru'],
+            'level': LOG_LEVEL,
+            'propagate': False,
+        },
+        'django.db.backends': {'level': 'INFO'},
+        # На DEBUG шаблоны логируют repr контекста, что выполняет QuerySet
+        'django.template': {'level': 'INFO'},
+        # httpx пишет URL запросов, а в URL Bot API содержится токен
+        'httpx': {'level': 'WARNING'},
+        'httpcore': {'level': 'WARNING'},
+        'asyncio': {'level': 'INFO'},
+    },
+}
+
+# Завершенные записи старше этого числа дней уходят в архив
+BOOKING_ARCHIVE_AFTER_DAYS = int(os.getenv('BOOKING_ARCHIVE_AFTER_DAYS', '90'))
+
+# Сколько минут клиент из листа ожидания может принять предложение
+WAITLIST_OFFER_TTL_MINUTES = int(
+    os.getenv('WAITLIST_OFFER_TTL_MINUTES', '30')
+)
+
+# За сколько часов до начала клиент может сам отменить запись
+CLIENT_SELF_CANCEL_MIN_HOURS = int(
+    os.getenv('CLIENT_SELF_CANCEL_MIN_HOURS', '3')
+)
+
+
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
 
@@ -157,6 +316,11 @@ MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
+# В продакшене статика собирается с хешами в именах и .gz/.br копиями.
+# Тестам манифест не нужен: они не зависят от collectstatic
+if not DEBUG and not TESTING:
+    STATICFILES_STORAGE = 'core.storage.CompressedManifestStaticFilesStorage'
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/3.2/ref/settings/#default-auto-field
 
@@ -3,15 +3,21 @@ from django.conf import settings
 from django.conf.urls.static import static
 from django.urls import include, path
 
+from core.views import metrics
+
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('api/v1/', include('api.urls')),
     path('', include('homepage.urls')),
     path('about/', include('about.urls')),
     path('booking/', include('booking.urls')),
     path('catalog/', include('catalog.urls')),
+    path('client/', include('user.urls')),
     path('masters/', include('masters.urls')),
     path('notifications/', include('notifications.urls')),
+    path('reports/', include('reports.urls')),
+    path('metrics', metrics, name='metrics'),
 ]
 
 if settings.DEBUG:
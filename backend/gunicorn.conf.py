@@ -0,0 +1,84 @@
+"""
+Конфигурация gunicorn для продакшена.
+
+Все значения можно переопределить переменными окружения GUNICORN_*.
+Запуск: gunicorn -c gunicorn.conf.py django_pro.wsgi:application
+
+ASGI (async views вебхука и AJAX без блокировки потока):
+GUNICORN_WORKER_CLASS=uvicorn.workers.UvicornWorker \
+    gunicorn -c gunicorn.conf.py django_pro.asgi:application
+"""
+import multiprocessing
+import os
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:8000')
+
+# Потоковые воркеры: время запроса в основном уходит на ожидание БД
+# и Telegram/SMTP, поэтому потоки дешевле дополнительных процессов
+# Django 3.2 под ASGI выполняет синхронные views по одному в потоке,
+# поэтому по умолчанию остается WSGI, ASGI включается явно
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+workers = int(
+    os.getenv('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1)
+)
+threads = int(os.getenv('GUNICORN_THREADS', '4'))
+
+# Приложение загружается в мастере до fork: код и импортированные модули
+# делятся между воркерами (copy-on-write), старт воркера быстрее
+preload_app = True
+
+# Плановый перезапуск воркеров против утечек памяти; jitter не дает
+# всем воркерам перезапуститься одновременно. Очередь фоновой генерации
+# копий изображений при этом теряется, ее восстанавливает периодический
+# manage.py generate_image_derivatives
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', '1000'))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', '100'))
+
+# Отправка в Telegram идет с timeout=10, запас на SMTP
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '30'))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', '5'))
+
+# Heartbeat-файлы воркеров в памяти, а не на диске контейнера
+if os.path.isdir('/dev/shm'):
+    worker_tmp_dir = '/dev/shm'
+
+accesslog = os.getenv('GUNICORN_ACCESS_LOG', '-')
+errorlog = '-'
+
+
+def on_starting(server):
+    """
+    Без общего METRICS_DIR каждый воркер считает метрики сам по себе и
+    /metrics отдает значения одного случайного воркера.
+    """
+    if server.cfg.workers > 1 and not os.getenv('METRICS_DIR'):
+        server.log.error(
+            'METRICS_DIR не задан при %s воркерах: /metrics покажет '
+            'метрики только ответившего воркера',
+            server.cfg.workers,
+        )
+
+
+def pre_fork(server, worker):
+    """
+    Закрывает соединения с БД, открытые мастером при preload, чтобы
+    воркеры не унаследовали общий сокет и открыли собственные.
+    """
+    from django.db import connections
+
+    connections.close_all()
+
+
+def worker_exit(server, worker):
+    """Сохраняет метрики воркера перед выходом."""
+    from core.metrics import REGISTRY
+
+    REGISTRY.flush()
+
+
+def child_exit(server, worker):
+    """Переносит метрики завершившегося воркера в архивный файл."""
+    from core.metrics import archive_process_metrics
+
+    archive_process_metrics(worker.pid)
@@ -0,0 +1,28 @@
+from decimal import Decimal
+from types import MappingProxyType
+
+DEFAULT_TITLE = 'Добро пожаловать!'
+DEFAULT_MAIN_DESCRIPTION = 'Кабинет аппаратного массажа АлЁнкА'
+DEFAULT_SERVICE_TITLE = 'Массаж R-sleek – коррекция фигуры'
+DEFAULT_PRICE = Decimal('8000.00')
+DEFAULT_PRICE_DESCRIPTION = (
+    'Высококлассные специалисты, безопасность и привлекательные цены'
+)
+
+# Контент по умолчанию, если в базе нет активной записи.
+# Неизменяемый словарь: шаблоны читают его так же, как модель.
+DEFAULT_HOMEPAGE_CONTENT = MappingProxyType({
+    'title': DEFAULT_TITLE,
+    'main_description': DEFAULT_MAIN_DESCRIPTION,
+    'service_title': DEFAULT_SERVICE_TITLE,
+    'service_description': '',
+    'how_it_works': '',
+    'mechanisms': '',
+    'features': '',
+    'problems': '',
+    'stages': '',
+    'advantages': '',
+    'price': DEFAULT_PRICE,
+    'price_description': DEFAULT_PRICE_DESCRIPTION,
+    'images': (),
+})
@@ -0,0 +1,36 @@
+from django.db import migrations
+
+from homepage.constants import (
+    DEFAULT_MAIN_DESCRIPTION,
+    DEFAULT_PRICE,
+    DEFAULT_SERVICE_TITLE,
+    DEFAULT_TITLE,
+)
+
+
+def seed_default_content(apps, schema_editor):
+    """Создает контент главной страницы, если таблица пуста."""
+    HomePageContent = apps.get_model('homepage', 'HomePageContent')
+    db_alias = schema_editor.connection.alias
+    if HomePageContent.objects.using(db_alias).exists():
+        return
+    HomePageContent.objects.using(db_alias).create(
+        title=DEFAULT_TITLE,
+        main_description=DEFAULT_MAIN_DESCRIPTION,
+        service_title=DEFAULT_SERVICE_TITLE,
+        price=DEFAULT_PRICE,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('homepage', '0002_contentimage'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            seed_default_content,
+            migrations.RunPython.noop,
+        ),
+    ]
@@ -1,4 +1,7 @@
 from django.contrib import admin
+from django.utils.html import format_html
+
+from booking.ics import get_feed_url
 from .models import Master
 
 
@@ -26,3 +29,12 @@ class MasterAdmin(admin.ModelAdmin):
     ]
     list_editable = ['is_active', 'is_contact_phone']
     filter_horizontal = ['procedures']
+    readonly_fields = ['calendar_feed']
+
+    @admin.display(description='Календарь (.ics)')
+    def calendar_feed(self, obj):
+        """Подписанная ссылка для подписки в Google/Apple Calendar."""
+        if not obj.pk:
+            return '-'
+        url = get_feed_url(obj.pk)
+        return format_html('<a href="{0}">{0}</a>', url)
@@ -5,21 +5,25 @@ CHAT_ID_MAX_LENGTH = 50
 SECONDS_IN_MINUTE = 60
 
 REMINDER_ELIGIBLE_STATUSES = ['pending', 'confirmed']
+# Размер пачки при потоковом чтении бронирований (server-side cursor)
+REMINDER_BATCH_SIZE = 500
+# Корзины гистограммы длительности запуска send_reminders, секунды
+REMINDER_RUN_BUCKETS = (1, 5, 15, 30, 60, 120, 300, 600)
 
 REMINDER_SEARCH_MSG = '🔔 Поиск напоминаний за {} часов'
 MOSCOW_TIME_MSG = '🕒 Москва время: {}'
 BOOKINGS_COUNT_MSG = '📋 Всего подходящих бронирований: {}'
-BOOKING_INFO_MSG = '  📅 {}:'
-BOOKING_DATETIME_MSG = '     Запись: {}'
-REMINDER_TIME_MSG = '     Напоминание должно прийти: {}'
-TIME_UNTIL_MSG = '     До напоминания: {}'
-WILL_SEND_REMINDER_MSG = '    ✅ БУДЕТ НАПОМИНАНИЕ! (время пришло)'
-WONT_SEND_REMINDER_MSG = '    ❌ НЕ отправляем (еще не время)'
+REMINDER_CHECK_MSG = (
+    '⏰ {}: запись {}, напоминание {}, до напоминания {}, отправляем: {}'
+)
 REMINDER_ALREADY_SENT_MSG = '❌ Напоминание уже отправлено для {}'
 NO_CONFIRMATION_NEEDED_MSG = '❌ Не требует подтверждения для {}'
-SENDING_REMINDER_MSG = '✅ ОТПРАВЛЯЕМ напоминание для {}'
-NOT_SENDING_REMINDER_MSG = '❌ НЕ отправляем для {}'
 REMINDER_MARKED_SENT_MSG = '✅ Напоминание отмечено как отправленное для {}'
+REMINDER_SCHEDULED_MSG = (
+    '🎯 Запланировано напоминание: {}, запись {}, напоминание в {}, '
+    'осталось часов: {:.1f}'
+)
+REMINDER_SCHEDULE_ERROR_MSG = '❌ Ошибка планирования напоминания: {}'
 REMINDER_START_MSG = '🔔 Запуск отправки напоминаний...'
 BOOKINGS_FOUND_MSG = '📋 Найдено {} бронирований'
 REMINDER_SENT_MSG = '✅ Напоминание для {}'
@@ -52,6 +56,36 @@ BOOKING_CREATED_TEMPLATE = (
     '{payment_info}'
 )
 
+GROUP_BOOKING_CREATED_TEMPLATE = (
+    '🎯 <b>НОВАЯ ЗАЯВКА: {count} ПРОЦЕДУР ПОДРЯД</b>\n'
+    '{new_client_text}\n'
+    '👤 <b>Клиент:</b> {client_name}\n'
+    '📞 <b>Телефон:</b> <code>{client_phone}</code>\n'
+    '📅 <b>Дата:</b> {booking_date}\n\n'
+    '{items}\n\n'
+    '💵 <b>Итого:</b> {total_price} руб., {total_minutes} мин.\n\n'
+    '{payment_info}'
+)
+GROUP_BOOKING_ITEM_TEMPLATE = (
+    '🕐 {booking_time} - {procedure_title} ({duration_minutes} мин.), '
+    '{master_name}'
+)
+SERIES_BOOKING_CREATED_TEMPLATE = (
+    '🔁 <b>НОВАЯ СЕРИЯ: {count} ЗАПИСЕЙ</b>\n'
+    '{new_client_text}\n'
+    '👤 <b>Клиент:</b> {client_name}\n'
+    '📞 <b>Телефон:</b> <code>{client_phone}</code>\n\n'
+    '{items}\n\n'
+    '💵 <b>Итого:</b> {total_price} руб., {total_minutes} мин.\n\n'
+    '{skipped_info}'
+    '{payment_info}'
+)
+SERIES_BOOKING_ITEM_TEMPLATE = (
+    '📅 {booking_date} {booking_time} - {procedure_title} '
+    '({duration_minutes} мин.), {master_name}'
+)
+SERIES_SKIPPED_TEMPLATE = '⚠️ <b>Не записаны (занято):</b>\n{}\n\n'
+
 CLIENT_CANCELLED_TEMPLATE = (
     '❌ Ваша запись отменена\n\n'
     '💼 Процедура: {procedure_title}\n'
@@ -60,6 +94,39 @@ CLIENT_CANCELLED_TEMPLATE = (
     'Для уточнения деталей свяжитесь с администратором.'
 )
 
+CLIENT_GROUP_CANCELLED_TEMPLATE = (
+    '❌ Ваши записи отменены\n\n'
+    '{items}\n\n'
+    'Для уточнения деталей свяжитесь с администратором.'
+)
+
+CLIENT_GROUP_CONFIRMED_TEMPLATE = (
+    'На связи АлЁнкА!\n\n'
+    '✅ Ваши записи подтверждены!\n\n'
+    '👤 Клиент: {client_name}\n\n'
+    '{items}\n\n'
+    '📍 Адрес: {address}\n'
+    '📞 Телефон для связи: {master_phone}\n\n'
+    'Ждем вас!'
+)
+
+CLIENT_GROUP_ITEM_TEMPLATE = (
+    '📅 {booking_date} 🕐 {booking_time} - '
+    '{procedure_title}, {master_name}'
+)
+
+CLIENT_RESCHEDULED_TEMPLATE = (
+    'На связи АлЁнкА!\n\n'
+    '🔄 Ваша запись перенесена\n\n'
+    '👤 Клиент: {client_name}\n'
+    '💼 Процедура: {procedure_title}\n'
+    '👨‍💼 Мастер: {master_name}\n'
+    '📅 Новая дата: {booking_date}\n'
+    '🕐 Новое время: {booking_time}\n\n'
+    '📍 Адрес: {address}\n'
+    '📞 Телефон для связи: {master_phone}'
+)
+
 CLIENT_CONFIRMED_TEMPLATE = (
     'На связи АлЁнкА!\n\n'
     '✅ Ваша запись подтверждена!\n\n'
@@ -89,6 +156,38 @@ CONFIRMED_EMAIL_TEMPLATE = (
     'Салон красоты АлЁнкА'
 )
 
+CONFIRMED_GROUP_EMAIL_TEMPLATE = (
+    'На связи АлЁнкА!\n\n'
+    '✅ Ваши записи подтверждены!\n\n'
+    'Уважаемый(ая) {client_name},\n\n'
+    'Ваши записи на процедуры подтверждены:\n\n'
+    '{items}\n\n'
+    '📍 Адрес: {address}\n'
+    '📞 Телефон для связи: {master_phone}\n\n'
+    'Ждем вас в назначенное время!\n\n'
+    'С уважением,\n'
+    'Салон красоты АлЁнкА'
+)
+
+RESCHEDULED_EMAIL_TEMPLATE = (
+    'На связи АлЁнкА!\n\n'
+    '🔄 Ваша запись перенесена\n\n'
+    'Уважаемый(ая) {client_name},\n\n'
+    'Администратор перенес вашу запись:\n\n'
+    '💼 Процедура: {procedure_title}\n'
+    '👨‍💼 Мастер: {master_name}\n'
+    '📅 Новая дата: {booking_date}\n'
+    '🕐 Новое время: {booking_time}\n\n'
+    '📍 Адрес: {address}\n'
+    '📞 Телефон для связи: {master_phone}\n\n'
+    'С уважением,\n'
+    'Салон красоты АлЁнкА'
+)
+
+EMAIL_SUBJECTS = {
+    'confirmed': '✅ Подтверждение записи в салоне красоты',
+    'rescheduled': '🔄 Перенос записи в салоне красоты',
+}
 
 REMINDER_TELEGRAM_TEMPLATE = (
     'На связи АлЁнкА!\n\n'
@@ -133,6 +232,14 @@ CANCELLATION_TELEGRAM_TEMPLATE = (
     'позвоните нам: {master_phone}'
 )
 
+CLIENT_SELF_CANCELLED_ADMIN_TEMPLATE = (
+    '❌ <b>КЛИЕНТ ОТМЕНИЛ ЗАПИСЬ</b>\n\n'
+    '👤 <b>Клиент:</b> {client_name}\n'
+    '📞 <b>Телефон:</b> <code>{client_phone}</code>\n'
+    '💼 <b>Процедура:</b> {procedure_title}\n'
+    '📅 <b>Дата:</b> {booking_date} {booking_time}'
+)
+
 
 CONFIRM_BUTTON_TEXT = '✅ Подтверждаю'
 CANCEL_BUTTON_TEXT = '❌ Отменить запись'
@@ -142,3 +249,20 @@ INVALID_UUID_MESSAGE = (
 )
 UNAUTHORIZED_MESSAGE = '❌ У вас нет прав для этой операции.'
 BOOKING_NOT_FOUND_MESSAGE = '❌ Запись не найдена.'
+
+WAITLIST_ACCEPT_CALLBACK = 'waitlist_accept_'
+WAITLIST_DECLINE_CALLBACK = 'waitlist_decline_'
+WAITLIST_ACCEPT_BUTTON_TEXT = '✅ Записаться'
+WAITLIST_DECLINE_BUTTON_TEXT = '❌ Не подходит'
+WAITLIST_OFFER_TEMPLATE = (
+    '🎉 <b>ОСВОБОДИЛОСЬ ВРЕМЯ</b>\n\n'
+    'Здравствуйте, {client_name}!\n'
+    'Вы в листе ожидания на процедуру «{procedure_title}».\n\n'
+    '👨‍💼 Мастер: {master_name}\n'
+    '📅 Дата: {booking_date}\n'
+    '🕐 Время: {booking_time}\n\n'
+    'Предложение действует {ttl_minutes} мин.'
+)
+WAITLIST_ACCEPTED_MESSAGE = 'Вы записаны ✅'
+WAITLIST_DECLINED_MESSAGE = 'Предложение отклонено'
+WAITLIST_UNAVAILABLE_MESSAGE = 'Предложение больше недоступно'
@@ -1,10 +1,24 @@
 from django.core.management.base import BaseCommand
 
+from core.metrics import counter, histogram
+from core.routers import primary_db
 from ...constants import (
     BOOKINGS_FOUND_MSG,
     REMINDER_SENT_MSG,
     REMINDER_ERROR_MSG,
     REMINDER_COMPLETE_MSG,
+    REMINDER_RUN_BUCKETS,
+)
+
+REMINDER_RUN_SECONDS = histogram(
+    'reminder_run_duration_seconds',
+    'Длительность запуска send_reminders',
+    buckets=REMINDER_RUN_BUCKETS,
+)
+REMINDERS_PROCESSED = counter(
+    'reminders_processed_total',
+    'Обработанные напоминания по результату',
+    labelnames=['result'],
 )
 
 
@@ -12,6 +26,10 @@ class Command(BaseCommand):
     help = 'Отправляет напоминания о предстоящих записях'
 
     def handle(self, *args, **options):
+        with primary_db(), REMINDER_RUN_SECONDS.time():
+            self._send_reminders()
+
+    def _send_reminders(self):
         self.stdout.write('🔔 Запуск отправки напоминаний...')
 
         from ...reminder_utils import (
@@ -32,10 +50,14 @@ class Command(BaseCommand):
                     if success:
                         mark_reminder_sent(booking)
                         sent_count += 1
+                        REMINDERS_PROCESSED.inc(result='sent')
                         self.stdout.write(
                             REMINDER_SENT_MSG.format(booking.client_name)
                         )
+                    else:
+                        REMINDERS_PROCESSED.inc(result='failed')
                 except Exception as e:
+                    REMINDERS_PROCESSED.inc(result='error')
                     self.stdout.write(
                         REMINDER_ERROR_MSG.format(booking.client_name, str(e))
                     )
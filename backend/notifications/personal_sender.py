@@ -1,20 +1,31 @@
 import asyncio
 from django.conf import settings
 from dotenv import load_dotenv
-from telethon import TelegramClient
-from telethon.errors import SessionPasswordNeededError
+from loguru import logger
 
 load_dotenv()
 
 
 class TelegramSender:
+    """
+    Отправка от личного аккаунта через Telethon.
+
+    Telethon (MTProto и криптография) импортируется при создании
+    отправителя, а не при загрузке модуля, чтобы не раздувать
+    веб-воркеры, которые ничего не отправляют.
+    """
+
     def __init__(self, api_id=None, api_hash=None, phone=None):
+        from telethon import TelegramClient
+
         self.api_id = api_id or settings.API_ID
         self.api_hash = api_hash or settings.API_HASH
         self.phone = phone or settings.PHONE
         self.client = TelegramClient('session_name', self.api_id, self.api_hash)
 
     async def send_message(self, recipient, text):
+        from telethon.errors import SessionPasswordNeededError
+
         try:
             await self.client.connect()
 
@@ -24,18 +35,18 @@ class TelegramSender:
                 await self.client.sign_in(self.phone, code)
 
             await self.client.send_message(recipient, text)
-            print(f'✅ Сообщение отправлено пользователю: {recipient}')
+            logger.info('Сообщение отправлено пользователю: {}', recipient)
             return True
 
         except SessionPasswordNeededError:
-            print('Требуется двухфакторная аутентификация!')
+            logger.warning('Требуется двухфакторная аутентификация')
             password = input('Введите пароль: ')
             await self.client.sign_in(password=password)
             await self.client.send_message(recipient, text)
             return True
 
-        except Exception as e:
-            print(f'❌ Ошибка отправки сообщения: {e}')
+        except Exception:
+            logger.exception('Ошибка отправки сообщения')
             return False
 
     def disconnect(self):
@@ -43,20 +54,30 @@ class TelegramSender:
         self.client.disconnect()
 
 
-def send_personal_telegram_message(recipient, text):
-    'Синхронная функция для отправки сообщения'
-
-    async def _async_send():
+async def send_personal_telegram_message_async(recipient, text):
+    """
+    Отправка из async-кода: Telethon ожидается в текущем цикле
+    событий, без отдельного asyncio.run на каждое сообщение.
+    """
+    try:
         sender = TelegramSender()
-        try:
-            return await sender.send_message(recipient, text)
-        finally:
-            sender.disconnect()
+    except Exception as e:
+        logger.error('Ошибка создания Telegram клиента: {}', e)
+        return False
+    try:
+        return await sender.send_message(recipient, text)
+    finally:
+        await sender.client.disconnect()
 
+
+def send_personal_telegram_message(recipient, text):
+    'Синхронная функция для отправки сообщения'
     try:
-        return asyncio.run(_async_send())
+        return asyncio.run(
+            send_personal_telegram_message_async(recipient, text)
+        )
     except Exception as e:
-        print(f'❌ Ошибка в синхронной обертке: {e}')
+        logger.error('Ошибка в синхронной обертке: {}', e)
         return False
 
 
@@ -1,25 +1,31 @@
 # notifications/reminder_utils.py
 from datetime import datetime, timedelta
+from django.db import transaction
 from django.utils import timezone
+from loguru import logger
 
+from booking.constants import ACTIVE_BOOKING_STATUSES
 from booking.models import Booking, ReminderSettings
-from .telegram_utils import send_confirmation_notification
+from booking.signals import booking_cancelled
+from .telegram_utils import (
+    get_admin_chat_id,
+    send_cancellation_notification,
+    send_confirmation_notification,
+    send_telegram_message,
+)
 from .constants import (
+    CLIENT_SELF_CANCELLED_ADMIN_TEMPLATE,
+    REMINDER_BATCH_SIZE,
     REMINDER_ELIGIBLE_STATUSES,
     REMINDER_SEARCH_MSG,
     MOSCOW_TIME_MSG,
     BOOKINGS_COUNT_MSG,
-    BOOKING_INFO_MSG,
-    BOOKING_DATETIME_MSG,
-    REMINDER_TIME_MSG,
-    TIME_UNTIL_MSG,
-    WILL_SEND_REMINDER_MSG,
-    WONT_SEND_REMINDER_MSG,
+    REMINDER_CHECK_MSG,
     REMINDER_ALREADY_SENT_MSG,
     NO_CONFIRMATION_NEEDED_MSG,
-    SENDING_REMINDER_MSG,
-    NOT_SENDING_REMINDER_MSG,
     REMINDER_MARKED_SENT_MSG,
+    REMINDER_SCHEDULED_MSG,
+    REMINDER_SCHEDULE_ERROR_MSG,
     SECONDS_IN_HOUR,
     ZERO_SECONDS,
 )
@@ -48,8 +54,8 @@ def get_bookings_needing_reminder():
     settings = get_reminder_settings()
     now_local = timezone.localtime(timezone.now())
 
-    print(REMINDER_SEARCH_MSG.format(settings.reminder_hours))
-    print(MOSCOW_TIME_MSG.format(now_local))
+    logger.info(REMINDER_SEARCH_MSG, settings.reminder_hours)
+    logger.debug(MOSCOW_TIME_MSG, now_local)
 
     bookings = Booking.objects.filter(
         status__in=REMINDER_ELIGIBLE_STATUSES,
@@ -57,10 +63,9 @@ def get_bookings_needing_reminder():
         needs_confirmation=True,
     ).select_related('procedure', 'master', 'client')
 
-    print(BOOKINGS_COUNT_MSG.format(bookings.count()))
-
     result = []
-    for booking in bookings:
+    checked = 0
+    for booking in bookings.iterator(chunk_size=REMINDER_BATCH_SIZE):
         booking_datetime_naive = datetime.combine(
             booking.booking_date,
             booking.booking_time,
@@ -80,28 +85,31 @@ def get_bookings_needing_reminder():
             now_local
         )
 
-        print(BOOKING_INFO_MSG.format(booking.client_name))
-        print(BOOKING_DATETIME_MSG.format(booking_datetime_local))
-        print(REMINDER_TIME_MSG.format(reminder_time_local))
-        print(TIME_UNTIL_MSG.format(time_until_reminder))
-
-        if time_until_reminder.total_seconds() <= ZERO_SECONDS:
+        checked += 1
+        is_due = time_until_reminder.total_seconds() <= ZERO_SECONDS
+        logger.debug(
+            REMINDER_CHECK_MSG,
+            booking.client_name,
+            booking_datetime_local,
+            reminder_time_local,
+            time_until_reminder,
+            is_due,
+        )
+        if is_due:
             result.append(booking)
-            print(WILL_SEND_REMINDER_MSG)
-        else:
-            print(WONT_SEND_REMINDER_MSG)
 
+    logger.info(BOOKINGS_COUNT_MSG, checked)
     return result
 
 
 def should_send_reminder(booking):
     """Проверяет, нужно ли отправлять напоминание для бронирования."""
     if booking.reminder_sent:
-        print(REMINDER_ALREADY_SENT_MSG.format(booking.client_name))
+        logger.debug(REMINDER_ALREADY_SENT_MSG, booking.client_name)
         return False
 
     if not booking.needs_confirmation:
-        print(NO_CONFIRMATION_NEEDED_MSG.format(booking.client_name))
+        logger.debug(NO_CONFIRMATION_NEEDED_MSG, booking.client_name)
         return False
 
     settings = get_reminder_settings()
@@ -126,19 +134,15 @@ def should_send_reminder(booking):
         now_local
     )
 
-    print(f'⏰ {booking.client_name}:')
-    print(f'   Сейчас: {now_local}')
-    print(f'   Запись: {booking_datetime_local}')
-    print(f'   Напоминание: {reminder_time_local}')
-    print(f'   До напоминания: {time_until_reminder}')
-
     should_send = time_until_reminder.total_seconds() <= ZERO_SECONDS
-
-    if should_send:
-        print(SENDING_REMINDER_MSG.format(booking.client_name))
-    else:
-        print(NOT_SENDING_REMINDER_MSG.format(booking.client_name))
-
+    logger.debug(
+        REMINDER_CHECK_MSG,
+        booking.client_name,
+        booking_datetime_local,
+        reminder_time_local,
+        time_until_reminder,
+        should_send,
+    )
     return should_send
 
 
@@ -147,7 +151,7 @@ def mark_reminder_sent(booking):
     booking.reminder_sent = True
     booking.reminder_sent_at = timezone.now()
     booking.save()
-    print(REMINDER_MARKED_SENT_MSG.format(booking.client_name))
+    logger.info(REMINDER_MARKED_SENT_MSG, booking.client_name)
 
 
 def process_reminder_confirmation(booking_id):
@@ -164,17 +168,64 @@ def process_reminder_confirmation(booking_id):
         return False
 
 
-def process_reminder_cancellation(booking_id):
-    """Обрабатывает отмену записи клиентом."""
-    try:
-        booking = Booking.objects.get(booking_id=booking_id)
+def cancel_by_client(booking_id, client=None, check=None):
+    """
+    Отмена записи самим клиентом (кнопка в напоминании или личный
+    кабинет): освобожденное время уходит листу ожидания через
+    booking_cancelled, клиент и администратор получают уведомления.
+
+    Бронь читается под блокировкой строки, поэтому повторное нажатие
+    дождется первой отмены и увидит уже отмененную запись. check(booking)
+    повторяет проверки вызывающего на заблокированной строке.
+    Уведомления уходят после коммита, когда блокировка уже снята.
+    Возвращает отмененную бронь или None.
+    """
+    lookups = {'booking_id': booking_id}
+    if client is not None:
+        lookups['client'] = client
+    with transaction.atomic():
+        booking = Booking.objects.select_for_update(
+            of=('self',)
+        ).select_related('procedure').filter(**lookups).first()
+        if (
+            booking is None
+            or booking.status not in ACTIVE_BOOKING_STATUSES
+            or (check is not None and not check(booking))
+        ):
+            return None
         booking.status = 'cancelled'
         booking.needs_confirmation = False
         booking.save()
-        send_confirmation_notification(booking)
-        return True
-    except Booking.DoesNotExist:
-        return False
+        booking_cancelled.send(sender=Booking, booking=booking)
+        transaction.on_commit(lambda: _notify_cancelled_by_client(booking))
+    return booking
+
+
+def _notify_cancelled_by_client(booking):
+    try:
+        send_cancellation_notification(booking)
+        chat_id = get_admin_chat_id()
+        if chat_id:
+            send_telegram_message(
+                chat_id,
+                CLIENT_SELF_CANCELLED_ADMIN_TEMPLATE.format(
+                    client_name=booking.client_name,
+                    client_phone=booking.client_phone,
+                    procedure_title=booking.procedure.title,
+                    booking_date=booking.booking_date,
+                    booking_time=booking.booking_time.strftime('%H:%M'),
+                ),
+            )
+    except Exception:
+        logger.exception('Ошибка уведомлений об отмене записи клиентом')
+
+
+def process_reminder_cancellation(booking_id):
+    """
+    Обрабатывает отмену записи клиентом из напоминания. Возвращает
+    True, если запись отменена этим нажатием.
+    """
+    return cancel_by_client(booking_id) is not None
 
 
 def schedule_reminder_for_booking(booking, save_changes=True):
@@ -203,13 +254,12 @@ def schedule_reminder_for_booking(booking, save_changes=True):
         now_local = timezone.localtime(timezone.now())
         time_until_reminder = get_time_until_reminder(reminder_time, now_local)
 
-        print('🎯 Запланировано напоминание:')
-        print(f'   Клиент: {booking.client_name}')
-        print(f'   Запись: {booking_datetime_local}')
-        print(f'   Напоминание в: {reminder_time}')
-        print(
-            f'   Осталось часов: '
-            f'{time_until_reminder.total_seconds() / SECONDS_IN_HOUR:.1f}'
+        logger.info(
+            REMINDER_SCHEDULED_MSG,
+            booking.client_name,
+            booking_datetime_local,
+            reminder_time,
+            time_until_reminder.total_seconds() / SECONDS_IN_HOUR,
         )
         booking.reminder_sent = False
         booking.reminder_sent_at = None
@@ -221,5 +271,5 @@ def schedule_reminder_for_booking(booking, save_changes=True):
         return True
 
     except Exception as e:
-        print(f'❌ Ошибка планирования напоминания: {e}')
+        logger.exception(REMINDER_SCHEDULE_ERROR_MSG, e)
         return False
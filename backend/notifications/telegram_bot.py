@@ -1,19 +1,29 @@
 import uuid
 import json
+from asgiref.sync import sync_to_async
 from django.conf import settings
-from django.http import JsonResponse
-from django.views.decorators.csrf import csrf_exempt
+from django.http import HttpResponseNotAllowed, JsonResponse
 from django.utils import timezone
-from django.views.decorators.http import require_POST
 from http import HTTPStatus
+from loguru import logger
 
+from booking.constants import ACTIVE_BOOKING_STATUSES
 from booking.models import Booking
+from booking.signals import booking_cancelled
+from booking.waitlist import accept_offer, decline_offer
+from core.metrics import histogram
+from core.routers import use_primary_db
 from .constants import (
     CONTACT_SAVED_MESSAGE,
     INVALID_UUID_MESSAGE,
     START_MESSAGE,
     UNAUTHORIZED_MESSAGE,
     BOOKING_NOT_FOUND_MESSAGE,
+    WAITLIST_ACCEPT_CALLBACK,
+    WAITLIST_ACCEPTED_MESSAGE,
+    WAITLIST_DECLINE_CALLBACK,
+    WAITLIST_DECLINED_MESSAGE,
+    WAITLIST_UNAVAILABLE_MESSAGE,
 )
 from .models import ClientChat
 from .reminder_utils import (
@@ -21,27 +31,40 @@ from .reminder_utils import (
     process_reminder_cancellation
 )
 from .telegram_utils import (
-    answer_callback_query,
+    answer_callback_query_async,
     create_contact_keyboard,
-    send_telegram_message,
-    send_client_notification
+    send_client_group_notification_async,
+    send_telegram_message_async,
 )
 
+TELEGRAM_WEBHOOK_SECONDS = histogram(
+    'telegram_webhook_duration_seconds',
+    'Время обработки вебхука Telegram',
+)
+
+
+@use_primary_db
+@TELEGRAM_WEBHOOK_SECONDS.time()
+async def telegram_webhook(request):
+    """
+    Webhook для обработки команд из Telegram.
 
-@csrf_exempt
-@require_POST
-def telegram_webhook(request):
-    """Webhook для обработки команд из Telegram."""
+    Async view: под ASGI ожидание Bot API и Telethon не занимает поток.
+    Декораторы csrf_exempt/require_POST в Django 3.2 не поддерживают
+    async views, поэтому метод проверяется вручную.
+    """
+    if request.method != 'POST':
+        return HttpResponseNotAllowed(['POST'])
     try:
         data = json.loads(request.body)
 
         # Обрабатываем контакт (номер телефона)
         if 'message' in data and 'contact' in data['message']:
-            return handle_contact(data['message'])
+            return await handle_contact(data['message'])
 
         # Обрабатываем callback queries
         if 'callback_query' in data:
-            return handle_callback_query(data['callback_query'])
+            return await handle_callback_query(data['callback_query'])
 
         # Обрабатываем текстовые сообщения
         message = data.get('message', {})
@@ -50,23 +73,27 @@ def telegram_webhook(request):
 
         # Команда /start
         if message_text == '/start':
-            return handle_start_command(chat_id)
+            return await handle_start_command(chat_id)
 
         # Команды подтверждения/отмены
         if message_text.startswith('/confirm_'):
             booking_id = message_text.replace('/confirm_', '').strip()
             if is_valid_uuid(booking_id):
-                return confirm_booking(booking_id, chat_id)
+                return await confirm_booking(booking_id, chat_id)
             else:
-                send_telegram_message(chat_id, INVALID_UUID_MESSAGE)
+                await send_telegram_message_async(
+                    chat_id, INVALID_UUID_MESSAGE
+                )
                 return JsonResponse({'status': 'invalid_command'})
 
         if message_text.startswith('/cancel_'):
             booking_id = message_text.replace('/cancel_', '').strip()
             if is_valid_uuid(booking_id):
-                return cancel_booking(booking_id, chat_id)
+                return await cancel_booking(booking_id, chat_id)
             else:
-                send_telegram_message(chat_id, INVALID_UUID_MESSAGE)
+                await send_telegram_message_async(
+                    chat_id, INVALID_UUID_MESSAGE
+                )
                 return JsonResponse({'status': 'invalid_command'})
 
     except json.JSONDecodeError:
@@ -74,12 +101,15 @@ def telegram_webhook(request):
             {'error': 'Invalid JSON'},
             status=HTTPStatus.BAD_REQUEST
         )
-    except Exception as e:
-        print(f'Error: {e}')
+    except Exception:
+        logger.exception('Ошибка обработки вебхука Telegram')
 
     return JsonResponse({'status': 'ok'})
 
 
+telegram_webhook.csrf_exempt = True
+
+
 def is_valid_uuid(uuid_string):
     """Проверяет валидность UUID."""
     try:
@@ -89,134 +119,202 @@ def is_valid_uuid(uuid_string):
         return False
 
 
-def handle_contact(message):
+async def handle_contact(message):
     """Обрабатывает отправку контакта."""
     contact = message['contact']
     phone = contact.get('phone_number')
     chat_id = message['chat']['id']
     normalized_phone = phone if phone.startswith('+') else '+' + phone
-    ClientChat.objects.update_or_create(
+    await sync_to_async(ClientChat.objects.update_or_create)(
         phone=normalized_phone,
         defaults={'chat_id': chat_id}
     )
 
-    send_telegram_message(chat_id, CONTACT_SAVED_MESSAGE)
+    await send_telegram_message_async(chat_id, CONTACT_SAVED_MESSAGE)
     return JsonResponse({'status': 'contact_saved'})
 
 
-def handle_start_command(chat_id):
+async def handle_start_command(chat_id):
     """Обрабатывает команду /start."""
     keyboard = create_contact_keyboard()
-    send_telegram_message(chat_id, START_MESSAGE, reply_markup=keyboard)
+    await send_telegram_message_async(
+        chat_id, START_MESSAGE, reply_markup=keyboard
+    )
     return JsonResponse({'status': 'start_handled'})
 
 
-def handle_callback_query(data):
+async def handle_callback_query(data):
     """Обрабатывает нажатия на кнопки."""
     callback_data = data.get('data', '')
     chat_id = data.get('from', {}).get('id')
 
     if callback_data.startswith('reminder_confirm_'):
         booking_id = callback_data.replace('reminder_confirm_', '').strip()
-        result = process_reminder_confirmation(booking_id)
-        answer_callback_query(data['id'], "Запись подтверждена ✅")
+        await sync_to_async(process_reminder_confirmation)(booking_id)
+        await answer_callback_query_async(data['id'], "Запись подтверждена ✅")
         return JsonResponse({'status': 'reminder_confirmed'})
 
     elif callback_data.startswith('reminder_cancel_'):
         booking_id = callback_data.replace('reminder_cancel_', '').strip()
-        result = process_reminder_cancellation(booking_id)
-        answer_callback_query(data['id'], "Запись отменена ❌")
+        await sync_to_async(process_reminder_cancellation)(booking_id)
+        await answer_callback_query_async(data['id'], "Запись отменена ❌")
         return JsonResponse({'status': 'reminder_cancelled'})
 
+    elif callback_data.startswith(WAITLIST_ACCEPT_CALLBACK):
+        token = callback_data.replace(WAITLIST_ACCEPT_CALLBACK, '').strip()
+        booking = None
+        if is_valid_uuid(token):
+            booking = await sync_to_async(accept_offer)(token, chat_id)
+        await answer_callback_query_async(
+            data['id'],
+            WAITLIST_ACCEPTED_MESSAGE if booking
+            else WAITLIST_UNAVAILABLE_MESSAGE,
+        )
+        return JsonResponse({
+            'status': 'waitlist_accepted' if booking
+            else 'waitlist_unavailable'
+        })
+
+    elif callback_data.startswith(WAITLIST_DECLINE_CALLBACK):
+        token = callback_data.replace(WAITLIST_DECLINE_CALLBACK, '').strip()
+        declined = False
+        if is_valid_uuid(token):
+            declined = await sync_to_async(decline_offer)(token, chat_id)
+        await answer_callback_query_async(
+            data['id'],
+            WAITLIST_DECLINED_MESSAGE if declined
+            else WAITLIST_UNAVAILABLE_MESSAGE,
+        )
+        return JsonResponse({
+            'status': 'waitlist_declined' if declined
+            else 'waitlist_unavailable'
+        })
+
     elif callback_data.startswith('confirm_'):
         booking_id = callback_data.replace('confirm_', '').strip()
-        result = confirm_booking(booking_id, chat_id)
-        answer_callback_query(data['id'], "Запись подтверждена ✅")
+        result = await confirm_booking(booking_id, chat_id)
+        await answer_callback_query_async(data['id'], "Запись подтверждена ✅")
         return result
 
     elif callback_data.startswith('cancel_'):
         booking_id = callback_data.replace('cancel_', '').strip()
-        result = cancel_booking(booking_id, chat_id)
-        answer_callback_query(data['id'], "Запись отменена ❌")
+        result = await cancel_booking(booking_id, chat_id)
+        await answer_callback_query_async(data['id'], "Запись отменена ❌")
         return result
 
     return JsonResponse({'status': 'unknown_command'})
 
 
-def confirm_booking(booking_id, chat_id):
-    """Подтверждение бронирования."""
-    try:
-        booking = Booking.objects.get(booking_id=booking_id)
-        master_chat_id = str(
-            booking.master.telegram_chat_id
-        ) if booking.master.telegram_chat_id else None
-        admin_chat_id = str(
-            getattr(settings, 'TELEGRAM_ADMIN_CHAT_ID', '')
-        )
+def _get_bookings(booking_id):
+    """
+    Бронь и остальные брони ее серии или комбо-записи (по дате и времени)
+    со связанными объектами, нужными для уведомлений.
+    """
+    bookings = Booking.objects.select_related('procedure', 'master')
+    booking = bookings.get(booking_id=booking_id)
+    if booking.series_id is not None:
+        related = bookings.filter(series_id=booking.series_id)
+    elif booking.group_id is not None:
+        related = bookings.filter(group_id=booking.group_id)
+    else:
+        return [booking]
+    return list(related.order_by('booking_date', 'booking_time'))
+
+
+def _find_booking(bookings, booking_id):
+    return next(
+        booking for booking in bookings
+        if str(booking.booking_id) == str(booking_id)
+    )
 
-        if str(chat_id) != master_chat_id and str(chat_id) != admin_chat_id:
-            send_telegram_message(chat_id, UNAUTHORIZED_MESSAGE)
-            return JsonResponse(
-                {'error': 'Unauthorized'},
-                status=HTTPStatus.FORBIDDEN
-            )
 
+def _is_staff_chat(booking, chat_id):
+    """Команду может выполнить мастер брони или администратор."""
+    master_chat_id = str(
+        booking.master.telegram_chat_id
+    ) if booking.master.telegram_chat_id else None
+    admin_chat_id = str(getattr(settings, 'TELEGRAM_ADMIN_CHAT_ID', ''))
+    return str(chat_id) in (master_chat_id, admin_chat_id)
+
+
+def _save_confirmed(bookings):
+    from .reminder_utils import schedule_reminder_for_booking
+
+    for booking in bookings:
         old_status = booking.status
         booking.status = 'confirmed'
         booking.confirmed_at = timezone.now()
 
         if old_status != 'confirmed':
-            from .reminder_utils import schedule_reminder_for_booking
             schedule_reminder_for_booking(
                 booking,
                 save_changes=False,
             )
         booking.save()
-        send_client_notification(booking, 'confirmed')
-        send_telegram_message(
-            chat_id,
-            f'✅ Запись подтверждена!\nДата: {booking.booking_date} в '
-            f'{booking.booking_time}\nТелефон: {booking.client_phone}'
-            f'\nКлиент: {booking.client_name}'
-        )
 
-        return JsonResponse({'status': 'confirmed'})
 
+def _save_cancelled(bookings):
+    for booking in bookings:
+        was_active = booking.status in ACTIVE_BOOKING_STATUSES
+        booking.status = 'cancelled'
+        booking.save()
+        if was_active:
+            booking_cancelled.send(sender=Booking, booking=booking)
+
+
+async def confirm_booking(booking_id, chat_id):
+    """Подтверждение бронирования (всей серии или комбо-записи)."""
+    try:
+        bookings = await sync_to_async(_get_bookings)(booking_id)
     except Booking.DoesNotExist:
-        send_telegram_message(chat_id, BOOKING_NOT_FOUND_MESSAGE)
+        await send_telegram_message_async(chat_id, BOOKING_NOT_FOUND_MESSAGE)
         return JsonResponse(
             {'error': 'Booking not found'},
             status=HTTPStatus.NOT_FOUND,
         )
 
+    booking = _find_booking(bookings, booking_id)
+    if not _is_staff_chat(booking, chat_id):
+        await send_telegram_message_async(chat_id, UNAUTHORIZED_MESSAGE)
+        return JsonResponse(
+            {'error': 'Unauthorized'},
+            status=HTTPStatus.FORBIDDEN
+        )
 
-def cancel_booking(booking_id, chat_id):
-    """Отмена бронирования."""
-    try:
-        booking = Booking.objects.get(booking_id=booking_id)
-        master_chat_id = str(
-            booking.master.telegram_chat_id
-        ) if booking.master.telegram_chat_id else None
-        admin_chat_id = str(getattr(settings, 'TELEGRAM_ADMIN_CHAT_ID', ''))
-
-        if str(chat_id) != master_chat_id and str(chat_id) != admin_chat_id:
-            send_telegram_message(chat_id, UNAUTHORIZED_MESSAGE)
-            return JsonResponse({'error': 'Unauthorized'}, status=403)
-
-        booking.status = 'cancelled'
-        booking.save()
+    await sync_to_async(_save_confirmed)(bookings)
+    # Клиент получает одно сообщение на всю серию или комбо-запись
+    await send_client_group_notification_async(bookings, 'confirmed')
+    await send_telegram_message_async(
+        chat_id,
+        f'✅ Запись подтверждена!\nДата: {booking.booking_date} в '
+        f'{booking.booking_time}\nТелефон: {booking.client_phone}'
+        f'\nКлиент: {booking.client_name}'
+    )
 
-        send_client_notification(booking, 'cancelled')
-        send_telegram_message(
-            chat_id,
-            f'❌ Запись {booking.booking_id} отменена.'
-        )
+    return JsonResponse({'status': 'confirmed'})
 
-        return JsonResponse({'status': 'cancelled'})
 
+async def cancel_booking(booking_id, chat_id):
+    """Отмена бронирования (всей серии или комбо-записи)."""
+    try:
+        bookings = await sync_to_async(_get_bookings)(booking_id)
     except Booking.DoesNotExist:
-        send_telegram_message(chat_id, BOOKING_NOT_FOUND_MESSAGE)
+        await send_telegram_message_async(chat_id, BOOKING_NOT_FOUND_MESSAGE)
         return JsonResponse(
             {'error': 'Booking not found'},
             status=HTTPStatus.BAD_REQUEST,
         )
+
+    booking = _find_booking(bookings, booking_id)
+    if not _is_staff_chat(booking, chat_id):
+        await send_telegram_message_async(chat_id, UNAUTHORIZED_MESSAGE)
+        return JsonResponse({'error': 'Unauthorized'}, status=403)
+
+    await sync_to_async(_save_cancelled)(bookings)
+    await send_client_group_notification_async(bookings, 'cancelled')
+    await send_telegram_message_async(
+        chat_id,
+        f'❌ Запись {booking.booking_id} отменена.'
+    )
+
+    return JsonResponse({'status': 'cancelled'})
@@ -1,10 +1,17 @@
+import asyncio
+
+import httpx
 import requests
+from asgiref.sync import sync_to_async
 from django.conf import settings
 from django.core.mail import send_mail
+from functools import lru_cache, wraps
 from http import HTTPStatus
+from loguru import logger
 
 from about.utils import get_contact_phone
 from about.views import get_salon_address
+from core.metrics import counter, histogram
 from masters.models import Master
 from .constants import (
     BOOKING_CREATED_TEMPLATE,
@@ -12,27 +19,137 @@ from .constants import (
     CANCELLATION_TELEGRAM_TEMPLATE,
     CLIENT_CONFIRMED_TEMPLATE,
     CLIENT_CANCELLED_TEMPLATE,
+    CLIENT_GROUP_CANCELLED_TEMPLATE,
+    CLIENT_GROUP_CONFIRMED_TEMPLATE,
+    CLIENT_GROUP_ITEM_TEMPLATE,
+    CLIENT_RESCHEDULED_TEMPLATE,
     CONFIRM_BUTTON_TEXT,
     CONFIRMED_EMAIL_TEMPLATE,
+    CONFIRMED_GROUP_EMAIL_TEMPLATE,
     CONFIRMATION_TELEGRAM_TEMPLATE,
+    EMAIL_SUBJECTS,
+    GROUP_BOOKING_CREATED_TEMPLATE,
+    GROUP_BOOKING_ITEM_TEMPLATE,
     REMINDER_EMAIL_TEMPLATE,
     REMINDER_TELEGRAM_TEMPLATE,
+    RESCHEDULED_EMAIL_TEMPLATE,
     SECONDS_IN_MINUTE,
+    SERIES_BOOKING_CREATED_TEMPLATE,
+    SERIES_BOOKING_ITEM_TEMPLATE,
+    SERIES_SKIPPED_TEMPLATE,
+    WAITLIST_ACCEPT_BUTTON_TEXT,
+    WAITLIST_ACCEPT_CALLBACK,
+    WAITLIST_DECLINE_BUTTON_TEXT,
+    WAITLIST_DECLINE_CALLBACK,
+    WAITLIST_OFFER_TEMPLATE,
 )
 from .models import ClientChat, TelegramBot
-from .personal_sender import send_personal_telegram_message
+from .personal_sender import (
+    send_personal_telegram_message,
+    send_personal_telegram_message_async,
+)
+
+NOTIFICATION_SEND_SECONDS = histogram(
+    'notification_send_duration_seconds',
+    'Время отправки уведомления',
+    labelnames=['channel'],
+)
+NOTIFICATION_SENDS = counter(
+    'notification_sends_total',
+    'Отправленные уведомления по результату',
+    labelnames=['channel', 'result'],
+)
+
+
+def track_send(channel):
+    """Учитывает время и результат отправки (True/False/исключение)."""
+    def record(sent):
+        NOTIFICATION_SENDS.inc(
+            channel=channel, result='sent' if sent else 'failed'
+        )
+        return sent
+
+    def decorator(func):
+        if asyncio.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                try:
+                    with NOTIFICATION_SEND_SECONDS.time(channel=channel):
+                        sent = await func(*args, **kwargs)
+                except Exception:
+                    NOTIFICATION_SENDS.inc(channel=channel, result='error')
+                    raise
+                return record(sent)
+            return async_wrapper
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            try:
+                with NOTIFICATION_SEND_SECONDS.time(channel=channel):
+                    sent = func(*args, **kwargs)
+            except Exception:
+                NOTIFICATION_SENDS.inc(channel=channel, result='error')
+                raise
+            return record(sent)
+        return wrapper
+    return decorator
+
+
+def _get_active_bot():
+    return TelegramBot.objects.filter(is_active=True).first()
+
+
+def _bot_api_url(bot, method):
+    return f'https://api.telegram.org/bot{bot.token}/{method}'
+
+
+def _message_payload(chat_id, message, reply_markup=None):
+    payload = {'chat_id': chat_id, 'text': message, 'parse_mode': 'HTML'}
+    if reply_markup:
+        payload['reply_markup'] = reply_markup
+    return payload
+
+
+@lru_cache(maxsize=None)
+def _ssl_context():
+    # Загрузка сертификатов занимает десятки миллисекунд, делаем ее один раз
+    return httpx.create_ssl_context()
+
+
+async def _post_bot_api_async(method, payload, timeout):
+    """
+    Вызов Bot API без блокировки цикла событий. Клиент httpx создается
+    на вызов: при WSGI каждый async_to_sync работает в своем цикле.
+    """
+    bot = await sync_to_async(_get_active_bot)()
+    if not bot:
+        return False
+    try:
+        async with httpx.AsyncClient(
+            timeout=timeout, verify=_ssl_context()
+        ) as client:
+            response = await client.post(
+                _bot_api_url(bot, method), json=payload
+            )
+        return response.status_code == HTTPStatus.OK
+    except Exception:
+        return False
 
 
+@track_send('email')
 def send_email_notification(booking, notification_type):
     """Отправляет уведомление по email."""
     if not booking.client_email:
-        print(f'DEBUG: Нет email клиента - {booking.client_email}')
+        logger.debug('Нет email клиента для брони {}', booking.booking_id)
         return False
 
-    templates = {'confirmed': CONFIRMED_EMAIL_TEMPLATE}
+    templates = {
+        'confirmed': CONFIRMED_EMAIL_TEMPLATE,
+        'rescheduled': RESCHEDULED_EMAIL_TEMPLATE,
+    }
 
     if notification_type not in templates:
-        print(f'DEBUG: Неизвестный тип уведомления - {notification_type}')
+        logger.warning('Неизвестный тип уведомления: {}', notification_type)
         return False
 
     try:
@@ -46,33 +163,62 @@ def send_email_notification(booking, notification_type):
             address=get_salon_address(),
         )
         send_mail(
-            subject='✅ Подтверждение записи в салоне красоты',
+            subject=EMAIL_SUBJECTS[notification_type],
             message=formatted_message,
             from_email=settings.DEFAULT_FROM_EMAIL,
             recipient_list=[booking.client_email],
             fail_silently=False,
         )
-        print('DEBUG: Email отправлен успешно!')
+        logger.info('Email отправлен для брони {}', booking.booking_id)
         return True
-    except Exception as e:
-        print(f'DEBUG: Ошибка отправки email: {str(e)}')
-        import traceback
+    except Exception:
+        logger.exception('Ошибка отправки email')
+        return False
+
+
+@track_send('email')
+def send_email_group_notification(bookings, notification_type):
+    """Одно письмо обо всех бронях серии или комбо-записи."""
+    first = bookings[0]
+    if not first.client_email:
+        logger.debug('Нет email клиента для брони {}', first.booking_id)
+        return False
+
+    templates = {'confirmed': CONFIRMED_GROUP_EMAIL_TEMPLATE}
 
-        print(f'DEBUG: Полная трассировка: {traceback.format_exc()}')
+    if notification_type not in templates:
+        logger.warning('Неизвестный тип уведомления: {}', notification_type)
+        return False
+
+    try:
+        send_mail(
+            subject=EMAIL_SUBJECTS[notification_type],
+            message=templates[notification_type].format(
+                client_name=first.client_name,
+                items=_format_client_items(bookings),
+                master_phone=get_contact_phone(),
+                address=get_salon_address(),
+            ),
+            from_email=settings.DEFAULT_FROM_EMAIL,
+            recipient_list=[first.client_email],
+            fail_silently=False,
+        )
+        logger.info('Email отправлен для брони {}', first.booking_id)
+        return True
+    except Exception:
+        logger.exception('Ошибка отправки email')
         return False
 
 
+@track_send('telegram_bot')
 def send_telegram_message(chat_id, message, reply_markup=None):
     """Отправляет сообщение в Telegram."""
-    bot = TelegramBot.objects.filter(is_active=True).first()
+    bot = _get_active_bot()
     if not bot:
         return False
 
-    url = f'https://api.telegram.org/bot{bot.token}/sendMessage'
-    payload = {'chat_id': chat_id, 'text': message, 'parse_mode': 'HTML'}
-
-    if reply_markup:
-        payload['reply_markup'] = reply_markup
+    url = _bot_api_url(bot, 'sendMessage')
+    payload = _message_payload(chat_id, message, reply_markup)
 
     try:
         response = requests.post(url, json=payload, timeout=10)
@@ -81,6 +227,16 @@ def send_telegram_message(chat_id, message, reply_markup=None):
         return False
 
 
+@track_send('telegram_bot')
+async def send_telegram_message_async(chat_id, message, reply_markup=None):
+    """Асинхронная версия send_telegram_message для async views."""
+    return await _post_bot_api_async(
+        'sendMessage',
+        _message_payload(chat_id, message, reply_markup),
+        timeout=10,
+    )
+
+
 def create_inline_keyboard(booking_id):
     """Создает клавиатуру для подтверждения/отмены."""
     return {
@@ -119,7 +275,7 @@ def find_chat_id_by_phone(phone):
     """Находит chat_id по номеру телефона."""
     try:
         client_chat = ClientChat.objects.filter(phone=phone).first()
-        print(f'DEBAG chat_id по номеру телефона = {client_chat}')
+        logger.debug('chat_id по номеру телефона: {}', client_chat)
         return client_chat.chat_id if client_chat else None
     except Exception:
         return None
@@ -142,18 +298,15 @@ def get_admin_chat_id():
 
 def send_booking_notification(booking):
     """Отправляет уведомление о новом бронировании."""
-    print(
-        f'🔔 DEBUG: Начало отправки уведомления для брони {booking.booking_id}'
-    )
+    logger.debug('Отправка уведомления для брони {}', booking.booking_id)
     try:
         bot = TelegramBot.objects.filter(is_active=True).first()
         if not bot or not bot.token:
-            print('❌ DEBUG: Бот не настроен')
+            logger.warning('Telegram бот не настроен')
             return False
         chat_id = get_admin_chat_id()
-        print(f'🔔 DEBUG: Итоговый Chat ID для отправки: {chat_id}')
         if not chat_id:
-            print('❌ DEBUG: Не указан chat_id для отправки')
+            logger.warning('Не указан chat_id администратора')
             return False
 
         # Формируем сообщение
@@ -187,52 +340,205 @@ def send_booking_notification(booking):
 
         keyboard = create_inline_keyboard(booking.booking_id)
 
-        print('🔔 DEBUG: Отправка сообщения через Bot API...')
         success = send_telegram_message(
             chat_id,
             message,
             reply_markup=keyboard,
         )
-        print(f'🔔 DEBUG: Результат отправки: {success}')
-
         if not success:
-            print('❌ DEBUG: Не удалось отправить сообщение через Bot API')
+            logger.warning(
+                'Не удалось отправить уведомление о брони {} через Bot API',
+                booking.booking_id,
+            )
 
         return success
 
-    except Exception as e:
-        print(f'❌ DEBUG: Критическая ошибка в send_booking_notification: {e}')
-        import traceback
+    except Exception:
+        logger.exception('Ошибка в send_booking_notification')
+        return False
+
+
+def send_group_booking_notification(bookings, skipped=()):
+    """
+    Одно уведомление администратору о записи на несколько процедур
+    подряд или о серии записей; кнопки подтверждения действуют на всю
+    группу или серию. skipped - описания занятых дат серии.
+    """
+    first = bookings[0]
+    if len(bookings) == 1 and first.series_id is None:
+        return send_booking_notification(first)
+
+    logger.debug(
+        'Отправка уведомления для группы {}',
+        first.series_id or first.group_id,
+    )
+    try:
+        chat_id = get_admin_chat_id()
+        if not chat_id:
+            logger.warning('Не указан chat_id администратора')
+            return False
+
+        item_template = (
+            SERIES_BOOKING_ITEM_TEMPLATE if first.series_id
+            else GROUP_BOOKING_ITEM_TEMPLATE
+        )
+        items = []
+        total_price = 0
+        total_minutes = 0
+        for booking in bookings:
+            duration = int(
+                booking.procedure.duration.total_seconds() / SECONDS_IN_MINUTE
+            )
+            total_price += booking.procedure.price
+            total_minutes += duration
+            items.append(item_template.format(
+                booking_date=booking.booking_date.strftime('%d.%m.%Y'),
+                booking_time=booking.booking_time.strftime('%H:%M'),
+                procedure_title=booking.procedure.title,
+                duration_minutes=duration,
+                master_name=booking.master.name,
+            ))
+
+        new_client_text = ''
+        payment_info = ''
+        if first.prepayment_required:
+            new_client_text = '🆕 <b>НОВЫЙ КЛИЕНТ - ТРЕБУЕТСЯ ПРЕДОПЛАТА</b>'
+            payment_info = (
+                f'💳 <b>Требуется предоплата:</b> {total_price} руб.\n'
+            )
+
+        message_template = (
+            SERIES_BOOKING_CREATED_TEMPLATE if first.series_id
+            else GROUP_BOOKING_CREATED_TEMPLATE
+        )
+        message = message_template.format(
+            count=len(bookings),
+            new_client_text=new_client_text,
+            client_name=first.client_name,
+            client_phone=first.client_phone,
+            booking_date=first.booking_date,
+            items='\n'.join(items),
+            total_price=total_price,
+            total_minutes=total_minutes,
+            skipped_info=(
+                SERIES_SKIPPED_TEMPLATE.format('\n'.join(skipped))
+                if skipped else ''
+            ),
+            payment_info=payment_info,
+        )
+        return send_telegram_message(
+            chat_id,
+            message,
+            reply_markup=create_inline_keyboard(first.booking_id),
+        )
 
-        print(f'❌ DEBUG: Трассировка: {traceback.format_exc()}')
+    except Exception:
+        logger.exception('Ошибка в send_group_booking_notification')
         return False
 
 
 def send_client_notification(booking, notification_type):
     """Отправляет уведомление клиенту выбранным способом."""
     if booking.notification_method == 'telegram':
-        print(f'🔔 DEBUG: Отправка Telegram на {booking.client_phone}')
         return send_telegram_notification(booking, notification_type)
     elif booking.notification_method == 'email':
-        print('🔔 DEBUG: Выбран Email')
         return send_email_notification(booking, notification_type)
     else:
-        print(f'🔔 DEBUG: Неизвестный метод: {booking.notification_method}')
+        logger.warning(
+            'Неизвестный способ уведомления: {}', booking.notification_method
+        )
+    return False
+
+
+async def send_client_notification_async(booking, notification_type):
+    """
+    Асинхронная версия send_client_notification. Бронь должна быть
+    загружена с select_related('procedure', 'master').
+    """
+    if booking.notification_method == 'telegram':
+        return await send_telegram_notification_async(
+            booking, notification_type
+        )
+    elif booking.notification_method == 'email':
+        return await sync_to_async(send_email_notification)(
+            booking, notification_type
+        )
+    else:
+        logger.warning(
+            'Неизвестный способ уведомления: {}', booking.notification_method
+        )
     return False
 
 
-def send_telegram_notification(booking, notification_type):
-    """Отправляет уведомление в Telegram через личный аккаунт."""
+async def send_client_group_notification_async(bookings, notification_type):
+    """
+    Одно уведомление клиенту обо всех бронях серии или комбо-записи
+    (брони загружены с select_related('procedure', 'master')).
+    Сообщения от личного аккаунта уходят по одному: клиенты Telethon
+    делят файл сессии, и параллельная отправка его блокирует.
+    """
+    first = bookings[0]
+    if len(bookings) == 1:
+        return await send_client_notification_async(first, notification_type)
+    if first.notification_method == 'telegram':
+        return await send_telegram_group_notification_async(
+            bookings, notification_type
+        )
+    elif first.notification_method == 'email':
+        return await sync_to_async(send_email_group_notification)(
+            bookings, notification_type
+        )
+    else:
+        logger.warning(
+            'Неизвестный способ уведомления: {}', first.notification_method
+        )
+    return False
+
+
+def _format_client_items(bookings):
+    return '\n'.join(
+        CLIENT_GROUP_ITEM_TEMPLATE.format(
+            booking_date=booking.booking_date.strftime('%d.%m.%Y'),
+            booking_time=booking.booking_time.strftime('%H:%M'),
+            procedure_title=booking.procedure.title,
+            master_name=booking.master.name,
+        )
+        for booking in bookings
+    )
+
+
+def _format_client_group_notification(bookings, notification_type):
+    """Текст уведомления о нескольких бронях или None."""
+    templates = {
+        'confirmed': CLIENT_GROUP_CONFIRMED_TEMPLATE,
+        'cancelled': CLIENT_GROUP_CANCELLED_TEMPLATE,
+    }
+
+    if notification_type not in templates:
+        logger.warning('Неизвестный тип уведомления: {}', notification_type)
+        return None
+
+    return templates[notification_type].format(
+        client_name=bookings[0].client_name,
+        items=_format_client_items(bookings),
+        master_phone=get_contact_phone(),
+        address=get_salon_address(),
+    )
+
+
+def _format_client_notification(booking, notification_type):
+    """Текст уведомления клиенту или None для неизвестного типа."""
     templates = {
         'confirmed': CLIENT_CONFIRMED_TEMPLATE,
         'cancelled': CLIENT_CANCELLED_TEMPLATE,
+        'rescheduled': CLIENT_RESCHEDULED_TEMPLATE,
     }
 
     if notification_type not in templates:
-        print(f'❌ Неизвестный тип уведомления: {notification_type}')
-        return False
+        logger.warning('Неизвестный тип уведомления: {}', notification_type)
+        return None
 
-    message = templates[notification_type].format(
+    return templates[notification_type].format(
         client_name=booking.client_name,
         procedure_title=booking.procedure.title,
         master_name=booking.master.name,
@@ -242,20 +548,61 @@ def send_telegram_notification(booking, notification_type):
         address=get_salon_address(),
     )
 
-    print(
-        f'🔔 Отправка Telegram на {booking.client_phone}: {notification_type}'
+
+@track_send('telegram_personal')
+def send_telegram_notification(booking, notification_type):
+    """Отправляет уведомление в Telegram через личный аккаунт."""
+    message = _format_client_notification(booking, notification_type)
+    if message is None:
+        return False
+
+    logger.debug(
+        'Отправка Telegram на {}: {}', booking.client_phone, notification_type
     )
 
     return send_personal_telegram_message(booking.client_phone, message)
 
 
+@track_send('telegram_personal')
+async def send_telegram_notification_async(booking, notification_type):
+    """Асинхронная версия send_telegram_notification."""
+    message = await sync_to_async(_format_client_notification)(
+        booking, notification_type
+    )
+    if message is None:
+        return False
+
+    logger.debug(
+        'Отправка Telegram на {}: {}', booking.client_phone, notification_type
+    )
+
+    return await send_personal_telegram_message_async(
+        booking.client_phone, message
+    )
+
+
+@track_send('telegram_personal')
+async def send_telegram_group_notification_async(bookings, notification_type):
+    """Одно сообщение в Telegram обо всех бронях группы."""
+    message = await sync_to_async(_format_client_group_notification)(
+        bookings, notification_type
+    )
+    if message is None:
+        return False
+
+    phone = bookings[0].client_phone
+    logger.debug('Отправка Telegram на {}: {}', phone, notification_type)
+
+    return await send_personal_telegram_message_async(phone, message)
+
+
 def answer_callback_query(callback_query_id, text):
     """Отправляет ответ на callback query."""
-    bot = TelegramBot.objects.filter(is_active=True).first()
+    bot = _get_active_bot()
     if not bot:
         return False
 
-    url = f'https://api.telegram.org/bot{bot.token}/answerCallbackQuery'
+    url = _bot_api_url(bot, 'answerCallbackQuery')
     payload = {'callback_query_id': callback_query_id, 'text': text}
 
     try:
@@ -265,6 +612,15 @@ def answer_callback_query(callback_query_id, text):
         return False
 
 
+async def answer_callback_query_async(callback_query_id, text):
+    """Асинхронная версия answer_callback_query."""
+    return await _post_bot_api_async(
+        'answerCallbackQuery',
+        {'callback_query_id': callback_query_id, 'text': text},
+        timeout=5,
+    )
+
+
 def create_reminder_keyboard(booking_id):
     """Создает клавиатуру для подтверждения/отмены напоминания."""
     return {
@@ -292,6 +648,7 @@ def send_reminder_notification(booking):
     return False
 
 
+@track_send('telegram_personal')
 def send_telegram_reminder(booking):
     """Отправляет напоминание в Telegram через ЛИЧНЫЕ сообщения."""
     message = REMINDER_TELEGRAM_TEMPLATE.format(
@@ -303,10 +660,11 @@ def send_telegram_reminder(booking):
         address=get_salon_address(),
         master_phone=get_contact_phone(),
     )
-    print(f'📤 Отправка личного напоминания на {booking.client_phone}')
+    logger.debug('Отправка личного напоминания на {}', booking.client_phone)
     return send_personal_telegram_message(booking.client_phone, message)
 
 
+@track_send('email')
 def send_email_reminder(booking):
     """Отправляет напоминание по email."""
     if not booking.client_email:
@@ -331,8 +689,8 @@ def send_email_reminder(booking):
             fail_silently=False,
         )
         return True
-    except Exception as e:
-        print(f'DEBUG: Ошибка отправки email напоминания: {str(e)}')
+    except Exception:
+        logger.exception('Ошибка отправки email напоминания')
         return False
 
 
@@ -365,3 +723,47 @@ def send_cancellation_notification(booking):
         ).first()
         if client_chat:
             send_telegram_message(client_chat.chat_id, message)
+
+
+def create_waitlist_offer_keyboard(token):
+    """Создает клавиатуру для ответа на предложение из листа ожидания."""
+    return {
+        'inline_keyboard': [
+            [
+                {
+                    'text': WAITLIST_ACCEPT_BUTTON_TEXT,
+                    'callback_data': f'{WAITLIST_ACCEPT_CALLBACK}{token}',
+                },
+                {
+                    'text': WAITLIST_DECLINE_BUTTON_TEXT,
+                    'callback_data': f'{WAITLIST_DECLINE_CALLBACK}{token}',
+                },
+            ]
+        ]
+    }
+
+
+def send_waitlist_offer(offer, ttl_minutes):
+    """
+    Предлагает клиенту из листа ожидания освободившееся время.
+    Ответ возможен только кнопками бота, поэтому нужен chat_id клиента.
+    """
+    client = offer.entry.client
+    chat_id = find_chat_id_by_phone(client.phone)
+    if not chat_id:
+        logger.info('Нет chat_id для предложения клиенту {}', client.phone)
+        return False
+
+    message = WAITLIST_OFFER_TEMPLATE.format(
+        client_name=client.name,
+        procedure_title=offer.entry.procedure.title,
+        master_name=offer.master.name,
+        booking_date=offer.booking_date,
+        booking_time=offer.booking_time.strftime('%H:%M'),
+        ttl_minutes=ttl_minutes,
+    )
+    return send_telegram_message(
+        chat_id,
+        message,
+        reply_markup=create_waitlist_offer_keyboard(offer.token),
+    )
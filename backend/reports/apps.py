@@ -0,0 +1,25 @@
+from django.apps import AppConfig
+
+
+class ReportsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'reports'
+    verbose_name = 'Отчеты'
+
+    def ready(self):
+        from django.db.models.signals import post_delete, post_save
+
+        from booking.models import ArchivedBooking, Booking
+        from .rollups import refresh_booking_rollups
+
+        for model in (Booking, ArchivedBooking):
+            post_save.connect(
+                refresh_booking_rollups,
+                sender=model,
+                dispatch_uid=f'reports_{model.__name__.lower()}_save',
+            )
+            post_delete.connect(
+                refresh_booking_rollups,
+                sender=model,
+                dispatch_uid=f'reports_{model.__name__.lower()}_delete',
+            )
@@ -0,0 +1,34 @@
+from booking.constants import (
+    STATUS_CANCELLED,
+    STATUS_COMPLETED,
+    STATUS_NO_SHOW,
+)
+
+REVENUE_MAX_DIGITS = 12
+
+# Выручка считается только по завершенным визитам
+REVENUE_STATUSES = [STATUS_COMPLETED]
+COMPLETED_STATUSES = [STATUS_COMPLETED]
+NO_SHOW_STATUSES = [STATUS_NO_SHOW]
+# Отмененные записи не занимают время мастера
+CANCELLED_STATUSES = [STATUS_CANCELLED]
+
+# Счетчики сводных таблиц (кроме выручки и минут)
+COUNTER_FIELDS = ('bookings', 'completed', 'no_shows', 'cancelled')
+STATS_FIELDS = COUNTER_FIELDS + ('revenue', 'booked_minutes')
+# Поля записи, от которых зависят сводки
+ROLLUP_SOURCE_FIELDS = {
+    'status', 'master', 'master_id', 'procedure', 'procedure_id',
+    'booking_date',
+}
+
+# Команда rebuild_rollups: дней в одной пачке (одна транзакция)
+REBUILD_BATCH_DAYS = 31
+
+# Дашборд
+DASHBOARD_DEFAULT_DAYS = 30
+DATE_FROM_PARAM = 'date_from'
+DATE_TO_PARAM = 'date_to'
+WEEKDAY_NAMES = ['Пн', 'Вт', 'Ср', 'Чт', 'Пт', 'Сб', 'Вс']
+
+MSG_BAD_PERIOD = 'Некорректный период, показаны последние {} дней'
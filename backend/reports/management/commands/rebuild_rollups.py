@@ -0,0 +1,73 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ...constants import REBUILD_BATCH_DAYS
+from ...rollups import get_booking_date_range, rebuild_rollups
+
+
+class Command(BaseCommand):
+    """
+    Пересчет дневных сводок пачками по датам
+    python manage.py rebuild_rollups --date-from 2026-01-01.
+
+    Без дат пересчитывается весь период записей. Ночной запуск за
+    вчерашний день добавляет строки дней без записей для загрузки.
+    """
+
+    help = 'Пересчитывает сводки по мастерам и процедурам'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--date-from',
+            type=date.fromisoformat,
+            default=None,
+            help='Первая дата (ГГГГ-ММ-ДД)',
+        )
+        parser.add_argument(
+            '--date-to',
+            type=date.fromisoformat,
+            default=None,
+            help='Последняя дата (ГГГГ-ММ-ДД)',
+        )
+        parser.add_argument(
+            '--batch-days',
+            type=int,
+            default=REBUILD_BATCH_DAYS,
+            help='Дней в пачке (одна транзакция на пачку)',
+        )
+
+    def handle(self, *args, **options):
+        date_from = options['date_from']
+        date_to = options['date_to']
+        if date_from is None or date_to is None:
+            booking_range = get_booking_date_range()
+            if booking_range is None:
+                self.stdout.write('📋 Записей нет, пересчитывать нечего')
+                return
+            date_from = date_from or booking_range[0]
+            date_to = date_to or booking_range[1]
+        if date_from > date_to or options['batch_days'] < 1:
+            raise CommandError('Некорректный период или размер пачки')
+
+        total_masters = 0
+        total_procedures = 0
+        batch_start = date_from
+        while batch_start <= date_to:
+            batch_end = min(
+                batch_start + timedelta(days=options['batch_days'] - 1),
+                date_to,
+            )
+            masters, procedures = rebuild_rollups(batch_start, batch_end)
+            total_masters += masters
+            total_procedures += procedures
+            self.stdout.write(
+                f'📦 {batch_start} - {batch_end}: {masters} строк мастеров, '
+                f'{procedures} строк процедур'
+            )
+            batch_start = batch_end + timedelta(days=1)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'🎉 Сводки пересчитаны: {total_masters} строк мастеров, '
+            f'{total_procedures} строк процедур'
+        ))
@@ -0,0 +1,75 @@
+# Generated by Django 3.2.16 on 2026-10-19 12:46
+
+from decimal import Decimal
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('catalog', '0004_procedure_search_index'),
+        ('masters', '0004_alter_master_is_contact_phone'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProcedureDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Дата')),
+                ('bookings', models.PositiveIntegerField(default=0, help_text='Все записи дня, включая отмененные', verbose_name='Записей')),
+                ('completed', models.PositiveIntegerField(default=0, verbose_name='Завершено')),
+                ('no_shows', models.PositiveIntegerField(default=0, verbose_name='Неявки')),
+                ('cancelled', models.PositiveIntegerField(default=0, verbose_name='Отменено')),
+                ('revenue', models.DecimalField(decimal_places=2, default=Decimal('0.00'), help_text='Стоимость завершенных процедур', max_digits=12, verbose_name='Выручка')),
+                ('booked_minutes', models.PositiveIntegerField(default=0, help_text='Длительность неотмененных записей', verbose_name='Занято минут')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Пересчитано')),
+                ('procedure', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='catalog.procedure', verbose_name='Процедура')),
+            ],
+            options={
+                'verbose_name': 'Сводка по процедуре',
+                'verbose_name_plural': 'Сводки по процедурам',
+                'ordering': ['date', 'procedure'],
+            },
+        ),
+        migrations.CreateModel(
+            name='MasterDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Дата')),
+                ('bookings', models.PositiveIntegerField(default=0, help_text='Все записи дня, включая отмененные', verbose_name='Записей')),
+                ('completed', models.PositiveIntegerField(default=0, verbose_name='Завершено')),
+                ('no_shows', models.PositiveIntegerField(default=0, verbose_name='Неявки')),
+                ('cancelled', models.PositiveIntegerField(default=0, verbose_name='Отменено')),
+                ('revenue', models.DecimalField(decimal_places=2, default=Decimal('0.00'), help_text='Стоимость завершенных процедур', max_digits=12, verbose_name='Выручка')),
+                ('booked_minutes', models.PositiveIntegerField(default=0, help_text='Длительность неотмененных записей', verbose_name='Занято минут')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Пересчитано')),
+                ('available_minutes', models.PositiveIntegerField(default=0, help_text='Длина рабочего дня, если мастер активен', verbose_name='Доступно минут')),
+                ('master', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='masters.master', verbose_name='Мастер')),
+            ],
+            options={
+                'verbose_name': 'Сводка по мастеру',
+                'verbose_name_plural': 'Сводки по мастерам',
+                'ordering': ['date', 'master'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='proceduredailystats',
+            index=models.Index(fields=['date'], name='reports_pro_date_db2e11_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='proceduredailystats',
+            constraint=models.UniqueConstraint(fields=('procedure', 'date'), name='reports_procedure_daily_unique'),
+        ),
+        migrations.AddIndex(
+            model_name='masterdailystats',
+            index=models.Index(fields=['date'], name='reports_mas_date_7e374a_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='masterdailystats',
+            constraint=models.UniqueConstraint(fields=('master', 'date'), name='reports_master_daily_unique'),
+        ),
+    ]
@@ -0,0 +1,108 @@
+from decimal import Decimal
+
+from django.db import models
+
+from .constants import REVENUE_MAX_DIGITS
+
+
+class DailyStats(models.Model):
+    """Счетчики записей за день (общая часть сводных таблиц)."""
+
+    date = models.DateField(verbose_name='Дата')
+    bookings = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Записей',
+        help_text='Все записи дня, включая отмененные',
+    )
+    completed = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Завершено',
+    )
+    no_shows = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Неявки',
+    )
+    cancelled = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Отменено',
+    )
+    revenue = models.DecimalField(
+        max_digits=REVENUE_MAX_DIGITS,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        verbose_name='Выручка',
+        help_text='Стоимость завершенных процедур',
+    )
+    booked_minutes = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Занято минут',
+        help_text='Длительность неотмененных записей',
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Пересчитано',
+    )
+
+    class Meta:
+        abstract = True
+
+
+class MasterDailyStats(DailyStats):
+    """Сводка по мастеру за день."""
+
+    master = models.ForeignKey(
+        'masters.Master',
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Мастер',
+    )
+    available_minutes = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Доступно минут',
+        help_text='Длина рабочего дня, если мастер активен',
+    )
+
+    class Meta:
+        verbose_name = 'Сводка по мастеру'
+        verbose_name_plural = 'Сводки по мастерам'
+        ordering = ['date', 'master']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['master', 'date'],
+                name='reports_master_daily_unique',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['date']),
+        ]
+
+    def __str__(self):
+        return f'{self.master_id} - {self.date}'
+
+
+class ProcedureDailyStats(DailyStats):
+    """Сводка по процедуре за день."""
+
+    procedure = models.ForeignKey(
+        'catalog.Procedure',
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Процедура',
+    )
+
+    class Meta:
+        verbose_name = 'Сводка по процедуре'
+        verbose_name_plural = 'Сводки по процедурам'
+        ordering = ['date', 'procedure']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['procedure', 'date'],
+                name='reports_procedure_daily_unique',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['date']),
+        ]
+
+    def __str__(self):
+        return f'{self.procedure_id} - {self.date}'
@@ -0,0 +1,315 @@
+"""
+Дневные сводки по мастерам и процедурам.
+
+Сводка за день всегда пересчитывается целиком по записям этого дня
+(текущим и архивным), поэтому обновление идемпотентно: повторный или
+запоздавший пересчет не искажает итоги. После сохранения или удаления
+записи пересчитываются только затронутые пары (мастер, день) и
+(процедура, день), отчеты читают готовые строки.
+
+Архивация переносит запись без изменения итогов, поэтому на время
+archive_bookings пересчет отключается через suspend_rollups().
+"""
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, Max, Min, Q, Sum
+from django.utils import timezone
+
+from booking.availability import get_working_hours
+from booking.models import ArchivedBooking, Booking
+from core.routers import primary_db
+from masters.models import Master
+from .constants import (
+    CANCELLED_STATUSES,
+    COMPLETED_STATUSES,
+    COUNTER_FIELDS,
+    NO_SHOW_STATUSES,
+    REVENUE_STATUSES,
+    ROLLUP_SOURCE_FIELDS,
+    STATS_FIELDS,
+)
+from .models import MasterDailyStats, ProcedureDailyStats
+
+_suspended = ContextVar('reports_rollups_suspended', default=False)
+
+
+@contextmanager
+def suspend_rollups():
+    """Внутри блока изменения записей не пересчитывают сводки."""
+    token = _suspended.set(True)
+    try:
+        yield
+    finally:
+        _suspended.reset(token)
+
+
+def _empty_totals():
+    totals = dict.fromkeys(COUNTER_FIELDS, 0)
+    totals['revenue'] = Decimal('0.00')
+    totals['booked_minutes'] = 0
+    return totals
+
+
+def _minutes(duration):
+    return int(duration.total_seconds() // 60) if duration else 0
+
+
+def get_day_minutes():
+    """Длина рабочего дня в минутах по активным настройкам."""
+    start_time, end_time, _ = get_working_hours()
+    length = (
+        datetime.combine(date.min, end_time)
+        - datetime.combine(date.min, start_time)
+    )
+    return max(_minutes(length), 0)
+
+
+def aggregate_bookings(group_field, date_from, date_to, ids=None):
+    """
+    Итоги по (id, дата) для group_field ('master_id' или
+    'procedure_id'): по одному GROUP BY-запросу к текущим и архивным
+    записям. Архив хранит цену и длительность снимком.
+    """
+    sources = (
+        (Booking.objects.all(), 'procedure__price', 'procedure__duration'),
+        (
+            ArchivedBooking.objects.all(),
+            'procedure_price',
+            'procedure_duration',
+        ),
+    )
+    totals = defaultdict(_empty_totals)
+    for queryset, price, duration in sources:
+        queryset = queryset.filter(
+            booking_date__range=(date_from, date_to),
+            **{f'{group_field}__isnull': False},
+        )
+        if ids is not None:
+            queryset = queryset.filter(**{f'{group_field}__in': ids})
+        rows = queryset.values(group_field, 'booking_date').annotate(
+            bookings=Count('pk'),
+            completed=Count('pk', filter=Q(status__in=COMPLETED_STATUSES)),
+            no_shows=Count('pk', filter=Q(status__in=NO_SHOW_STATUSES)),
+            cancelled=Count('pk', filter=Q(status__in=CANCELLED_STATUSES)),
+            revenue=Sum(price, filter=Q(status__in=REVENUE_STATUSES)),
+            booked=Sum(duration, filter=~Q(status__in=CANCELLED_STATUSES)),
+        ).order_by()
+        for row in rows:
+            item = totals[(row[group_field], row['booking_date'])]
+            for name in COUNTER_FIELDS:
+                item[name] += row[name]
+            item['revenue'] += row['revenue'] or 0
+            item['booked_minutes'] += _minutes(row['booked'])
+    return totals
+
+
+def _get_available_minutes():
+    """Доступные минуты в день: {master_id: минуты} активных мастеров."""
+    day_minutes = get_day_minutes()
+    return {
+        master_id: day_minutes
+        for master_id in Master.objects.filter(
+            is_active=True
+        ).values_list('pk', flat=True)
+    }
+
+
+def _save_stats(model, key_field, keys, totals, available=None):
+    """
+    Записывает сводки по ключам (id, дата). Ключ без записей обнуляет
+    существующую строку; новая строка без записей создается только для
+    активного мастера из available, чтобы загрузка учитывала его
+    свободный день.
+    """
+    existing = {
+        (getattr(row, key_field), row.date): row
+        for row in model.objects.filter(
+            **{f'{key_field}__in': {key[0] for key in keys}},
+            date__in={key[1] for key in keys},
+        )
+    }
+    now = timezone.now()
+    to_create = []
+    to_update = []
+    for key in keys:
+        values = dict(totals.get(key) or _empty_totals())
+        if available is not None:
+            values['available_minutes'] = available.get(key[0], 0)
+        row = existing.get(key)
+        if row is None:
+            if values['bookings'] or key[0] in (available or ()):
+                to_create.append(
+                    model(**{key_field: key[0], 'date': key[1]}, **values)
+                )
+            continue
+        for name, value in values.items():
+            setattr(row, name, value)
+        row.updated_at = now
+        to_update.append(row)
+
+    fields = list(STATS_FIELDS) + ['updated_at']
+    if available is not None:
+        fields.append('available_minutes')
+    # Параллельный пересчет того же дня мог создать строку первым,
+    # его итоги посчитаны по тем же данным
+    model.objects.bulk_create(to_create, ignore_conflicts=True)
+    model.objects.bulk_update(to_update, fields)
+
+
+def _refresh(model, key_field, keys, available=None):
+    ids = {key[0] for key in keys}
+    dates = [key[1] for key in keys]
+    totals = aggregate_bookings(key_field, min(dates), max(dates), ids)
+    _save_stats(model, key_field, keys, totals, available)
+
+
+def refresh_rollups(master_keys=(), procedure_keys=()):
+    """
+    Пересчитывает сводки для пар (мастер, день) и (процедура, день).
+    В затронутые дни строку получают все активные мастера, в том числе
+    без записей; дни совсем без изменений добавляет rebuild_rollups.
+    """
+    with primary_db(), transaction.atomic():
+        if master_keys:
+            available = _get_available_minutes()
+            days = {day for _, day in master_keys}
+            master_keys = set(master_keys) | {
+                (master_id, day) for master_id in available for day in days
+            }
+            _refresh(MasterDailyStats, 'master_id', master_keys, available)
+        if procedure_keys:
+            _refresh(
+                ProcedureDailyStats, 'procedure_id', set(procedure_keys)
+            )
+
+
+def _booking_keys(booking):
+    master_keys = {(booking.master_id, booking.booking_date)}
+    procedure_keys = {(booking.procedure_id, booking.booking_date)}
+    loaded_date = getattr(booking, 'loaded_booking_date', None)
+    if loaded_date is not None:
+        # Если запись перенесли, пересчитывается и прежний день
+        master_keys.add((booking.loaded_master_id, loaded_date))
+        procedure_keys.add((booking.loaded_procedure_id, loaded_date))
+    return master_keys, procedure_keys
+
+
+def schedule_rollup_refresh(bookings):
+    """
+    Пересчет сводок по записям после коммита транзакции. Нужен явно
+    там, где сигналы не отправляются (bulk_create).
+    """
+    if _suspended.get():
+        return
+    master_keys = set()
+    procedure_keys = set()
+    for booking in bookings:
+        booking_masters, booking_procedures = _booking_keys(booking)
+        master_keys |= booking_masters
+        procedure_keys |= booking_procedures
+    master_keys = {key for key in master_keys if None not in key}
+    procedure_keys = {key for key in procedure_keys if None not in key}
+    transaction.on_commit(
+        lambda: refresh_rollups(master_keys, procedure_keys)
+    )
+
+
+def _affects_rollups(instance, created, update_fields):
+    """
+    Сохранение меняет итоги, только если изменились статус, мастер,
+    процедура или день. Напоминания и подтверждения их не трогают.
+    """
+    if created:
+        return True
+    if update_fields is not None and not (
+        set(update_fields) & ROLLUP_SOURCE_FIELDS
+    ):
+        return False
+    loaded_status = getattr(instance, 'loaded_status', None)
+    if loaded_status is None:
+        return True
+    return (
+        loaded_status,
+        instance.loaded_master_id,
+        instance.loaded_procedure_id,
+        instance.loaded_booking_date,
+    ) != (
+        instance.status,
+        instance.master_id,
+        instance.procedure_id,
+        instance.booking_date,
+    )
+
+
+def refresh_booking_rollups(sender, instance, raw=False, **kwargs):
+    """Обработчик post_save/post_delete Booking и ArchivedBooking."""
+    if raw:
+        return
+    if 'created' in kwargs and not _affects_rollups(
+        instance, kwargs['created'], kwargs.get('update_fields')
+    ):
+        return
+    schedule_rollup_refresh([instance])
+
+
+def _days(date_from, date_to):
+    return [
+        date_from + timedelta(days=offset)
+        for offset in range((date_to - date_from).days + 1)
+    ]
+
+
+def rebuild_rollups(date_from, date_to):
+    """
+    Строит сводки за период заново. У активных мастеров появляется
+    строка на каждый день, даже без записей, чтобы загрузка учитывала
+    и свободные дни. Возвращает (строк мастеров, строк процедур).
+    """
+    with primary_db(), transaction.atomic():
+        masters = aggregate_bookings('master_id', date_from, date_to)
+        procedures = aggregate_bookings('procedure_id', date_from, date_to)
+        available = _get_available_minutes()
+        for day in _days(date_from, date_to):
+            for master_id in available:
+                masters.setdefault((master_id, day), _empty_totals())
+
+        MasterDailyStats.objects.filter(
+            date__range=(date_from, date_to)
+        ).delete()
+        ProcedureDailyStats.objects.filter(
+            date__range=(date_from, date_to)
+        ).delete()
+        MasterDailyStats.objects.bulk_create([
+            MasterDailyStats(
+                master_id=master_id,
+                date=day,
+                available_minutes=available.get(master_id, 0),
+                **values,
+            )
+            for (master_id, day), values in masters.items()
+        ])
+        ProcedureDailyStats.objects.bulk_create([
+            ProcedureDailyStats(procedure_id=procedure_id, date=day, **values)
+            for (procedure_id, day), values in procedures.items()
+        ])
+    return len(masters), len(procedures)
+
+
+def get_booking_date_range():
+    """Первая и последняя даты записей (текущих и архивных) или None."""
+    dates = [
+        value
+        for model in (Booking, ArchivedBooking)
+        for value in model.objects.aggregate(
+            first=Min('booking_date'), last=Max('booking_date')
+        ).values()
+        if value is not None
+    ]
+    if not dates:
+        return None
+    return min(dates), max(dates)
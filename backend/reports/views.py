@@ -0,0 +1,131 @@
+from datetime import date, timedelta
+
+from django.contrib.admin.views.decorators import staff_member_required
+from django.db.models import Sum
+from django.db.models.functions import ExtractIsoWeekDay
+from django.shortcuts import render
+from django.utils import timezone
+from django.views.decorators.http import require_GET
+
+from core.metrics import histogram
+from .constants import (
+    DASHBOARD_DEFAULT_DAYS,
+    DATE_FROM_PARAM,
+    DATE_TO_PARAM,
+    MSG_BAD_PERIOD,
+    STATS_FIELDS,
+    WEEKDAY_NAMES,
+)
+from .models import MasterDailyStats, ProcedureDailyStats
+
+DASHBOARD_SECONDS = histogram(
+    'reports_dashboard_duration_seconds',
+    'Время построения дашборда отчетов',
+)
+
+# Суффикс нужен, чтобы имена аннотаций не совпали с полями модели
+SUMS = {f'{name}_sum': Sum(name) for name in STATS_FIELDS}
+
+
+def _get_period(request):
+    """Период из ?date_from и ?date_to, по умолчанию последние дни."""
+    date_to = timezone.localdate()
+    date_from = date_to - timedelta(days=DASHBOARD_DEFAULT_DAYS - 1)
+    try:
+        if request.GET.get(DATE_FROM_PARAM):
+            date_from = date.fromisoformat(request.GET[DATE_FROM_PARAM])
+        if request.GET.get(DATE_TO_PARAM):
+            date_to = date.fromisoformat(request.GET[DATE_TO_PARAM])
+    except ValueError:
+        date_from = None
+    if date_from is None or date_from > date_to:
+        date_to = timezone.localdate()
+        date_from = date_to - timedelta(days=DASHBOARD_DEFAULT_DAYS - 1)
+        return date_from, date_to, MSG_BAD_PERIOD.format(
+            DASHBOARD_DEFAULT_DAYS
+        )
+    return date_from, date_to, None
+
+
+def _percent(part, whole):
+    return round(100 * part / whole) if whole else None
+
+
+def _row(values, title_field, with_available=False):
+    row = {'title': values[title_field]}
+    for name in STATS_FIELDS:
+        row[name] = values[f'{name}_sum'] or 0
+    if with_available:
+        row['available_minutes'] = values['available_minutes_sum'] or 0
+        row['utilization'] = _percent(
+            row['booked_minutes'], row['available_minutes']
+        )
+    return row
+
+
+@staff_member_required
+@require_GET
+@DASHBOARD_SECONDS.time()
+def dashboard(request):
+    """
+    Выручка, неявки и загрузка мастеров за период. Три GROUP BY по
+    дневным сводкам, сами записи не читаются.
+    """
+    date_from, date_to, error = _get_period(request)
+    master_stats = MasterDailyStats.objects.filter(
+        date__range=(date_from, date_to)
+    )
+
+    masters = [
+        _row(values, 'master__name', with_available=True)
+        for values in master_stats
+        .values('master_id', 'master__name')
+        .annotate(**SUMS, available_minutes_sum=Sum('available_minutes'))
+        .order_by('master__name')
+    ]
+    procedures = [
+        _row(values, 'procedure__title')
+        for values in ProcedureDailyStats.objects
+        .filter(date__range=(date_from, date_to))
+        .values('procedure_id', 'procedure__title')
+        .annotate(**SUMS)
+        .order_by('-revenue_sum', 'procedure__title')
+    ]
+    weekdays = [
+        {
+            'title': WEEKDAY_NAMES[values['weekday'] - 1],
+            'bookings': values['bookings_sum'] or 0,
+            'utilization': _percent(
+                values['booked_minutes_sum'] or 0,
+                values['available_minutes_sum'] or 0,
+            ),
+        }
+        for values in master_stats
+        .annotate(weekday=ExtractIsoWeekDay('date'))
+        .values('weekday')
+        .annotate(
+            bookings_sum=Sum('bookings'),
+            booked_minutes_sum=Sum('booked_minutes'),
+            available_minutes_sum=Sum('available_minutes'),
+        )
+        .order_by('weekday')
+    ]
+
+    totals = {
+        name: sum(row[name] for row in masters)
+        for name in STATS_FIELDS + ('available_minutes',)
+    }
+    totals['utilization'] = _percent(
+        totals['booked_minutes'], totals['available_minutes']
+    )
+    context = {
+        'title': 'Отчеты',
+        'date_from': date_from,
+        'date_to': date_to,
+        'error': error,
+        'masters': masters,
+        'procedures': procedures,
+        'weekdays': weekdays,
+        'totals': totals,
+    }
+    return render(request, 'reports/dashboard.html', context)
@@ -1,10 +1,13 @@
 from django.contrib import admin
+from django.utils.html import format_html
 
+from core.export import ExportAdminMixin
 from .models import Client, PaymentSettings, User
+from .portal import get_portal_url
 
 
 @admin.register(Client)
-class ClientAdmin(admin.ModelAdmin):
+class ClientAdmin(ExportAdminMixin, admin.ModelAdmin):
     list_display = [
         'name',
         'phone',
@@ -17,10 +20,10 @@ class ClientAdmin(admin.ModelAdmin):
     list_filter = ['is_new', 'always_prepayment', 'created_at']
     search_fields = ['name', 'phone', 'email']
     list_editable = ['is_new', 'always_prepayment']
-    readonly_fields = ['created_at']
+    readonly_fields = ['created_at', 'portal_link']
     fieldsets = (
         ('Основная информация', {
-            'fields': ('name', 'phone', 'email')
+            'fields': ('name', 'phone', 'email', 'portal_link')
         }),
         ('Статусы', {
             'fields': ('is_new', 'always_prepayment', 'notification_method')
@@ -31,6 +34,27 @@ class ClientAdmin(admin.ModelAdmin):
         }),
     )
 
+    export_columns = [
+        ('Имя', lambda client: client.name),
+        ('Телефон', lambda client: client.phone),
+        ('Email', lambda client: client.email),
+        (
+            'Способ уведомления',
+            lambda client: client.get_notification_method_display(),
+        ),
+        ('Новый клиент', lambda client: client.is_new),
+        ('Всегда предоплата', lambda client: client.always_prepayment),
+        ('Дата регистрации', lambda client: client.created_at),
+    ]
+    export_date_field = 'created_at__date'
+
+    @admin.display(description='Личный кабинет')
+    def portal_link(self, obj):
+        """Подписанная ссылка, которую можно отправить клиенту."""
+        if not obj.pk:
+            return '-'
+        return format_html('<a href="{0}">{0}</a>', get_portal_url(obj.pk))
+
 
 @admin.register(PaymentSettings)
 class PaymentSettingsAdmin(admin.ModelAdmin):
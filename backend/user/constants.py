@@ -19,3 +19,19 @@ PAYMENT_PREPAYMENT_PERCENT_DEFAULT = 100
 
 # User field lengths
 USER_PHONE_MAX_LENGTH = 20
+
+# Личный кабинет клиента по подписанной ссылке
+CLIENT_PORTAL_SALT = 'user.client_portal'
+CLIENT_PORTAL_LINK_MAX_AGE_DAYS = 30
+CLIENT_PORTAL_UPCOMING_LIMIT = 50
+CLIENT_PORTAL_HISTORY_LIMIT = 20
+CLIENT_SELF_CANCEL_MIN_HOURS_DEFAULT = 3
+MSG_PORTAL_LINK_INVALID = (
+    'Ссылка устарела или неверна. Запросите новую у администратора.'
+)
+MSG_SELF_CANCELLED = 'Запись на {} отменена.'
+MSG_SELF_CANCEL_TOO_LATE = (
+    'Отменить запись можно не позже чем за {} ч. до начала. '
+    'Позвоните нам: {}'
+)
+MSG_SELF_CANCEL_UNAVAILABLE = 'Эту запись нельзя отменить.'
@@ -0,0 +1,116 @@
+"""
+Личный кабинет клиента по подписанной ссылке (без пароля).
+
+Ссылка подписана TimestampSigner и действует
+CLIENT_PORTAL_LINK_MAX_AGE_DAYS дней. Новая ссылка выдается на странице
+успешной записи и в карточке клиента в админке.
+"""
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core import signing
+from django.urls import reverse
+from django.utils import timezone
+
+from booking.constants import ACTIVE_BOOKING_STATUSES
+from booking.models import ArchivedBooking, Booking
+from .constants import (
+    CLIENT_PORTAL_HISTORY_LIMIT,
+    CLIENT_PORTAL_LINK_MAX_AGE_DAYS,
+    CLIENT_PORTAL_SALT,
+    CLIENT_PORTAL_UPCOMING_LIMIT,
+    CLIENT_SELF_CANCEL_MIN_HOURS_DEFAULT,
+)
+from .models import Client
+
+
+def _signer():
+    return signing.TimestampSigner(salt=CLIENT_PORTAL_SALT)
+
+
+def get_portal_url(client_id):
+    return reverse(
+        'user:portal', args=[_signer().sign(str(client_id))]
+    )
+
+
+def get_client_by_token(token):
+    """Клиент из подписанной ссылки или None (подпись неверна/истекла)."""
+    try:
+        client_id = _signer().unsign(
+            token,
+            max_age=timedelta(days=CLIENT_PORTAL_LINK_MAX_AGE_DAYS),
+        )
+    except signing.BadSignature:
+        return None
+    return Client.objects.filter(pk=client_id).first()
+
+
+def get_self_cancel_min_hours():
+    return getattr(
+        settings,
+        'CLIENT_SELF_CANCEL_MIN_HOURS',
+        CLIENT_SELF_CANCEL_MIN_HOURS_DEFAULT,
+    )
+
+
+def can_self_cancel(booking, now=None):
+    """Активная запись, до начала которой не меньше минимального срока."""
+    if booking.status not in ACTIVE_BOOKING_STATUSES:
+        return False
+    now = now or timezone.now()
+    start = timezone.make_aware(
+        datetime.combine(booking.booking_date, booking.booking_time)
+    )
+    return start - now >= timedelta(hours=get_self_cancel_min_hours())
+
+
+def _history_item(item, procedure_title, master_name):
+    return {
+        'booking_date': item.booking_date,
+        'booking_time': item.booking_time,
+        'procedure_title': procedure_title,
+        'master_name': master_name,
+        'status': item.get_status_display(),
+    }
+
+
+def get_client_bookings(client):
+    """
+    Предстоящие записи и история клиента.
+
+    Каждая выборка идет по индексу (client, booking_date) с LIMIT,
+    поэтому стоимость страницы не растет с историей клиента. Архив
+    читается, только если текущих прошедших записей меньше лимита.
+    """
+    today = timezone.localdate()
+    bookings = Booking.objects.filter(client=client).select_related(
+        'procedure', 'master'
+    )
+    upcoming = list(
+        bookings.filter(booking_date__gte=today)
+        .order_by('booking_date', 'booking_time')[
+            :CLIENT_PORTAL_UPCOMING_LIMIT
+        ]
+    )
+    now = timezone.now()
+    for booking in upcoming:
+        booking.can_cancel = can_self_cancel(booking, now)
+
+    history = [
+        _history_item(booking, booking.procedure.title, booking.master.name)
+        for booking in bookings.filter(booking_date__lt=today)
+        .order_by('-booking_date', '-booking_time')[
+            :CLIENT_PORTAL_HISTORY_LIMIT
+        ]
+    ]
+    remaining = CLIENT_PORTAL_HISTORY_LIMIT - len(history)
+    if remaining > 0:
+        history.extend(
+            _history_item(
+                archived, archived.procedure_title, archived.master_name
+            )
+            for archived in ArchivedBooking.objects.filter(client=client)
+            .order_by('-booking_date', '-booking_time')[:remaining]
+        )
+    return upcoming, history
@@ -0,0 +1,13 @@
+from django.urls import path
+from . import views
+
+app_name = 'user'
+
+urlpatterns = [
+    path('<str:token>/', views.ClientPortalView.as_view(), name='portal'),
+    path(
+        '<str:token>/cancel/<uuid:booking_id>/',
+        views.ClientCancelBookingView.as_view(),
+        name='cancel_booking',
+    ),
+]
@@ -0,0 +1,85 @@
+from django.contrib import messages
+from django.shortcuts import redirect, render
+from django.views import View
+
+from about.utils import get_contact_phone
+from booking.constants import ACTIVE_BOOKING_STATUSES
+from booking.models import Booking
+from core.metrics import counter
+from notifications.reminder_utils import cancel_by_client
+from .constants import (
+    MSG_PORTAL_LINK_INVALID,
+    MSG_SELF_CANCEL_TOO_LATE,
+    MSG_SELF_CANCEL_UNAVAILABLE,
+    MSG_SELF_CANCELLED,
+)
+from .portal import (
+    can_self_cancel,
+    get_client_bookings,
+    get_client_by_token,
+    get_self_cancel_min_hours,
+)
+
+SELF_CANCELLATIONS = counter(
+    'client_self_cancellations_total',
+    'Отмены записей клиентами в личном кабинете',
+)
+
+
+def _invalid_link(request):
+    return render(
+        request,
+        'user/portal.html',
+        {'error': MSG_PORTAL_LINK_INVALID},
+        status=404,
+    )
+
+
+class ClientPortalView(View):
+    """Записи клиента по подписанной ссылке."""
+
+    def get(self, request, token):
+        client = get_client_by_token(token)
+        if client is None:
+            return _invalid_link(request)
+
+        upcoming, history = get_client_bookings(client)
+        context = {
+            'client': client,
+            'token': token,
+            'upcoming': upcoming,
+            'history': history,
+            'min_cancel_hours': get_self_cancel_min_hours(),
+        }
+        return render(request, 'user/portal.html', context)
+
+
+class ClientCancelBookingView(View):
+    """Отмена клиентом своей записи из личного кабинета."""
+
+    def post(self, request, token, booking_id):
+        client = get_client_by_token(token)
+        if client is None:
+            return _invalid_link(request)
+
+        booking = Booking.objects.filter(
+            booking_id=booking_id, client=client
+        ).first()
+        if booking is None or booking.status not in ACTIVE_BOOKING_STATUSES:
+            messages.error(request, MSG_SELF_CANCEL_UNAVAILABLE)
+        elif not can_self_cancel(booking):
+            messages.error(request, MSG_SELF_CANCEL_TOO_LATE.format(
+                get_self_cancel_min_hours(), get_contact_phone()
+            ))
+        elif cancel_by_client(
+            booking.booking_id, client=client, check=can_self_cancel
+        ) is None:
+            # Повторная отправка формы: запись уже отменена
+            messages.error(request, MSG_SELF_CANCEL_UNAVAILABLE)
+        else:
+            SELF_CANCELLATIONS.inc()
+            messages.success(request, MSG_SELF_CANCELLED.format(
+                f'{booking.booking_date:%d.%m.%Y} '
+                f'{booking.booking_time:%H:%M}'
+            ))
+        return redirect('user:portal', token=token)